@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class SenaAppConfig(AppConfig):
+    """
+    Lo del proyecto que no es de ninguna app: las conexiones SQLite y las
+    versiones de los fragmentos de plantilla (SENA_APP/fragmentos.py)
+    """
+    name = 'SENA_APP'
+
+    def ready(self):
+        from . import basedatos
+        basedatos.conectar()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SENA_APP.settings')
+# Las URL de lectura usan las vistas asíncronas (ver VISTAS_ASINCRONAS en settings)
+os.environ.setdefault('SENA_VISTAS_ASINCRONAS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,152 @@
+"""
+Selectores con búsqueda para las llaves foráneas de los formularios.
+
+Con miles de aprendices un ``<select>`` con todas las filas pesa megas y
+recorre la tabla completa en cada formulario. ``Autocompletar`` dibuja el
+``<select>`` solo con la opción elegida; ``autocompletar.js`` agrega un
+cuadro de búsqueda que pide las opciones a ``/autocompletar/<fuente>/``
+mientras se escribe.
+
+Cada ``Fuente`` define el queryset que usan tanto la búsqueda como la
+validación del formulario (``Fuente.consulta()``), así que no se puede
+enviar un valor que el selector no ofrecería. La búsqueda es por prefijo
+sobre un índice:
+
+* si el texto empieza por un dígito, sobre el ``documento`` tal cual
+  (índice único de la columna),
+* si no, sobre ``LOWER(busqueda)``, con un índice de esa expresión y el
+  ``id``, que también da el orden y permite paginar por cursor.
+
+El prefijo se busca como rango (``>= texto`` y ``< texto + U+10FFFF``) y
+no con LIKE, que en SQLite no usa índices de expresiones.
+"""
+
+import string
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from aprendices.models import Aprendiz
+from cursos.models import Curso
+from instructores.models import Instructor
+from programas.models import TEXTOS_LARGOS, Programa
+
+from .paginacion import KeysetPaginator
+
+POR_PAGINA = 20
+# Mayor que cualquier carácter: cierra el rango de un prefijo
+ULTIMO = '\U0010ffff'
+MINUSCULAS_ASCII = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+class Fuente:
+    """
+    Filas que ofrece un selector. ``campos`` son los que usa el ``__str__``
+    del modelo, que es el texto de cada opción; ``diferidos``, columnas que
+    la validación del formulario y la opción elegida no necesitan leer.
+    """
+
+    def __init__(self, modelo, busqueda, documento=None, filtro=None, campos=(), diferidos=()):
+        self.modelo = modelo
+        self.busqueda = busqueda
+        self.documento = documento
+        self.filtro = filtro or Q()
+        self.campos = campos
+        self.diferidos = diferidos
+
+    def consulta(self):
+        return self.modelo.objects.filter(self.filtro).defer(*self.diferidos)
+
+    def buscar(self, texto):
+        """Queryset y ordenamiento para paginar las coincidencias de ``texto``"""
+        filas = self.consulta().only('id', *self.campos)
+        if self.documento and texto[:1].isdigit():
+            filas = filas.filter(**{f'{self.documento}__gte': texto, f'{self.documento}__lt': texto + ULTIMO})
+            return filas, (self.documento, 'id')
+        filas = filas.annotate(clave_busqueda=Lower(self.busqueda))
+        if texto:
+            texto = minusculas(texto)
+            filas = filas.filter(clave_busqueda__gte=texto, clave_busqueda__lt=texto + ULTIMO)
+        return filas, ('clave_busqueda', 'id')
+
+
+FUENTES = {
+    'aprendices': Fuente(
+        Aprendiz, 'lastname', documento='document', campos=('firstname', 'lastname'),
+    ),
+    'instructores': Fuente(
+        Instructor, 'apellido', documento='documento_id', filtro=Q(activo=True),
+        campos=('nombre', 'apellido', 'especialidad'),
+    ),
+    'programas': Fuente(
+        Programa, 'nombre', filtro=Q(estado='ACT'), campos=('codigo', 'nombre'),
+        diferidos=TEXTOS_LARGOS,
+    ),
+    # El aprendiz puede seguir en un programa que ya no está activo. El
+    # catálogo de programas es corto: no necesita un índice propio
+    'programas_todos': Fuente(Programa, 'nombre', campos=('codigo', 'nombre'), diferidos=TEXTOS_LARGOS),
+    'cursos': Fuente(Curso, 'codigo', campos=('codigo', 'nombre')),
+}
+
+
+def minusculas(texto):
+    # LOWER de SQLite solo cambia las letras ASCII ('Ávila' queda 'Ávila'),
+    # así que el texto buscado se convierte igual
+    if connection.vendor == 'sqlite':
+        return texto.translate(MINUSCULAS_ASCII)
+    return texto.lower()
+
+
+class Autocompletar(forms.Select):
+    """
+    ``<select>`` con la opción vacía y la elegida, nada más. La validación
+    sigue siendo la del ``ModelChoiceField`` con el queryset de la fuente.
+    """
+
+    class Media:
+        js = ['autocompletar.js']
+
+    def __init__(self, fuente, attrs=None):
+        super().__init__(attrs)
+        self.fuente = fuente
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocompletar'] = reverse('autocompletar', args=[self.fuente])
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        opciones = []
+        if self.choices.field.empty_label is not None:
+            opciones.append(('', self.choices.field.empty_label))
+        elegidos = [valor for valor in value if valor]
+        if elegidos:
+            try:
+                opciones += [self.choices.choice(objeto) for objeto in self.choices.queryset.filter(pk__in=elegidos)]
+            except (ValueError, TypeError, ValidationError):
+                # Valor enviado que no es un id: el campo ya informa el error
+                pass
+        return [
+            (None, [self.create_option(name, valor, etiqueta, str(valor) in value, indice, attrs=attrs)], indice)
+            for indice, (valor, etiqueta) in enumerate(opciones)
+        ]
+
+
+@require_safe
+def buscar(request, fuente):
+    fuente = FUENTES.get(fuente)
+    if fuente is None:
+        return JsonResponse({'error': 'Selector no encontrado.'}, status=404)
+    filas, ordenamiento = fuente.buscar(request.GET.get('q', '').strip())
+    pagina = KeysetPaginator(filas, ordenamiento, por_pagina=POR_PAGINA).pagina(request)
+    siguiente = pagina.next_url()
+    return JsonResponse({
+        'resultados': [{'id': fila.pk, 'texto': str(fila)} for fila in pagina],
+        'siguiente': request.path + siguiente if siguiente else None,
+    })
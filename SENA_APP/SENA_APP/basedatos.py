@@ -0,0 +1,25 @@
+"""
+Ajustes de las conexiones SQLite.
+
+``configurar_sqlite`` escucha ``connection_created`` y aplica a cada
+conexión nueva los PRAGMA de ``settings.SQLITE_PRAGMAS``. En el perfil de
+desarrollo la lista está vacía y las conexiones quedan como las abre
+Django; el perfil de producción (``SENA_DB_PERFIL=produccion``) activa WAL,
+``synchronous=NORMAL``, espera de bloqueos, mmap y caché de páginas.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def configurar_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for nombre, valor in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        # Directamente sobre la conexión DB-API: la conexión de Django aún
+        # se está inicializando
+        connection.connection.execute(f'PRAGMA {nombre} = {valor}')
+
+
+def conectar():
+    connection_created.connect(configurar_sqlite, dispatch_uid='sena_configurar_sqlite')
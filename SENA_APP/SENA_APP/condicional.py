@@ -0,0 +1,101 @@
+"""
+GET condicional (``ETag`` / ``Last-Modified``) para las vistas de lectura.
+
+``condicional(validadores)`` decora una vista síncrona o async.
+``validadores(request, *args, **kwargs)`` hace una búsqueda barata y
+devuelve ``(etag, fecha)``; si coinciden con ``If-None-Match`` o
+``If-Modified-Since`` se responde 304 sin ejecutar la vista. Si no, la
+vista responde normalmente con ambas cabeceras y ``Cache-Control:
+no-cache``, para que el navegador y el proxy revaliden siempre en vez de
+suponer que la página sigue vigente.
+
+* ``por_versiones(*modelos)`` sirve a las listas: usa la versión de los
+  fragmentos y la hora del último cambio, leídas juntas en una consulta.
+* ``por_fecha(consulta)`` sirve a los detalles: una consulta que devuelve
+  la fecha de actualización más reciente de lo que muestra la página.
+
+Last-Modified tiene resolución de un segundo; el ETag distingue cambios
+dentro del mismo segundo y, si el cliente envía ambos, tiene prioridad.
+Las peticiones con mensajes pendientes (los de ``django.contrib.messages``
+después de guardar) no se validan: la página debe mostrarlos.
+"""
+
+import functools
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .fragmentos import una_lectura_por_vista, versiones
+
+
+def condicional(validadores):
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @functools.wraps(vista)
+            async def envoltura(request, *args, **kwargs):
+                with una_lectura_por_vista():
+                    valores = await sync_to_async(_evaluar)(validadores, request, args, kwargs)
+                    respuesta = _no_modificado(request, valores)
+                    if respuesta is None:
+                        respuesta = await vista(request, *args, **kwargs)
+                return _marcar(respuesta, valores)
+        else:
+            @functools.wraps(vista)
+            def envoltura(request, *args, **kwargs):
+                with una_lectura_por_vista():
+                    valores = _evaluar(validadores, request, args, kwargs)
+                    respuesta = _no_modificado(request, valores)
+                    if respuesta is None:
+                        respuesta = vista(request, *args, **kwargs)
+                return _marcar(respuesta, valores)
+        return envoltura
+    return decorador
+
+
+def por_versiones(*modelos):
+    def validadores(request, *args, **kwargs):
+        return versiones(*modelos)
+    return validadores
+
+
+def por_fecha(consulta):
+    """
+    ``consulta(*args, **kwargs)`` devuelve un queryset de una columna con
+    la fecha; sin filas (registro inexistente) la vista responde como
+    siempre.
+    """
+    def validadores(request, *args, **kwargs):
+        fecha = consulta(*args, **kwargs).first()
+        if fecha is None:
+            return None
+        return f'{fecha.timestamp():.6f}', fecha
+    return validadores
+
+
+def _evaluar(validadores, request, args, kwargs):
+    if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+        return None
+    valores = validadores(request, *args, **kwargs)
+    if valores is None:
+        return None
+    etag, fecha = valores
+    return quote_etag(etag), int(fecha.timestamp())
+
+
+def _no_modificado(request, valores):
+    if valores is None:
+        return None
+    etag, fecha = valores
+    return get_conditional_response(request, etag=etag, last_modified=fecha)
+
+
+def _marcar(respuesta, valores):
+    if valores is not None and respuesta.status_code in (200, 304):
+        etag, fecha = valores
+        respuesta.headers.setdefault('ETag', etag)
+        respuesta.headers.setdefault('Last-Modified', http_date(fecha))
+        if not respuesta.has_header('Cache-Control'):
+            patch_cache_control(respuesta, no_cache=True)
+    return respuesta
@@ -0,0 +1,139 @@
+"""
+Archivos estáticos propios, con el hash del contenido en el nombre,
+precomprimidos y servidos con caché de larga duración.
+
+``collectstatic`` con ``EstaticosComprimidos`` copia los archivos a
+STATIC_ROOT con el hash en el nombre (``mystyles.1d2c3b4a5e6f.css``), como
+``ManifestStaticFilesStorage``, y escribe junto a cada archivo de texto
+una variante ``.gz`` y, si está instalado el paquete ``brotli``, una
+``.br``. Solo se guardan las que ahorran al menos un 10 %.
+
+``EstaticosMiddleware`` sirve STATIC_URL desde STATIC_ROOT y elige la
+variante según ``Accept-Encoding``. Los nombres con hash se envían con
+``Cache-Control: max-age=31536000, immutable``: el navegador no vuelve a
+pedirlos, y si el archivo cambia cambia también su nombre en las
+plantillas. Los nombres sin hash se revalidan con ``Last-Modified``.
+
+Sin manifiesto (``collectstatic`` no se ha ejecutado, como en desarrollo)
+``{% static %}`` usa los nombres originales, que runserver sirve desde
+STATICFILES_DIRS, y el middleware se retira.
+"""
+
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRIMIBLES = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html', '.ico'}
+AHORRO_MINIMO = 0.9
+UN_ANO = 365 * 24 * 60 * 60
+
+# (codificación de Accept-Encoding, extensión de la variante), en orden de preferencia
+VARIANTES = [('br', '.br'), ('gzip', '.gz')]
+
+mimetypes.add_type('font/woff', '.woff')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('application/json', '.map')
+
+
+class EstaticosComprimidos(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Sin manifiesto (sin collectstatic) se usan los nombres originales
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            for nombre in set(self.hashed_files.values()):
+                self.comprimir(nombre)
+
+    def comprimir(self, nombre):
+        if os.path.splitext(nombre)[1] not in COMPRIMIBLES:
+            return
+        ruta = Path(self.path(nombre))
+        contenido = ruta.read_bytes()
+        variantes = {'.gz': gzip.compress(contenido, 9, mtime=0)}
+        if brotli is not None:
+            variantes['.br'] = brotli.compress(contenido)
+        for extension, comprimido in variantes.items():
+            if len(comprimido) < len(contenido) * AHORRO_MINIMO:
+                ruta.with_name(ruta.name + extension).write_bytes(comprimido)
+
+
+class EstaticosMiddleware:
+    """
+    Va justo después de SecurityMiddleware: los archivos estáticos no
+    necesitan sesión, CSRF ni resolución de URL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        raiz = settings.STATIC_ROOT
+        manifiesto = getattr(staticfiles_storage, 'manifest_name', None)
+        if not raiz or not manifiesto or not os.path.exists(os.path.join(raiz, manifiesto)):
+            raise MiddlewareNotUsed
+        self.raiz = Path(raiz).resolve()
+        self.prefijo = '/' + settings.STATIC_URL.lstrip('/')
+        self.con_hash = set(staticfiles_storage.hashed_files.values())
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.servir(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.servir(request) or await self.get_response(request)
+
+    def servir(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefijo):
+            return None
+        nombre = request.path_info[len(self.prefijo):]
+        ruta = (self.raiz / nombre).resolve()
+        if self.raiz not in ruta.parents or not ruta.is_file():
+            return None
+
+        modificado = int(ruta.stat().st_mtime)
+        inmutable = nombre in self.con_hash
+        if not inmutable:
+            no_modificado = get_conditional_response(request, last_modified=modificado)
+            if no_modificado is not None:
+                return no_modificado
+
+        aceptadas = {parte.split(';')[0].strip() for parte in request.headers.get('Accept-Encoding', '').split(',')}
+        codificacion, archivo = None, ruta
+        for candidata, extension in VARIANTES:
+            variante = ruta.with_name(ruta.name + extension)
+            if candidata in aceptadas and variante.is_file():
+                codificacion, archivo = candidata, variante
+                break
+
+        contenido = archivo.read_bytes()
+        tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+        respuesta = HttpResponse(contenido, content_type=tipo)
+        respuesta['Content-Length'] = len(contenido)
+        if codificacion:
+            respuesta['Content-Encoding'] = codificacion
+        patch_vary_headers(respuesta, ['Accept-Encoding'])
+        respuesta['Last-Modified'] = http_date(modificado)
+        respuesta['Cache-Control'] = f'public, max-age={UN_ANO}, immutable' if inmutable else 'no-cache'
+        return respuesta
@@ -0,0 +1,58 @@
+"""
+Exportación de listas a CSV como respuesta en flujo.
+
+Las filas se leen con ``QuerySet.iterator()`` (cursor del lado del
+servidor, por bloques) y se escriben a medida que se generan, así que la
+memoria no crece con el tamaño de la tabla y el encabezado sale de
+inmediato.
+"""
+
+import csv
+import io
+
+from django.http import StreamingHttpResponse
+
+TAM_BLOQUE = 2000
+
+
+def respuesta_csv(nombre_archivo, columnas, queryset, tam_bloque=TAM_BLOQUE):
+    """
+    ``columnas`` es una lista de pares (encabezado, campo) donde ``campo``
+    es cualquier ruta válida para ``values_list`` (p. ej. ``programa__nombre``).
+    """
+    encabezados = [encabezado for encabezado, _ in columnas]
+    filas = (
+        queryset
+        .order_by('pk')
+        .values_list(*[campo for _, campo in columnas])
+        .iterator(chunk_size=tam_bloque)
+    )
+    respuesta = StreamingHttpResponse(
+        _generar_csv(encabezados, filas, tam_bloque),
+        content_type='text/csv; charset=utf-8',
+    )
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return respuesta
+
+
+def _generar_csv(encabezados, filas, tam_bloque):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel reconozca el UTF-8; el encabezado se envía antes
+    # de ejecutar la consulta
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+    yield _vaciar(buffer)
+    for numero, fila in enumerate(filas, start=1):
+        escritor.writerow(fila)
+        # Agrupar filas por envío evita un write() del servidor por fila
+        if numero % tam_bloque == 0:
+            yield _vaciar(buffer)
+    yield _vaciar(buffer)
+
+
+def _vaciar(buffer):
+    contenido = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return contenido
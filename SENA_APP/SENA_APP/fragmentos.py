@@ -0,0 +1,127 @@
+"""
+Versiones por modelo para la caché de fragmentos de plantilla.
+
+Las listas guardan su tabla con ``{% cache %}`` y una clave que incluye la
+versión de los modelos que muestran. Cada guardado o borrado incrementa
+la versión del modelo cuando la transacción confirma, así que la clave
+cambia y el fragmento anterior ya no se lee nunca (expira solo). Las
+cargas masivas, que no disparan señales, llaman a ``incrementar_version``
+igual que a ``invalidar_totales``.
+
+Las versiones se guardan en la base (``SENA_APP.models.VersionModelo``) y
+no en la caché: la caché local de cada proceso no vería los cambios que
+confirma otro worker y serviría fragmentos viejos. Leerlas es una sola
+consulta por clave primaria. La versión es la hora del último cambio en
+nanosegundos y nunca retrocede, así que no repite un valor usado antes y
+es también el ``Last-Modified`` de las listas (ver SENA_APP/condicional.py).
+Un modelo sin fila no ha cambiado desde que existe la tabla: su versión es 0.
+Dentro de ``una_lectura_por_vista`` (lo usa SENA_APP/condicional.py) cada
+versión se consulta una sola vez, así que el GET condicional y la vista
+que decora comparten la misma consulta.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import VersionModelo
+
+# Versiones ya leídas en la vista en curso; None fuera de una vista
+_leidas = ContextVar('sena_versiones_leidas', default=None)
+
+
+def _etiquetas(modelos):
+    return [modelo._meta.label_lower for modelo in modelos]
+
+
+def versiones(*modelos):
+    """
+    Versión conjunta de los modelos y hora del último cambio de cualquiera
+    de ellos, en una consulta. Sin cambios registrados la hora es la
+    actual: nunca es anterior al cambio real.
+    """
+    etiquetas = _etiquetas(modelos)
+    leidas = _leidas.get()
+    guardadas = {} if leidas is None else leidas
+    faltantes = [etiqueta for etiqueta in etiquetas if etiqueta not in guardadas]
+    if faltantes:
+        encontradas = dict(VersionModelo.objects.filter(modelo__in=faltantes).values_list('modelo', 'version'))
+        guardadas.update({etiqueta: encontradas.get(etiqueta, 0) for etiqueta in faltantes})
+    valores = [guardadas[etiqueta] for etiqueta in etiquetas]
+    ultima = max(valores, default=0)
+    fecha = datetime.fromtimestamp(ultima / 1e9 if ultima else time.time(), tz=timezone.utc)
+    return '.'.join(map(str, valores)), fecha
+
+
+@contextmanager
+def una_lectura_por_vista():
+    """Leer cada versión una sola vez mientras dura el bloque"""
+    token = _leidas.set({})
+    try:
+        yield
+    finally:
+        _leidas.reset(token)
+
+
+def version(*modelos):
+    """Versión conjunta de los modelos, para usar en la clave de un fragmento"""
+    return versiones(*modelos)[0]
+
+
+async def aversion(*modelos):
+    """``version`` desde una vista async"""
+    return await sync_to_async(version)(*modelos)
+
+
+async def afragmento_en_cache(nombre, *variaciones):
+    """
+    Si el fragmento ``{% cache ... nombre variaciones %}`` ya está guardado.
+    Las vistas async lo consultan para no cargar los datos de una tabla que
+    la plantilla no va a renderizar.
+    """
+    return await _cache_fragmentos().ahas_key(make_template_fragment_key(nombre, variaciones))
+
+
+def _cache_fragmentos():
+    # La misma caché que usa la etiqueta {% cache %}
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def incrementar_version(*modelos):
+    """
+    Cambiar la versión de los modelos al confirmar la transacción. Antes
+    de confirmar, otra petición podría guardar los datos viejos con la
+    versión nueva.
+    """
+    etiquetas = _etiquetas(modelos)
+
+    def incrementar():
+        ahora = time.time_ns()
+        leidas = _leidas.get()
+        if leidas is not None:
+            for etiqueta in etiquetas:
+                leidas.pop(etiqueta, None)
+        # La hora actual, o una más que la guardada si el reloj de otro
+        # proceso iba adelantado: la versión nunca se repite
+        actualizadas = VersionModelo.objects.filter(modelo__in=etiquetas).update(
+            version=Greatest(F('version') + 1, Value(ahora)),
+        )
+        if actualizadas < len(set(etiquetas)):
+            VersionModelo.objects.bulk_create(
+                [VersionModelo(modelo=etiqueta, version=ahora) for etiqueta in set(etiquetas)],
+                ignore_conflicts=True,
+            )
+
+    transaction.on_commit(incrementar)
@@ -0,0 +1,304 @@
+"""
+Métricas de rendimiento por vista.
+
+``MetricasMiddleware`` mide cada petición: cantidad y tiempo de las
+consultas SQL (con una envoltura de ``execute_wrappers``), tiempo de render de
+plantillas (con el backend ``PlantillasMedidas``), tiempo total y tamaño
+de la respuesta. Los valores se envían en la cabecera ``Server-Timing``,
+que el navegador muestra en la pestaña de red, y se acumulan por nombre
+de vista en histogramas del proceso que ``/metrics`` expone en el formato
+de texto de Prometheus con los percentiles 50, 95 y 99.
+
+Los histogramas tienen límites fijos, así que registrar un valor es una
+búsqueda binaria y una suma, y la memoria no crece con las peticiones.
+Los percentiles se interpolan dentro del intervalo, como
+``histogram_quantile`` de Prometheus, sin salirse del mínimo y el máximo
+observados. Cada proceso del servidor tiene sus propios histogramas.
+
+Se activan con ``METRICAS_ACTIVAS`` (variable de entorno
+``SENA_METRICAS=1``); desactivadas, que es lo predeterminado, el
+middleware se retira de la cadena y las plantillas usan el backend de
+Django sin envoltura. Activas, se miden todas las peticiones, pero la
+cabecera y ``/metrics`` son solo para los clientes que ``autorizado``
+acepta: las IP de ``INTERNAL_IPS`` o quien envíe el ``METRICAS_TOKEN``.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+
+CUANTILES = (0.5, 0.95, 0.99)
+
+# Límites superiores de los intervalos de cada histograma
+LIMITES_SEGUNDOS = tuple(0.0005 * 2 ** i for i in range(17))  # 0,5 ms a ~33 s
+LIMITES_CONSULTAS = (0, 1, 2, 3, 4, 5, 8, 10, 15, 20, 30, 50, 100, 200, 500, 1000)
+LIMITES_BYTES = tuple(256 * 4 ** i for i in range(10))  # 256 B a 64 MiB
+
+# (nombre, ayuda, límites, cómo se obtiene de la medición)
+METRICAS = [
+    ('sena_peticion_segundos', 'Tiempo total de la petición', LIMITES_SEGUNDOS, 'total'),
+    ('sena_sql_consultas', 'Consultas SQL por petición', LIMITES_CONSULTAS, 'consultas'),
+    ('sena_sql_segundos', 'Tiempo en consultas SQL por petición', LIMITES_SEGUNDOS, 'sql'),
+    ('sena_plantillas_segundos', 'Tiempo de render de plantillas por petición', LIMITES_SEGUNDOS, 'plantillas'),
+    ('sena_respuesta_bytes', 'Tamaño del cuerpo de la respuesta', LIMITES_BYTES, 'bytes'),
+]
+
+_medicion = ContextVar('sena_medicion', default=None)
+
+
+class Medicion:
+    """Acumuladores de una petición"""
+
+    __slots__ = ('consultas', 'sql', 'plantillas', 'profundidad')
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql = 0.0
+        self.plantillas = 0.0
+        self.profundidad = 0
+
+
+def medir_consulta(execute, sql, params, many, context):
+    """
+    Envoltura instalada de forma permanente en cada conexión. Con vistas
+    async las consultas corren en el hilo del ejecutor de la petición, no
+    en el del middleware, así que la medición se busca en el contexto
+    (que asgiref copia a ese hilo).
+    """
+    medicion = _medicion.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.sql += time.perf_counter() - inicio
+        medicion.consultas += 1
+
+
+def instalar_medidor(sender=None, connection=None, **kwargs):
+    """
+    En cada conexión nueva (``connection_created``) y, al empezar cada
+    petición, en las que ya estaban abiertas en el hilo que la atiende
+    """
+    conexiones = [connection] if connection is not None else connections.all(initialized_only=True)
+    for conexion in conexiones:
+        if medir_consulta not in conexion.execute_wrappers:
+            conexion.execute_wrappers.append(medir_consulta)
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        # Un intervalo más para los valores por encima del último límite
+        self.conteos = [0] * (len(limites) + 1)
+        self.suma = 0
+        self.total = 0
+        self.minimo = self.maximo = None
+        self.candado = threading.Lock()
+
+    def observar(self, valor):
+        posicion = bisect_left(self.limites, valor)
+        with self.candado:
+            self.conteos[posicion] += 1
+            self.suma += valor
+            self.total += 1
+            if self.total == 1:
+                self.minimo = self.maximo = valor
+            elif valor < self.minimo:
+                self.minimo = valor
+            elif valor > self.maximo:
+                self.maximo = valor
+
+    def cuantil(self, q):
+        with self.candado:
+            conteos, total = list(self.conteos), self.total
+            minimo, maximo = self.minimo, self.maximo
+        if not total:
+            return 0
+        return min(max(self._interpolar(conteos, total, q), minimo), maximo)
+
+    def _interpolar(self, conteos, total, q):
+        objetivo = q * total
+        acumulado = 0
+        for posicion, conteo in enumerate(conteos):
+            if acumulado + conteo >= objetivo and conteo:
+                if posicion == len(self.limites):
+                    return self.limites[-1]
+                inferior = self.limites[posicion - 1] if posicion else 0
+                superior = self.limites[posicion]
+                return inferior + (superior - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+        return self.limites[-1]
+
+
+class Registro:
+    """Histogramas por (métrica, vista) del proceso"""
+
+    def __init__(self):
+        self.histogramas = {}
+        self.candado = threading.Lock()
+
+    def observar(self, metrica, vista, valor, limites):
+        histograma = self.histogramas.get((metrica, vista))
+        if histograma is None:
+            with self.candado:
+                histograma = self.histogramas.setdefault((metrica, vista), Histograma(limites))
+        histograma.observar(valor)
+
+    def limpiar(self):
+        with self.candado:
+            self.histogramas.clear()
+
+    def prometheus(self):
+        lineas = []
+        for nombre, ayuda, _, _ in METRICAS:
+            series = sorted(
+                (vista, histograma) for (metrica, vista), histograma in list(self.histogramas.items())
+                if metrica == nombre
+            )
+            if not series:
+                continue
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} summary')
+            for vista, histograma in series:
+                etiqueta = f'vista="{_escapar(vista)}"'
+                for q in CUANTILES:
+                    lineas.append(f'{nombre}{{{etiqueta},quantile="{q}"}} {_numero(histograma.cuantil(q))}')
+                lineas.append(f'{nombre}_sum{{{etiqueta}}} {_numero(histograma.suma)}')
+                lineas.append(f'{nombre}_count{{{etiqueta}}} {histograma.total}')
+        return '\n'.join(lineas) + '\n'
+
+
+registro = Registro()
+
+
+class MetricasMiddleware:
+    """
+    Va primero en MIDDLEWARE para que el tiempo total incluya a los demás.
+    Funciona con WSGI y con ASGI sin pasar las vistas async a un hilo.
+    En las respuestas en flujo (exportaciones CSV) el cuerpo se genera
+    después de que la petición sale de aquí: se mide hasta las cabeceras y
+    el tamaño no se conoce.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICAS_ACTIVAS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(instalar_medidor, dispatch_uid='sena_metricas_conexion')
+        request_started.connect(instalar_medidor, dispatch_uid='sena_metricas_peticion')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    def registrar(self, request, response, medicion, total):
+        tamano = None if response.streaming else len(response.content)
+        if autorizado(request):
+            response['Server-Timing'] = ', '.join([
+                f'sql;dur={medicion.sql * 1000:.1f};desc="{medicion.consultas} consultas"',
+                f'plantillas;dur={medicion.plantillas * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+
+        coincidencia = request.resolver_match
+        if coincidencia:
+            vista = coincidencia.view_name
+        elif request.path_info.startswith(settings.STATIC_URL):
+            vista = 'estaticos'
+        else:
+            vista = 'sin_ruta'
+        valores = {
+            'total': total, 'consultas': medicion.consultas, 'sql': medicion.sql,
+            'plantillas': medicion.plantillas, 'bytes': tamano,
+        }
+        for nombre, _, limites, clave in METRICAS:
+            if valores[clave] is not None:
+                registro.observar(nombre, vista, valores[clave], limites)
+        return response
+
+
+class PlantillaMedida(Template):
+    def render(self, context=None, request=None):
+        medicion = _medicion.get()
+        if medicion is None:
+            return super().render(context, request)
+        # Solo cuenta el render más externo: una plantilla renderizada
+        # desde otra ya está dentro de su tiempo
+        medicion.profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicion.profundidad -= 1
+            if not medicion.profundidad:
+                medicion.plantillas += time.perf_counter() - inicio
+
+
+class PlantillasMedidas(DjangoTemplates):
+    """Backend de plantillas de Django que suma el tiempo de render a la petición en curso"""
+
+    def from_string(self, template_code):
+        return PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return PlantillaMedida(super().get_template(template_name).template, self)
+
+
+def autorizado(request):
+    """Cliente de INTERNAL_IPS, o con ``Authorization: Bearer <METRICAS_TOKEN>``"""
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'INTERNAL_IPS', ())
+
+
+def exponer(request):
+    if not getattr(settings, 'METRICAS_ACTIVAS', False):
+        raise Http404('Las métricas están desactivadas.')
+    if not autorizado(request):
+        raise PermissionDenied('Las métricas son solo para INTERNAL_IPS o con METRICAS_TOKEN.')
+    return HttpResponse(registro.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor):
+    return f'{valor:.6g}' if isinstance(valor, float) else str(valor)
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionModelo',
+            fields=[
+                ('modelo', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Modelo')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Versión')),
+            ],
+            options={
+                'verbose_name': 'Versión de Modelo',
+                'verbose_name_plural': 'Versiones de Modelos',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class VersionModelo(models.Model):
+    """
+    Versión de los fragmentos de plantilla de un modelo (ver
+    SENA_APP/fragmentos.py): la hora de su último cambio en nanosegundos.
+    Está en la base y no en la caché para que todos los procesos la vean.
+    """
+    modelo = models.CharField(max_length=100, primary_key=True, verbose_name="Modelo")
+    version = models.BigIntegerField(default=0, verbose_name="Versión")
+
+    class Meta:
+        verbose_name = "Versión de Modelo"
+        verbose_name_plural = "Versiones de Modelos"
+
+    def __str__(self):
+        return f"{self.modelo} ({self.version})"
@@ -0,0 +1,241 @@
+"""
+Paginación por cursor (keyset) para las listas de la aplicación.
+
+A diferencia de ``django.core.paginator.Paginator``, no usa OFFSET: cada
+página se obtiene filtrando a partir de los valores de ordenamiento del
+último (o primer) registro mostrado, así que el costo de cualquier página
+es proporcional a su tamaño, sin importar qué tan profunda sea.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no pudo decodificarse"""
+
+
+class KeysetPaginator:
+    """
+    Pagina un queryset por cursor.
+
+    ``ordenamiento`` es una tupla de nombres de campo o de anotaciones del
+    queryset (con ``-`` para orden descendente) que debe identificar de
+    forma única cada fila, por lo que el último campo suele ser ``id``. Los
+    campos no pueden ser nulos.
+    """
+
+    parametro_siguiente = 'despues'
+    parametro_anterior = 'antes'
+
+    def __init__(self, queryset, ordenamiento, por_pagina=50):
+        self.queryset = queryset
+        self.ordenamiento = tuple(ordenamiento)
+        self.por_pagina = por_pagina
+        self.campos = [campo.lstrip('-') for campo in self.ordenamiento]
+        self.descendente = [campo.startswith('-') for campo in self.ordenamiento]
+
+    def pagina(self, request):
+        """Construir la página pedida por los parámetros GET de la petición"""
+        parametros = request.GET
+        try:
+            if parametros.get(self.parametro_anterior):
+                cursor = self.decodificar(parametros[self.parametro_anterior])
+                return PaginaKeyset(self, request, cursor, hacia_atras=True)
+            if parametros.get(self.parametro_siguiente):
+                cursor = self.decodificar(parametros[self.parametro_siguiente])
+                return PaginaKeyset(self, request, cursor)
+        except CursorInvalido:
+            pass
+        return PaginaKeyset(self, request, None)
+
+    # Codificación del cursor
+
+    def codificar(self, fila):
+        valores = [_serializar(_valor(fila, campo)) for campo in self.campos]
+        datos = json.dumps(valores, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(datos).decode().rstrip('=')
+
+    def decodificar(self, cursor):
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        except (ValueError, TypeError):
+            raise CursorInvalido(cursor)
+        if not isinstance(valores, list) or len(valores) != len(self.campos):
+            raise CursorInvalido(cursor)
+        try:
+            return [self._convertir(campo, valor) for campo, valor in zip(self.campos, valores)]
+        except Exception:
+            raise CursorInvalido(cursor)
+
+    def _convertir(self, campo, valor):
+        try:
+            return self.queryset.model._meta.get_field(campo).to_python(valor)
+        except FieldDoesNotExist:
+            # Anotaciones (por ejemplo Lower('apellido')): el valor va tal cual
+            return valor
+
+    # Construcción de la consulta
+
+    def filtro(self, cursor, hacia_atras=False):
+        """
+        Condición lexicográfica "fila posterior al cursor" (o anterior si
+        ``hacia_atras``), expresada como OR de prefijos iguales para que
+        la base de datos pueda recorrer el índice de ordenamiento.
+
+        Se antepone la cota (redundante) sobre el primer campo: sin ella el
+        OR impide usar el índice como rango y la consulta recorre el índice
+        desde el principio hasta llegar al cursor.
+        """
+        condicion = Q()
+        for i, campo in enumerate(self.campos):
+            termino = Q(**{f'{campo}__{self._operador(i, hacia_atras)}': cursor[i]})
+            for anterior, valor in zip(self.campos[:i], cursor[:i]):
+                termino &= Q(**{anterior: valor})
+            condicion |= termino
+        if len(self.campos) > 1:
+            cota = Q(**{f'{self.campos[0]}__{self._operador(0, hacia_atras)}e': cursor[0]})
+            condicion = cota & condicion
+        return condicion
+
+    def _operador(self, i, hacia_atras):
+        ascendente = self.descendente[i] == hacia_atras
+        return 'gt' if ascendente else 'lt'
+
+    def orden(self, hacia_atras=False):
+        if not hacia_atras:
+            return self.ordenamiento
+        return tuple(
+            campo if desc else f'-{campo}'
+            for campo, desc in zip(self.campos, self.descendente)
+        )
+
+
+class PaginaKeyset:
+    """
+    Página de resultados. La consulta se ejecuta de forma perezosa la
+    primera vez que se recorre la página o se consulta si hay más páginas.
+    """
+
+    def __init__(self, paginator, request, cursor, hacia_atras=False):
+        self.paginator = paginator
+        self.request = request
+        self.cursor = cursor
+        self.hacia_atras = hacia_atras
+
+    def _consulta(self):
+        paginator = self.paginator
+        queryset = paginator.queryset
+        if self.cursor is not None:
+            queryset = queryset.filter(paginator.filtro(self.cursor, self.hacia_atras))
+        queryset = queryset.order_by(*paginator.orden(self.hacia_atras))
+        return queryset[:paginator.por_pagina + 1]
+
+    def _recortar(self, filas):
+        hay_mas = len(filas) > self.paginator.por_pagina
+        filas = filas[:self.paginator.por_pagina]
+        if self.hacia_atras:
+            filas.reverse()
+        return filas, hay_mas
+
+    @cached_property
+    def _resultado(self):
+        return self._recortar(list(self._consulta()))
+
+    async def acargar(self):
+        """
+        Ejecutar la consulta con el ORM asíncrono, para que la plantilla
+        pueda recorrer la página desde una vista async.
+        """
+        if '_resultado' not in self.__dict__:
+            self.__dict__['_resultado'] = self._recortar([fila async for fila in self._consulta()])
+        return self
+
+    @property
+    def object_list(self):
+        return self._resultado[0]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        filas, hay_mas = self._resultado
+        if self.hacia_atras:
+            return self.cursor is not None
+        return hay_mas
+
+    def has_previous(self):
+        filas, hay_mas = self._resultado
+        if self.hacia_atras:
+            return hay_mas
+        return self.cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def clave_cache(self):
+        """
+        Identifica la página en la clave de un fragmento de caché, sin
+        consultar. Incluye los demás parámetros GET, que los enlaces de
+        paginación conservan (ver ``_url``).
+        """
+        if self.cursor is None:
+            clave = 'inicio'
+        else:
+            direccion = 'antes' if self.hacia_atras else 'despues'
+            clave = f'{direccion}:{json.dumps([_serializar(valor) for valor in self.cursor])}'
+        otros = self._otros_parametros()
+        if otros:
+            clave = f'{clave}?{otros.urlencode()}'
+        return clave
+
+    def next_url(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        cursor = self.paginator.codificar(self.object_list[-1])
+        return self._url(self.paginator.parametro_siguiente, cursor)
+
+    def previous_url(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        cursor = self.paginator.codificar(self.object_list[0])
+        return self._url(self.paginator.parametro_anterior, cursor)
+
+    def _otros_parametros(self):
+        """Los parámetros GET de la petición sin los del cursor, ordenados"""
+        parametros = QueryDict(mutable=True)
+        for nombre, valores in sorted(self.request.GET.lists()):
+            if nombre not in (self.paginator.parametro_siguiente, self.paginator.parametro_anterior):
+                parametros.setlist(nombre, valores)
+        return parametros
+
+    def _url(self, parametro, cursor):
+        """Conservar los demás parámetros GET (filtros) al cambiar de página"""
+        parametros = self._otros_parametros()
+        parametros[parametro] = cursor
+        return f'?{parametros.urlencode()}'
+
+
+def _valor(fila, campo):
+    if isinstance(fila, dict):
+        return fila[campo]
+    return getattr(fila, campo)
+
+
+def _serializar(valor):
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor
@@ -0,0 +1,114 @@
+"""
+Utilidades compartidas por las pruebas de las apps.
+
+``PresupuestoVistasMixin`` visita cada URL de una app con un conjunto de
+datos sembrado, vuelve a visitarlas después de multiplicar las filas y
+comprueba que:
+
+* la cantidad de consultas no supera el presupuesto de la vista,
+* esa cantidad no cambia al crecer los datos (un N+1 sí cambia),
+* el tiempo de respuesta no pasa del límite de la vista.
+
+Los tiempos medidos se pueden guardar en un CSV con la variable de
+entorno ``SENA_REPORTE_TIEMPOS`` para comparar entre versiones.
+"""
+
+import csv
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from cursos.semillas import sembrar
+
+# Milisegundos por vista si la prueba no indica otro límite
+TIEMPO_MAXIMO_MS = 500
+
+
+class PresupuestoVistasMixin:
+    """
+    Mezclar con ``TestCase`` y definir ``vistas()``, que devuelve tuplas
+    ``(nombre, url, consultas)`` o ``(nombre, url, consultas, milisegundos)``.
+    Se llama una vez por cada tamaño de datos, así que puede elegir en cada
+    momento los objetos con más relaciones; el nombre identifica la vista
+    entre ambas pasadas.
+    """
+
+    escala_inicial = dict(programas=3, instructores=6, cursos=4, aprendices=60)
+    escala_ampliada = dict(programas=12, instructores=24, cursos=16, aprendices=240)
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(**cls.escala_inicial, azar=random.Random(11))
+
+    def setUp(self):
+        limpiar_caches()
+
+    def vistas(self):
+        raise NotImplementedError
+
+    def medir(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            respuesta = self.client.get(url)
+            if respuesta.streaming:
+                b''.join(respuesta.streaming_content)
+            milisegundos = (time.perf_counter() - inicio) * 1000
+        return respuesta.status_code, consultas.captured_queries, milisegundos
+
+    def test_presupuesto_de_consultas_y_tiempo(self):
+        # Primera pasada: datos iniciales (y plantillas ya compiladas para la segunda)
+        antes = {nombre: self.medir(url) for nombre, url, *_ in self.vistas()}
+        sembrar(**self.escala_ampliada, azar=random.Random(12))
+        limpiar_caches()
+        for nombre, url, presupuesto, *limite in self.vistas():
+            limite_ms = limite[0] if limite else TIEMPO_MAXIMO_MS
+            with self.subTest(vista=nombre, url=url):
+                codigo, consultas, milisegundos = self.medir(url)
+                self.assertEqual(codigo, 200)
+                sql = '\n'.join(consulta['sql'] for consulta in consultas)
+                self.assertLessEqual(
+                    len(consultas), presupuesto,
+                    f'{url} hizo {len(consultas)} consultas (presupuesto {presupuesto}):\n{sql}',
+                )
+                anteriores = antes[nombre][1]
+                self.assertEqual(
+                    len(consultas), len(anteriores),
+                    f'{url}: las consultas crecen con los datos ({len(anteriores)} -> {len(consultas)}):\n{sql}',
+                )
+                self.assertLess(
+                    milisegundos, limite_ms,
+                    f'{url} tardó {milisegundos:.0f} ms (límite {limite_ms} ms)',
+                )
+                registrar_tiempo(nombre, url, len(consultas), milisegundos)
+
+
+def limpiar_caches():
+    """Totales del tablero y fragmentos de plantilla"""
+    for alias in caches:
+        caches[alias].clear()
+
+
+def con_metricas():
+    """
+    Decorador con las métricas activas, como con SENA_METRICAS=1: el
+    middleware y el backend de plantillas solo se instalan al cargar settings
+    """
+    plantillas = {**settings.TEMPLATES[0], 'BACKEND': 'SENA_APP.metricas.PlantillasMedidas'}
+    return override_settings(
+        METRICAS_ACTIVAS=True,
+        MIDDLEWARE=['SENA_APP.metricas.MetricasMiddleware', *settings.MIDDLEWARE],
+        TEMPLATES=[plantillas, *settings.TEMPLATES[1:]],
+    )
+
+
+def registrar_tiempo(vista, url, consultas, milisegundos):
+    ruta = os.environ.get('SENA_REPORTE_TIEMPOS')
+    if not ruta:
+        return
+    with open(ruta, 'a', newline='', encoding='utf-8') as archivo:
+        csv.writer(archivo).writerow([vista, url, consultas, f'{milisegundos:.1f}'])
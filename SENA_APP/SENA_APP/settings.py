@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,15 +38,23 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # PRAGMA de cada conexión SQLite (SENA_APP/basedatos.py) y versiones de
+    # los fragmentos de plantilla (SENA_APP/fragmentos.py)
+    'SENA_APP',
     'aprendices',
     'bootstrap5',
     'instructores',
     'programas',
     'cursos',
+    'busqueda',
+    'api',
+    'reportes',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Archivos de STATIC_ROOT con hash y precomprimidos (ver SENA_APP/estaticos.py)
+    'SENA_APP.estaticos.EstaticosMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,7 +68,13 @@ ROOT_URLCONF = 'SENA_APP.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        # Las apps guardan sus plantillas en "Templates" (con mayúscula), que el
+        # cargador de APP_DIRS no encuentra en sistemas de archivos sensibles
+        # a mayúsculas.
+        'DIRS': [
+            BASE_DIR / app / 'Templates'
+            for app in ['aprendices', 'instructores', 'programas', 'cursos', 'busqueda', 'reportes']
+        ],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -71,8 +86,29 @@ TEMPLATES = [
     },
 ]
 
+# Métricas por vista: cabecera Server-Timing y /metrics en formato Prometheus
+# (ver SENA_APP/metricas.py). Desactivadas salvo con SENA_METRICAS=1; sin
+# ellas no se instala nada. Activas, solo las ven las IP de INTERNAL_IPS y
+# quien envíe "Authorization: Bearer <SENA_METRICAS_TOKEN>" (el recolector
+# de Prometheus). Detrás de un proxy en la misma máquina todas las
+# peticiones llegan desde 127.0.0.1: ahí deje SENA_INTERNAL_IPS vacía y use
+# el token.
+METRICAS_ACTIVAS = os.environ.get('SENA_METRICAS', '0') == '1'
+METRICAS_TOKEN = os.environ.get('SENA_METRICAS_TOKEN', '')
+INTERNAL_IPS = [ip for ip in os.environ.get('SENA_INTERNAL_IPS', '127.0.0.1').split(',') if ip]
+
+if METRICAS_ACTIVAS:
+    MIDDLEWARE.insert(0, 'SENA_APP.metricas.MetricasMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'SENA_APP.metricas.PlantillasMedidas'
+
 WSGI_APPLICATION = 'SENA_APP.wsgi.application'
 
+# Vistas de lectura asíncronas (inicio, listas y detalles). SENA_APP/asgi.py
+# las activa; con WSGI cada vista async necesitaría su propio ciclo de eventos
+# y las síncronas son más rápidas.
+# Comparar ambos caminos: python manage.py benchmark_asgi
+VISTAS_ASINCRONAS = os.environ.get('SENA_VISTAS_ASINCRONAS', '0') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -80,10 +116,72 @@ WSGI_APPLICATION = 'SENA_APP.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SENA_DB_NOMBRE', BASE_DIR / 'db.sqlite3'),
+        # Base de pruebas en archivo (no en memoria compartida) para que las
+        # pruebas concurrentes usen el mismo bloqueo que en producción
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# PRAGMA que se aplican a cada conexión SQLite nueva (ver SENA_APP/basedatos.py)
+SQLITE_PRAGMAS = {}
+
+# Perfil de base de datos para producción, activado con SENA_DB_PERFIL=produccion.
+# WAL deja leer mientras otro escribe, las conexiones persisten entre peticiones
+# y las transacciones toman el bloqueo de escritura al empezar, lo que evita los
+# errores "database is locked" con escrituras concurrentes.
+# Comparar ambos perfiles: python manage.py benchmark_concurrencia
+DB_PERFIL = os.environ.get('SENA_DB_PERFIL', 'desarrollo')
+
+if DB_PERFIL == 'produccion':
+    DATABASES['default'].update({
+        # django.db.backends.sqlite3 con BEGIN IMMEDIATE (ver SENA_APP/sqlite/base.py)
+        'ENGINE': 'SENA_APP.sqlite',
+        'CONN_MAX_AGE': int(os.environ.get('SENA_DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+    })
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # En WAL, NORMAL solo sincroniza en los checkpoints: una caída del
+        # sistema operativo puede perder las últimas transacciones, nunca
+        # corromper la base
+        'synchronous': 'NORMAL',
+        # Milisegundos que una escritura espera el bloqueo antes de fallar
+        'busy_timeout': 20000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Negativo = KiB: 64 MiB de caché de páginas por conexión
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# LocMemCache es por proceso; con varios procesos de servidor conviene una
+# caché compartida (Memcached o Redis) para que los totales del tablero y
+# demás valores cacheados sean los mismos en todos.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sena-app',
+    },
+    # Fragmentos de plantilla ({% cache %}) aparte, para que las páginas de
+    # las listas no desalojen los totales del tablero. Cada proceso tiene los
+    # suyos: la clave lleva la versión de los modelos, que se guarda en la
+    # base y es la misma para todos (ver SENA_APP/fragmentos.py)
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sena-fragmentos',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
+# Segundos que duran los totales del tablero antes de recontarse
+DASHBOARD_CACHE_TIMEOUT = 60 * 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,8 +225,19 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
-# Opcional: carpeta donde `collectstatic` recopilaría archivos en despliegue
-# STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Carpeta donde `collectstatic` recopila los archivos en despliegue, con el
+# hash del contenido en el nombre y sus variantes .gz/.br (y .br solo si
+# está instalado el paquete brotli)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'SENA_APP.estaticos.EstaticosComprimidos',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
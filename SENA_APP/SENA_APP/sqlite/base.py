@@ -0,0 +1,18 @@
+"""
+Backend SQLite del perfil de producción.
+
+Es el backend de Django con una sola diferencia: ``transaction.atomic()``
+abre la transacción con ``BEGIN IMMEDIATE``. Con el ``BEGIN`` (diferido)
+por defecto, una transacción que primero lee y después escribe pide el
+bloqueo de escritura a mitad de camino; si otra conexión escribió en el
+intervalo, SQLite responde "database is locked" de inmediato, sin respetar
+el busy_timeout. Pidiendo el bloqueo al empezar, la transacción espera su
+turno. Las consultas fuera de ``atomic()`` no cambian.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from SENA_APP import autocompletar, metricas
+
 urlpatterns = [
     
     path('admin/', admin.site.urls),
@@ -24,4 +26,9 @@ urlpatterns = [
     path('instructores/', include('instructores.urls')),
     path('programas/', include('programas.urls')),
     path('cursos/', include('cursos.urls')),
+    path('buscar/', include('busqueda.urls')),
+    path('api/', include('api.urls')),
+    path('reportes/', include('reportes.urls')),
+    path('autocompletar/<str:fuente>/', autocompletar.buscar, name='autocompletar'),
+    path('metrics', metricas.exponer, name='metricas'),
 ]
\ No newline at end of file
@@ -0,0 +1,116 @@
+import random
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from SENA_APP.pruebas import PresupuestoVistasMixin
+from aprendices.models import Aprendiz
+from cursos.models import Curso
+from cursos.semillas import sembrar
+from instructores.carga import con_carga
+from programas.models import Programa
+
+
+class PresupuestoVistasApiTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de api/urls.py"""
+
+    def vistas(self):
+        curso = Curso.objects.order_by('id').first()
+        vistas = [
+            ('lista_cursos_con_programa', reverse('api:lista', args=['cursos']) + '?fields=programa_nombre', 1),
+            ('detalle_cursos', reverse('api:detalle', args=['cursos', curso.id]), 1),
+        ]
+        for recurso in ('aprendices', 'instructores', 'programas', 'carga_instructores'):
+            vistas.append((f'lista_{recurso}', reverse('api:lista', args=[recurso]), 1))
+        return vistas
+
+
+class ApiTests(TestCase):
+    """Campos por defecto y pedidos, errores y paginación por cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(programas=3, instructores=4, cursos=3, aprendices=30, azar=random.Random(5))
+
+    def get(self, url, **parametros):
+        respuesta = self.client.get(url, parametros)
+        return respuesta.status_code, respuesta.json()
+
+    def test_programas_sin_textos_largos_salvo_que_se_pidan(self):
+        url = reverse('api:lista', args=['programas'])
+        with CaptureQueriesContext(connection) as consultas:
+            codigo, datos = self.get(url)
+        self.assertEqual(codigo, 200)
+        self.assertNotIn('descripcion', datos['resultados'][0])
+        self.assertNotIn('"descripcion"', consultas[0]['sql'])
+
+        programa = Programa.objects.order_by('nombre', 'id').first()
+        codigo, datos = self.get(url, fields='codigo,descripcion')
+        self.assertEqual(datos['resultados'][0], {
+            'id': programa.id, 'codigo': programa.codigo, 'descripcion': programa.descripcion,
+        })
+
+    def test_campos_desconocidos(self):
+        codigo, datos = self.get(reverse('api:lista', args=['aprendices']), fields='firstname,clave')
+        self.assertEqual(codigo, 400)
+        self.assertIn('clave', datos['error'])
+
+    def test_aprendices_sin_el_programa_anterior(self):
+        url = reverse('api:lista', args=['aprendices'])
+        codigo, datos = self.get(url)
+        self.assertEqual(codigo, 200)
+        self.assertNotIn('program_legacy', datos['resultados'][0])
+        self.assertIn('programa_id', datos['resultados'][0])
+        self.assertEqual(self.get(url, fields='program_legacy')[0], 400)
+        aprendiz = Aprendiz.objects.first()
+        self.assertNotIn('program_legacy', self.get(reverse('api:detalle', args=['aprendices', aprendiz.id]))[1])
+
+    def test_paginacion_por_cursor_recorre_todo(self):
+        url = reverse('api:lista', args=['aprendices'])
+        vistos = []
+        codigo, datos = self.get(url, fields='firstname', limite=7)
+        while True:
+            self.assertTrue(all(set(fila) == {'id', 'firstname'} for fila in datos['resultados']))
+            vistos += [fila['id'] for fila in datos['resultados']]
+            if not datos['siguiente']:
+                break
+            datos = self.client.get(datos['siguiente']).json()
+        esperados = list(Aprendiz.objects.order_by('lastname', 'id').values_list('id', flat=True))
+        self.assertEqual(vistos, esperados)
+        self.assertIsNotNone(datos['anterior'])
+
+    def test_detalle(self):
+        curso = Curso.objects.select_related('programa').first()
+        codigo, datos = self.get(reverse('api:detalle', args=['cursos', curso.id]), fields='codigo,programa_nombre,cupos_libres')
+        self.assertEqual(codigo, 200)
+        self.assertEqual(datos, {
+            'id': curso.id, 'codigo': curso.codigo, 'programa_nombre': curso.programa.nombre,
+            'cupos_libres': curso.cupos_disponibles(),
+        })
+        self.assertEqual(self.get(reverse('api:detalle', args=['cursos', 0]))[0], 404)
+        self.assertEqual(self.get(reverse('api:lista', args=['usuarios']))[0], 404)
+        self.assertEqual(self.client.post(reverse('api:lista', args=['cursos'])).status_code, 405)
+
+    def test_carga_instructores_ordenada_y_filtrada(self):
+        url = reverse('api:lista', args=['carga_instructores'])
+        codigo, datos = self.get(url, orden='aprendices', activo='1')
+        self.assertEqual(codigo, 200)
+        esperados = [
+            {
+                'id': instructor.id, 'nombre': instructor.nombre, 'apellido': instructor.apellido,
+                'especialidad': instructor.especialidad, 'activo': True,
+                'total_coordinados': instructor.total_coordinados, 'total_impartidos': instructor.total_impartidos,
+                'aprendices_a_cargo': instructor.aprendices_a_cargo, 'minutos_semanales': instructor.minutos_semanales,
+            }
+            for instructor in con_carga().filter(activo=True).order_by('-aprendices_a_cargo', 'apellido', 'id')
+        ]
+        self.assertEqual(datos['resultados'], esperados)
+        self.assertNotIn('correo', datos['resultados'][0])
+
+        codigo, datos = self.get(url, orden='salario')
+        self.assertEqual(codigo, 400)
+        self.assertIn('salario', datos['error'])
+        # Los recursos sin ordenamientos ignoran ?orden=
+        self.assertEqual(self.get(reverse('api:lista', args=['instructores']), orden='salario')[0], 200)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<str:recurso>/', views.lista, name='lista'),
+    path('<str:recurso>/<int:pk>/', views.detalle, name='detalle'),
+]
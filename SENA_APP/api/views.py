@@ -0,0 +1,179 @@
+"""
+API JSON de solo lectura para aprendices, instructores, programas y cursos.
+
+Cada recurso tiene lista (``/api/<recurso>/``) y detalle
+(``/api/<recurso>/<id>/``). Las filas salen de ``.values()`` y se envían
+tal cual, sin construir instancias de los modelos. Con ``?fields=a,b`` se
+piden solo esos campos (el ``id`` va siempre) y la consulta selecciona
+solo esas columnas; sin él se envían los campos por defecto, que en los
+programas no incluyen los textos largos.
+
+Las listas se paginan por cursor con ``KeysetPaginator``: la respuesta
+trae las URL ``siguiente`` y ``anterior`` (o null) y ``?limite=`` cambia
+el tamaño de la página.
+
+``carga_instructores`` publica la carga de trabajo de cada instructor
+(ver instructores/carga.py). Acepta ``?orden=`` (apellido, coordinados,
+impartidos, aprendices u horas) y los filtros ``?activo=`` y
+``?especialidad=``.
+"""
+
+from django.db.models import F
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from SENA_APP.paginacion import KeysetPaginator
+from aprendices.models import Aprendiz
+from cursos.models import Curso
+from instructores import carga
+from instructores.models import Instructor
+from programas.models import TEXTOS_LARGOS, Programa
+
+POR_PAGINA = 50
+LIMITE_MAXIMO = 500
+
+
+class CamposInvalidos(ValueError):
+    """``?fields=`` pidió campos que el recurso no publica"""
+
+    def __init__(self, campos):
+        self.campos = campos
+        super().__init__(f"Campos desconocidos: {', '.join(campos)}.")
+
+
+class OrdenInvalido(ValueError):
+    """``?orden=`` pidió un ordenamiento que el recurso no ofrece"""
+
+    def __init__(self, orden, opciones):
+        super().__init__(f"Orden desconocido: {orden}. Opciones: {', '.join(opciones)}.")
+
+
+class Recurso:
+    """
+    Modelo publicado en la API. Los campos son las ``columnas`` indicadas
+    o, si no se indican, todas las del modelo (las llaves foráneas como
+    ``programa_id``), más los ``calculados``, expresiones que solo se
+    agregan a la consulta si se piden. Los ``pesados`` se envían solo
+    cuando ``?fields=`` los nombra.
+
+    ``ordenamientos`` son los valores que acepta ``?orden=`` y ``filtrar``
+    una función ``(consulta, request.GET)`` que aplica los filtros de la URL.
+    """
+
+    def __init__(self, modelo, ordenamiento, pesados=(), calculados=None, ordenamientos=None, filtrar=None,
+                 columnas=None):
+        self.modelo = modelo
+        self.ordenamiento = ordenamiento
+        self.ordenamientos = ordenamientos or {}
+        self.filtrar = filtrar
+        self.calculados = calculados or {}
+        if columnas is None:
+            columnas = [campo.attname for campo in modelo._meta.concrete_fields]
+        self.campos = (*columnas, *self.calculados)
+        self.por_defecto = tuple(campo for campo in self.campos if campo not in pesados)
+
+    def elegir_campos(self, parametro):
+        if not parametro:
+            return self.por_defecto
+        pedidos = [campo.strip() for campo in parametro.split(',') if campo.strip()]
+        desconocidos = [campo for campo in pedidos if campo not in self.campos]
+        if desconocidos:
+            raise CamposInvalidos(desconocidos)
+        return tuple(dict.fromkeys(['id', *pedidos]))
+
+    def elegir_ordenamiento(self, parametro):
+        # Los recursos sin ordenamientos ignoran ?orden=
+        if not parametro or not self.ordenamientos:
+            return self.ordenamiento
+        if parametro not in self.ordenamientos:
+            raise OrdenInvalido(parametro, self.ordenamientos)
+        return self.ordenamientos[parametro]
+
+    def filas(self, campos):
+        columnas = [campo for campo in campos if campo not in self.calculados]
+        expresiones = {campo: self.calculados[campo] for campo in campos if campo in self.calculados}
+        return self.modelo.objects.values(*columnas, **expresiones)
+
+
+RECURSOS = {
+    # Sin program_legacy, el texto del programa que quedó sin normalizar
+    'aprendices': Recurso(
+        Aprendiz, ('lastname', 'id'),
+        columnas=[
+            'id', 'document', 'firstname', 'lastname', 'phone', 'email', 'birthdate', 'city',
+            'programa_id', 'fecha_actualizacion',
+        ],
+        calculados={'programa_nombre': F('programa__nombre')},
+    ),
+    'instructores': Recurso(Instructor, ('apellido', 'id')),
+    'programas': Recurso(Programa, ('nombre', 'id'), pesados=TEXTOS_LARGOS),
+    # Sin los datos personales del instructor, salvo que se pidan
+    'carga_instructores': Recurso(
+        Instructor, carga.ORDENAMIENTOS[carga.ORDEN_POR_DEFECTO],
+        pesados=[campo.attname for campo in Instructor._meta.concrete_fields if campo.attname not in carga.CAMPOS_INSTRUCTOR],
+        calculados=carga.anotaciones(), ordenamientos=carga.ORDENAMIENTOS, filtrar=carga.filtrar,
+    ),
+    'cursos': Recurso(
+        Curso, ('-fecha_inicio', '-id'),
+        calculados={
+            'programa_nombre': F('programa__nombre'),
+            'cupos_libres': F('cupos_maximos') - F('inscritos'),
+        },
+    ),
+}
+
+
+def _error(mensaje, status):
+    return JsonResponse({'error': mensaje}, status=status)
+
+
+def _limite(request):
+    try:
+        limite = int(request.GET.get('limite', POR_PAGINA))
+    except ValueError:
+        return POR_PAGINA
+    return min(max(limite, 1), LIMITE_MAXIMO)
+
+
+@require_safe
+def lista(request, recurso):
+    recurso = RECURSOS.get(recurso)
+    if recurso is None:
+        return _error('Recurso no encontrado.', 404)
+    try:
+        campos = recurso.elegir_campos(request.GET.get('fields'))
+        ordenamiento = recurso.elegir_ordenamiento(request.GET.get('orden'))
+    except (CamposInvalidos, OrdenInvalido) as error:
+        return _error(str(error), 400)
+
+    # El cursor se arma con los campos de ordenamiento, aunque no se hayan pedido
+    orden = [campo.lstrip('-') for campo in ordenamiento]
+    consulta = recurso.filas(tuple(dict.fromkeys([*campos, *orden])))
+    if recurso.filtrar:
+        consulta = recurso.filtrar(consulta, request.GET)
+    pagina = KeysetPaginator(consulta, ordenamiento, por_pagina=_limite(request)).pagina(request)
+    siguiente, anterior = pagina.next_url(), pagina.previous_url()
+
+    filas = pagina.object_list
+    if not set(orden) <= set(campos):
+        filas = [{campo: fila[campo] for campo in campos} for fila in filas]
+    return JsonResponse({
+        'resultados': filas,
+        'siguiente': request.build_absolute_uri(siguiente) if siguiente else None,
+        'anterior': request.build_absolute_uri(anterior) if anterior else None,
+    })
+
+
+@require_safe
+def detalle(request, recurso, pk):
+    recurso = RECURSOS.get(recurso)
+    if recurso is None:
+        return _error('Recurso no encontrado.', 404)
+    try:
+        campos = recurso.elegir_campos(request.GET.get('fields'))
+    except CamposInvalidos as error:
+        return _error(str(error), 400)
+    fila = recurso.filas(campos).filter(pk=pk).first()
+    if fila is None:
+        return _error('Registro no encontrado.', 404)
+    return JsonResponse(fila)
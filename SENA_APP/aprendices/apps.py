@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AprendicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aprendices'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
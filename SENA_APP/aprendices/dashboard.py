@@ -0,0 +1,95 @@
+"""
+Totales del tablero de inicio guardados en caché.
+
+Cada total vive en su propia clave para poder ajustarlo con ``cache.incr``
+desde las señales de guardado y borrado, sin volver a contar la tabla. Si
+una clave falta (primer acceso, expiración o invalidación tras una carga
+masiva) solo ese total se recalcula con un COUNT.
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from cursos.models import Curso
+from instructores.models import Instructor
+from programas.models import Programa
+from .models import Aprendiz
+
+MODELOS = {
+    'total_instructores': Instructor,
+    'total_aprendices': Aprendiz,
+    'total_programas': Programa,
+    'total_cursos': Curso,
+}
+
+# Los totales se recalculan al menos cada tanto por si alguna escritura no
+# pasó por las señales (QuerySet.update, SQL directo, otro proceso con otra caché)
+TIEMPO_CACHE = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60 * 15)
+
+
+def _clave(nombre):
+    return f'dashboard:{nombre}'
+
+
+def obtener_totales():
+    """Devolver los cuatro totales, contando solo los que no estén en caché"""
+    en_cache = cache.get_many([_clave(nombre) for nombre in MODELOS])
+    totales, recalculados = {}, {}
+    for nombre, modelo in MODELOS.items():
+        clave = _clave(nombre)
+        if clave in en_cache:
+            totales[nombre] = en_cache[clave]
+        else:
+            totales[nombre] = recalculados[clave] = modelo.objects.count()
+    if recalculados:
+        cache.set_many(recalculados, TIEMPO_CACHE)
+    return totales
+
+
+async def aobtener_totales():
+    """Versión asíncrona de ``obtener_totales``: los COUNT que falten se piden a la vez"""
+    en_cache = await cache.aget_many([_clave(nombre) for nombre in MODELOS])
+    faltantes = [nombre for nombre in MODELOS if _clave(nombre) not in en_cache]
+    conteos = await asyncio.gather(*(MODELOS[nombre].objects.acount() for nombre in faltantes))
+    recalculados = {_clave(nombre): conteo for nombre, conteo in zip(faltantes, conteos)}
+    if recalculados:
+        await cache.aset_many(recalculados, TIEMPO_CACHE)
+    en_cache.update(recalculados)
+    return {nombre: en_cache[_clave(nombre)] for nombre in MODELOS}
+
+
+def ajustar_total(modelo, delta):
+    """
+    Sumar ``delta`` al total del modelo cuando la transacción confirme. Si
+    la clave no está en caché no se hace nada: la próxima lectura la cuenta.
+    """
+    nombre = _nombre(modelo)
+    if nombre is None:
+        return
+
+    def ajustar():
+        try:
+            if delta >= 0:
+                cache.incr(_clave(nombre), delta)
+            else:
+                cache.decr(_clave(nombre), -delta)
+        except ValueError:
+            pass
+
+    transaction.on_commit(ajustar)
+
+
+def invalidar_totales(*modelos):
+    """Descartar los totales (de los modelos dados, o todos) tras cargas masivas"""
+    nombres = [_nombre(modelo) for modelo in modelos] if modelos else list(MODELOS)
+    cache.delete_many([_clave(nombre) for nombre in nombres if nombre])
+
+
+def _nombre(modelo):
+    for nombre, candidato in MODELOS.items():
+        if candidato is modelo:
+            return nombre
+    return None
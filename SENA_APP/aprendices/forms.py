@@ -1,4 +1,6 @@
 from django import forms
+
+from SENA_APP.autocompletar import Autocompletar
 from .models import Aprendiz
 
 
@@ -15,7 +17,7 @@ class AprendizForm(forms.ModelForm):
             'email',
             'birthdate',
             'city',
-            'program'
+            'programa'
         ]
         # Widgets personalizados para mejorar la interfaz en el HTML
         widgets = {
@@ -47,9 +49,8 @@ class AprendizForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Ciudad de residencia'
             }),
-            'program': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Programa de formación'
+            'programa': Autocompletar('programas_todos', attrs={
+                'class': 'form-select'
             })
         }
         # Etiquetas personalizadas
@@ -61,7 +62,7 @@ class AprendizForm(forms.ModelForm):
             'email': 'Correo Electrónico',
             'birthdate': 'Fecha de Nacimiento',
             'city': 'Ciudad',
-            'program': 'Programa'
+            'programa': 'Programa'
         }
 
     # Validaciones personalizadas
@@ -80,4 +81,43 @@ class AprendizForm(forms.ModelForm):
             raise forms.ValidationError("El teléfono debe contener solo números.")
         if phone and len(phone) != 10:
             raise forms.ValidationError("El teléfono debe tener 10 dígitos.")
-        return phone
\ No newline at end of file
+        return phone
+
+
+class AprendizImportacionForm(AprendizForm):
+    """
+    Valida una fila de la importación masiva con las mismas reglas que
+    AprendizForm, salvo la unicidad del documento: esa se comprueba por
+    lotes contra la base de datos en lugar de una consulta por fila. El
+    programa llega como texto (código o nombre) y lo resuelve la
+    importación con los programas cargados una sola vez.
+    """
+
+    class Meta(AprendizForm.Meta):
+        fields = [campo for campo in AprendizForm.Meta.fields if campo != 'programa']
+
+    def validate_unique(self):
+        pass
+
+    def validar_fila(self, datos):
+        """
+        Reutilizar el mismo formulario para validar otra fila. Crear un
+        formulario por fila copia todos sus campos y widgets, que es la
+        mayor parte del costo de validar.
+        """
+        self.data = datos
+        self.instance = Aprendiz()
+        self._errors = None
+        return self.is_valid()
+
+
+class ImportarAprendicesForm(forms.Form):
+    """Formulario para subir el archivo CSV de aprendices"""
+
+    archivo = forms.FileField(
+        label='Archivo CSV',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,text/csv'
+        })
+    )
@@ -0,0 +1,228 @@
+"""
+Importación masiva de aprendices desde CSV.
+
+El archivo se recorre como flujo: las filas se validan una a una con
+AprendizImportacionForm y se acumulan en lotes de tamaño fijo. Por cada
+lote se consulta de una vez qué documentos ya existen y se insertan las
+filas válidas con un solo bulk_create, así que la memoria depende del
+tamaño del lote y no del archivo.
+
+Columnas esperadas (encabezado obligatorio): document, firstname,
+lastname, phone, email, birthdate (AAAA-MM-DD), city, program. La
+columna program lleva el código o el nombre de un programa registrado;
+los programas se cargan una sola vez, con la primera fila válida.
+
+El archivo puede venir en UTF-8 (con o sin BOM) o en Windows-1252, como
+lo guarda Excel: ``abrir_csv`` mira el comienzo para elegir. Si aun así
+una línea no se puede leer, la importación se detiene ahí con un error
+de archivo (``error_archivo``) y se conservan las filas anteriores.
+
+Del detalle de las filas rechazadas se guardan solo las primeras
+``MAX_ERRORES``; las demás se cuentan en ``errores_omitidos``. Quien
+necesite todas (el reporte del comando importar_aprendices) las recibe
+una a una con ``al_rechazar``, sin acumularlas.
+"""
+
+import codecs
+import csv
+import time
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, transaction
+
+from SENA_APP.fragmentos import incrementar_version
+from busqueda import indice
+from .dashboard import invalidar_totales
+from .forms import AprendizImportacionForm
+from programas.models import Programa
+from .models import Aprendiz
+
+COLUMNAS = [*AprendizImportacionForm._meta.fields, 'program']
+TAM_LOTE = 1000
+# Filas rechazadas que se guardan con su detalle
+MAX_ERRORES = 100
+
+# Si el comienzo del archivo no es UTF-8 válido
+CODIFICACION_ALTERNATIVA = 'cp1252'
+TAM_MUESTRA = 64 * 1024
+
+
+@dataclass
+class ErrorFila:
+    fila: int
+    documento: str
+    mensajes: list
+
+
+@dataclass
+class ResultadoImportacion:
+    procesadas: int = 0
+    creadas: int = 0
+    errores: list = field(default_factory=list)
+    errores_omitidos: int = 0
+    segundos: float = 0.0
+    error_archivo: str = ''
+    max_errores: int = MAX_ERRORES
+    al_rechazar: object = field(default=None, repr=False)
+
+    @property
+    def rechazadas(self):
+        return len(self.errores) + self.errores_omitidos
+
+    @property
+    def filas_por_segundo(self):
+        if not self.segundos:
+            return 0.0
+        return self.procesadas / self.segundos
+
+    def rechazar(self, error):
+        if self.al_rechazar is not None:
+            self.al_rechazar(error)
+        if len(self.errores) < self.max_errores:
+            self.errores.append(error)
+        else:
+            self.errores_omitidos += 1
+
+
+def detectar_codificacion(binario):
+    """
+    'utf-8-sig' si la muestra del comienzo es UTF-8 válido y, si no,
+    CODIFICACION_ALTERNATIVA. Deja el archivo (binario) en el inicio.
+    """
+    muestra = binario.read(TAM_MUESTRA)
+    binario.seek(0)
+    try:
+        # final=False: un carácter cortado al final de la muestra no es un error
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        return CODIFICACION_ALTERNATIVA
+    return 'utf-8-sig'
+
+
+def abrir_csv(binario, codificacion=None):
+    """
+    Líneas de texto de un archivo binario para ``importar_aprendices``
+    (por defecto, detectando la codificación). Se decodifican una a una:
+    una línea que no se puede leer detiene la importación en su fila.
+    """
+    codificacion = codificacion or detectar_codificacion(binario)
+    return (linea.decode(codificacion) for linea in binario)
+
+
+def importar_aprendices(lineas, tam_lote=TAM_LOTE, delimitador=',', max_errores=MAX_ERRORES, al_rechazar=None):
+    """
+    Importar aprendices desde un iterable de líneas de texto CSV (un
+    archivo abierto en modo texto, por ejemplo). Devuelve un
+    ResultadoImportacion con el detalle de las primeras ``max_errores``
+    filas rechazadas; ``al_rechazar(error)`` recibe todas.
+    """
+    resultado = ResultadoImportacion(max_errores=max_errores, al_rechazar=al_rechazar)
+    inicio = time.perf_counter()
+    lector = csv.DictReader(lineas, delimiter=delimitador)
+
+    try:
+        encabezado = lector.fieldnames or []
+    except (UnicodeDecodeError, csv.Error) as error:
+        _error_de_lectura(resultado, 1, error)
+        return resultado
+    faltantes = [columna for columna in ('document', 'firstname', 'lastname', 'birthdate', 'program')
+                 if columna not in encabezado]
+    if faltantes:
+        resultado.rechazar(ErrorFila(1, '', [f"Faltan columnas: {', '.join(faltantes)}"]))
+        return resultado
+
+    lote = []
+    programas = None
+    formulario = AprendizImportacionForm(data={})
+    try:
+        for numero, fila in enumerate(lector, start=2):
+            resultado.procesadas += 1
+            datos = {columna: (fila.get(columna) or '').strip() for columna in COLUMNAS}
+            if not formulario.validar_fila(datos):
+                resultado.rechazar(ErrorFila(numero, datos['document'], _mensajes(formulario)))
+                continue
+            if programas is None:
+                programas = programas_por_clave()
+            programa = programas.get(clave_programa(datos['program']))
+            if programa is None:
+                resultado.rechazar(ErrorFila(
+                    numero, datos['document'], [f"program: No existe un programa con el código o nombre {datos['program']!r}."]
+                ))
+                continue
+            formulario.instance.programa = programa
+            lote.append((numero, formulario.instance))
+            if len(lote) >= tam_lote:
+                _guardar_lote(lote, resultado)
+                lote = []
+    except (UnicodeDecodeError, csv.Error) as error:
+        # Las filas ya leídas, también las del lote pendiente, se guardan
+        _error_de_lectura(resultado, resultado.procesadas + 2, error)
+    if lote:
+        _guardar_lote(lote, resultado)
+
+    resultado.segundos = time.perf_counter() - inicio
+    if resultado.creadas:
+        invalidar_totales(Aprendiz)
+        incrementar_version(Aprendiz)
+    return resultado
+
+
+def _error_de_lectura(resultado, fila, error):
+    resultado.error_archivo = (
+        f"No se pudo leer el archivo desde la fila {fila} ({error}). "
+        "Guárdelo como CSV UTF-8 e impórtelo de nuevo; las filas anteriores ya se importaron."
+    )
+    resultado.rechazar(ErrorFila(fila, '', [resultado.error_archivo]))
+
+
+def _guardar_lote(lote, resultado):
+    """Descartar documentos repetidos o ya registrados e insertar el resto"""
+    documentos = [aprendiz.document for _, aprendiz in lote]
+    for intento in range(2):
+        existentes = set(
+            Aprendiz.objects.filter(document__in=documentos).values_list('document', flat=True)
+        )
+        vistos, nuevos, rechazados = set(), [], []
+        for numero, aprendiz in lote:
+            if aprendiz.document in existentes:
+                rechazados.append(ErrorFila(numero, aprendiz.document, ['Ya existe un aprendiz con este documento.']))
+            elif aprendiz.document in vistos:
+                rechazados.append(ErrorFila(numero, aprendiz.document, ['Documento repetido en el archivo.']))
+            else:
+                vistos.add(aprendiz.document)
+                nuevos.append(aprendiz)
+        try:
+            with transaction.atomic():
+                Aprendiz.objects.bulk_create(nuevos)
+                indice.indexar(nuevos, nuevos=True)
+        except IntegrityError:
+            # Otro proceso registró alguno de los documentos entre la
+            # consulta y la inserción: se vuelve a consultar una vez
+            if intento == 0:
+                continue
+            raise
+        resultado.creadas += len(nuevos)
+        for error in rechazados:
+            resultado.rechazar(error)
+        return
+
+
+def clave_programa(texto):
+    # 'adso ', 'ADSO' y 'Adso' son el mismo programa
+    return ' '.join(texto.split()).casefold()
+
+
+def programas_por_clave():
+    """Programas por código y por nombre (el código tiene prioridad)"""
+    filas = list(Programa.objects.only('id', 'codigo', 'nombre').order_by('-id'))
+    programas = {clave_programa(programa.nombre): programa for programa in filas}
+    programas.update({clave_programa(programa.codigo): programa for programa in filas})
+    return programas
+
+
+def _mensajes(formulario):
+    return [
+        f'{campo}: {mensaje}' if campo != '__all__' else mensaje
+        for campo, mensajes in formulario.errors.items()
+        for mensaje in mensajes
+    ]
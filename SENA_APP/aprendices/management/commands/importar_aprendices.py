@@ -0,0 +1,78 @@
+import codecs
+import contextlib
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aprendices.importacion import TAM_LOTE, abrir_csv, importar_aprendices
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa aprendices desde un archivo CSV con encabezado (document, "
+        "firstname, lastname, phone, email, birthdate, city, program), "
+        "validando cada fila con las reglas de AprendizForm. program es el "
+        "código o el nombre de un programa registrado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV (UTF-8 o Windows-1252)')
+        parser.add_argument(
+            '--codificacion',
+            help='Codificación del archivo, p. ej. latin-1 (por defecto se detecta: UTF-8 o Windows-1252)',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=TAM_LOTE,
+            help=f'Filas por inserción masiva (por defecto {TAM_LOTE})',
+        )
+        parser.add_argument('--delimitador', default=',', help='Separador de columnas')
+        parser.add_argument(
+            '--reporte',
+            help='Guardar las filas rechazadas en este archivo CSV (fila, documento, errores)',
+        )
+
+    def handle(self, *args, **options):
+        if options['codificacion']:
+            try:
+                codecs.lookup(options['codificacion'])
+            except LookupError:
+                raise CommandError(f"Codificación desconocida: {options['codificacion']}")
+        with contextlib.ExitStack() as pila:
+            al_rechazar = None
+            if options['reporte']:
+                # Todas las filas rechazadas, a medida que aparecen: el
+                # resultado solo guarda el detalle de las primeras
+                try:
+                    reporte = pila.enter_context(open(options['reporte'], 'w', newline='', encoding='utf-8'))
+                except OSError as error:
+                    raise CommandError(f"No se pudo crear el reporte: {error}")
+                escritor = csv.writer(reporte)
+                escritor.writerow(['fila', 'documento', 'errores'])
+
+                def al_rechazar(error):
+                    escritor.writerow([error.fila, error.documento, ' | '.join(error.mensajes)])
+            elif options['verbosity'] > 1:
+                def al_rechazar(error):
+                    self.stderr.write(f"Fila {error.fila} ({error.documento}): {'; '.join(error.mensajes)}")
+
+            try:
+                with open(options['archivo'], 'rb') as binario:
+                    resultado = importar_aprendices(
+                        abrir_csv(binario, options['codificacion']),
+                        tam_lote=options['lote'], delimitador=options['delimitador'],
+                        al_rechazar=al_rechazar,
+                    )
+            except OSError as error:
+                raise CommandError(f"No se pudo leer el archivo: {error}")
+
+        self.stdout.write(
+            f"{resultado.procesadas} filas procesadas, {resultado.creadas} aprendices creados, "
+            f"{resultado.rechazadas} filas rechazadas."
+        )
+        self.stdout.write(
+            f"Tiempo: {resultado.segundos:.2f} s ({resultado.filas_por_segundo:,.0f} filas/s)."
+        )
+        if resultado.errores and not options['reporte'] and options['verbosity'] <= 1:
+            self.stdout.write("Use --reporte o -v 2 para ver el detalle de las filas rechazadas.")
+        if resultado.error_archivo:
+            raise CommandError(resultado.error_archivo)
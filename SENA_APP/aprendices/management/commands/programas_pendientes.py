@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from SENA_APP.fragmentos import incrementar_version
+from aprendices.importacion import clave_programa, programas_por_clave
+from aprendices.models import Aprendiz
+from busqueda.signals import reindexar_aprendices
+
+# Aprendices actualizados por UPDATE
+TAM_LOTE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista los aprendices que quedaron sin programa al pasar el texto "
+        "de program a la llave foránea (su texto está en program_legacy). "
+        "Con --asignar les asigna el programa cuyo código o nombre coincide "
+        "ahora con ese texto, por ejemplo después de registrar el programa "
+        "que faltaba. Cuando no quede ninguno, program_legacy se puede quitar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--asignar', action='store_true',
+            help='Asignar el programa a los que ya coinciden con uno del catálogo',
+        )
+        parser.add_argument('--limite', type=int, default=50, help='Aprendices que se listan (por defecto, 50)')
+
+    def handle(self, *args, **options):
+        pendientes = Aprendiz.objects.filter(programa__isnull=True).exclude(program_legacy='')
+        if options['asignar']:
+            self.stdout.write(f'{self.asignar(pendientes)} aprendices recibieron programa.')
+
+        for fila in pendientes.values('program_legacy').annotate(total=Count('id')).order_by('-total', 'program_legacy'):
+            self.stdout.write(f"{fila['program_legacy']!r}: {fila['total']}")
+        for aprendiz_id, documento, texto in (
+            pendientes.order_by('id').values_list('id', 'document', 'program_legacy')[:options['limite']]
+        ):
+            self.stdout.write(f'  {aprendiz_id} ({documento}): {texto!r}')
+
+        total = pendientes.count()
+        if total:
+            self.stdout.write(self.style.WARNING(
+                f'{total} aprendices sin programa. Asígneles uno (formulario de edición o --asignar).'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                'No quedan aprendices sin programa: la columna program_legacy se puede quitar.'
+            ))
+
+    def asignar(self, pendientes):
+        programas = programas_por_clave()
+        por_programa = defaultdict(list)
+        for aprendiz_id, texto in pendientes.values_list('id', 'program_legacy').iterator():
+            programa = programas.get(clave_programa(texto))
+            if programa is not None:
+                por_programa[programa.pk].append(aprendiz_id)
+
+        asignados = 0
+        with transaction.atomic():
+            for programa_id, ids in por_programa.items():
+                for inicio in range(0, len(ids), TAM_LOTE):
+                    lote = ids[inicio:inicio + TAM_LOTE]
+                    Aprendiz.objects.filter(pk__in=lote).update(
+                        programa_id=programa_id, program_legacy='', fecha_actualizacion=timezone.now(),
+                    )
+                    # El índice de búsqueda copia el nombre del programa
+                    reindexar_aprendices(lote)
+                    asignados += len(lote)
+            if asignados:
+                incrementar_version(Aprendiz)
+        return asignados
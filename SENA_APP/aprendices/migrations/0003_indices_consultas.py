@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0002_rename_document_id_aprendiz_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aprendiz',
+            index=models.Index(fields=['lastname', 'id'], name='aprendiz_apellido_id_idx'),
+        ),
+    ]
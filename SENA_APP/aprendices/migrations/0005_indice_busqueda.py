@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0004_aprendiz_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aprendiz',
+            index=models.Index(django.db.models.functions.text.Lower('lastname'), models.F('id'), name='aprendiz_busqueda_idx'),
+        ),
+    ]
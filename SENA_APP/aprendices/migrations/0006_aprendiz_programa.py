@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programas', '0004_indice_busqueda'),
+        ('aprendices', '0005_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aprendiz',
+            name='programa',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='programas.programa'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:12
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+# Aprendices leídos y actualizados por lote
+TAM_LOTE = 2000
+
+
+def normalizar(texto):
+    # 'adso ', 'ADSO' y 'Adso' son el mismo programa
+    return ' '.join((texto or '').split()).casefold()
+
+
+def asignar_programas(apps, schema_editor):
+    """
+    Asigna a cada aprendiz el programa cuyo código o nombre coincide con el
+    texto de ``program`` (sin importar mayúsculas ni espacios; el código
+    tiene prioridad). Recorre la tabla por lotes de ``TAM_LOTE`` ids con
+    un UPDATE por programa distinto en el lote.
+
+    Los aprendices cuyo texto no corresponde a ningún programa quedan sin
+    programa y su texto se conserva en ``program_legacy`` (migración 0008).
+    La migración no imprime nada: ``python manage.py programas_pendientes``
+    los lista por texto y con sus ids, y con ``--asignar`` los corrige.
+    """
+    Aprendiz = apps.get_model('aprendices', 'Aprendiz')
+    Programa = apps.get_model('programas', 'Programa')
+
+    filas = list(Programa.objects.order_by('-id').values_list('id', 'codigo', 'nombre'))
+    # Con nombres repetidos gana el programa más antiguo
+    programas = {normalizar(nombre): programa_id for programa_id, codigo, nombre in filas}
+    programas.update({normalizar(codigo): programa_id for programa_id, codigo, nombre in filas})
+
+    ultimo = 0
+    while True:
+        lote = list(
+            Aprendiz.objects.filter(id__gt=ultimo).order_by('id')
+            .values_list('id', 'program')[:TAM_LOTE]
+        )
+        if not lote:
+            break
+        por_programa = defaultdict(list)
+        for aprendiz_id, texto in lote:
+            programa_id = programas.get(normalizar(texto))
+            if programa_id is not None:
+                por_programa[programa_id].append(aprendiz_id)
+        for programa_id, ids in por_programa.items():
+            Aprendiz.objects.filter(id__in=ids).update(programa_id=programa_id)
+        ultimo = lote[-1][0]
+
+
+def restaurar_texto(apps, schema_editor):
+    # Los aprendices sin programa conservan su texto original
+    Aprendiz = apps.get_model('aprendices', 'Aprendiz')
+    Programa = apps.get_model('programas', 'Programa')
+    nombre = Programa.objects.filter(pk=OuterRef('programa_id')).values('nombre')
+    Aprendiz.objects.filter(programa__isnull=False).update(program=Subquery(nombre))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0006_aprendiz_programa'),
+    ]
+
+    operations = [
+        migrations.RunPython(asignar_programas, restaurar_texto),
+    ]
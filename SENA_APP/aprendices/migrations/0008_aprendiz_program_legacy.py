@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+def vaciar_asignados(apps, schema_editor):
+    """Solo los aprendices que quedaron sin programa necesitan el texto anterior"""
+    Aprendiz = apps.get_model('aprendices', 'Aprendiz')
+    Aprendiz.objects.filter(programa__isnull=False).exclude(program_legacy='').update(program_legacy='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0007_asignar_programas'),
+        # El índice de búsqueda se llena leyendo la columna program
+        ('busqueda', '0001_initial'),
+    ]
+
+    # La columna se conserva hasta corregir los aprendices sin programa
+    # (comando programas_pendientes); se quitará en una migración posterior
+    operations = [
+        migrations.RenameField(
+            model_name='aprendiz',
+            old_name='program',
+            new_name='program_legacy',
+        ),
+        migrations.AlterField(
+            model_name='aprendiz',
+            name='program_legacy',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        # Al revertir, 0007 vuelve a llenar el texto desde el programa asignado
+        migrations.RunPython(vaciar_asignados, migrations.RunPython.noop),
+    ]
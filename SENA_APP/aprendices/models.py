@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 class Aprendiz(models.Model):
     document=models.CharField(max_length=20, unique=True)
@@ -8,12 +9,32 @@ class Aprendiz(models.Model):
     email=models.EmailField(null=True)
     birthdate=models.DateField()
     city=models.CharField(max_length=100, null=True)
-    program=models.CharField(max_length=100)
-   
+    # Nulo solo en registros anteriores cuyo programa (texto) no correspondió
+    # a ninguno del catálogo (ver migración 0007)
+    programa=models.ForeignKey('programas.Programa', on_delete=models.SET_NULL, null=True)
+    # Texto anterior de program de esos registros, para corregirlos con el
+    # comando programas_pendientes. Se vacía al asignarles un programa; la
+    # columna se quitará con otra migración cuando no quede ninguno
+    program_legacy=models.CharField(max_length=100, blank=True, default='', editable=False)
+    fecha_actualizacion=models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Orden de la lista paginada por cursor
+            models.Index(fields=['lastname', 'id'], name='aprendiz_apellido_id_idx'),
+            # Búsqueda por prefijo del selector (SENA_APP/autocompletar.py)
+            models.Index(Lower('lastname'), 'id', name='aprendiz_busqueda_idx'),
+        ]
    
     def __str__(self):
         
         return f"{self.firstname} {self.lastname}"
     
     def nombre_completo(self):
-        return f"{self.firstname} {self.lastname}"
\ No newline at end of file
+        return f"{self.firstname} {self.lastname}"
+
+    def save(self, *args, **kwargs):
+        # Con programa asignado, el texto anterior ya no hace falta
+        if self.programa_id is not None:
+            self.program_legacy = ''
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+
+from SENA_APP.fragmentos import incrementar_version
+from cursos.models import AprendizCurso, InstructorCurso
+from .dashboard import MODELOS, ajustar_total
+
+# Modelos que se muestran en las tablas cacheadas de las listas (InstructorCurso,
+# en la carga de los instructores)
+MODELOS_VERSIONADOS = [*MODELOS.values(), AprendizCurso, InstructorCurso]
+
+
+def contar_creado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ajustar_total(sender, 1)
+
+
+def descontar_eliminado(sender, instance, **kwargs):
+    ajustar_total(sender, -1)
+
+
+def cambiar_version(sender, raw=False, **kwargs):
+    if not raw:
+        incrementar_version(sender)
+
+
+def conectar():
+    """Mantener los totales del tablero con cada alta o baja de los cuatro modelos"""
+    for modelo in MODELOS.values():
+        post_save.connect(contar_creado, sender=modelo, dispatch_uid=f'dashboard_alta_{modelo._meta.label}')
+        post_delete.connect(descontar_eliminado, sender=modelo, dispatch_uid=f'dashboard_baja_{modelo._meta.label}')
+    # Y la versión de los fragmentos de lista con cada cambio
+    for modelo in MODELOS_VERSIONADOS:
+        post_save.connect(cambiar_version, sender=modelo, dispatch_uid=f'fragmentos_guardar_{modelo._meta.label}')
+        post_delete.connect(cambiar_version, sender=modelo, dispatch_uid=f'fragmentos_borrar_{modelo._meta.label}')
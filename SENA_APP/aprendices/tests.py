@@ -1,3 +1,625 @@
-from django.test import TestCase
+import contextlib
+import gzip
+import importlib
+import io
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from SENA_APP import metricas
+from SENA_APP.basedatos import configurar_sqlite
+from SENA_APP.models import VersionModelo
+from SENA_APP.paginacion import KeysetPaginator
+from SENA_APP.pruebas import PresupuestoVistasMixin, con_metricas, limpiar_caches
+from SENA_APP.sqlite.base import DatabaseWrapper
+from programas.models import Programa
+from .dashboard import invalidar_totales
+from .importacion import abrir_csv, importar_aprendices
+from . import views
+from .models import Aprendiz
+
+
+def crear_programa(codigo='ADSO', nombre='Análisis y Desarrollo de Software'):
+    return Programa.objects.create(
+        codigo=codigo, nombre=nombre, nivel_formacion='TGL', duracion_meses=24, duracion_horas=3984,
+        descripcion='-', competencias='-', perfil_egreso='-', requisitos_ingreso='-',
+        centro_formacion='CTPI', regional='Cauca', fecha_creacion=date(2020, 1, 1),
+    )
+
+
+class KeysetPaginatorTests(TestCase):
+    """Pruebas de la paginación por cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        apellidos = ['Gómez', 'Ávila', 'Pérez', 'Gómez', 'Díaz', 'Gómez', 'Zapata']
+        Aprendiz.objects.bulk_create([
+            Aprendiz(
+                document=str(1000 + i),
+                firstname=f'Nombre{i}',
+                lastname=apellido,
+                birthdate=date(2000, 1, 1),
+            )
+            for i, apellido in enumerate(apellidos)
+        ])
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.paginator = KeysetPaginator(Aprendiz.objects.all(), ('lastname', 'id'), por_pagina=3)
+
+    def recorrer(self, url='/'):
+        """Avanzar por todas las páginas y devolver los ids en orden"""
+        ids = []
+        while url:
+            pagina = self.paginator.pagina(self.factory.get(url))
+            ids.extend(aprendiz.id for aprendiz in pagina)
+            url = pagina.next_url()
+        return ids
+
+    def test_recorre_todas_las_filas_en_orden_sin_repetir(self):
+        esperados = list(Aprendiz.objects.order_by('lastname', 'id').values_list('id', flat=True))
+        self.assertEqual(self.recorrer(), esperados)
+
+    def test_pagina_anterior_devuelve_la_misma_pagina(self):
+        primera = self.paginator.pagina(self.factory.get('/'))
+        segunda = self.paginator.pagina(self.factory.get(primera.next_url()))
+        regreso = self.paginator.pagina(self.factory.get(segunda.previous_url()))
+        self.assertEqual(list(regreso), list(primera))
+        self.assertFalse(regreso.has_previous())
+        self.assertTrue(regreso.has_next())
+
+    def test_cada_pagina_es_una_sola_consulta(self):
+        primera = self.paginator.pagina(self.factory.get('/'))
+        url = primera.next_url()
+        with self.assertNumQueries(1):
+            pagina = self.paginator.pagina(self.factory.get(url))
+            list(pagina)
+            pagina.has_next()
+            pagina.has_previous()
+
+    def test_cursor_invalido_muestra_la_primera_pagina(self):
+        pagina = self.paginator.pagina(self.factory.get('/', {'despues': 'no-es-un-cursor'}))
+        self.assertFalse(pagina.has_previous())
+        self.assertEqual(len(pagina), 3)
+
+    def test_orden_descendente(self):
+        paginator = KeysetPaginator(Aprendiz.objects.all(), ('-lastname', '-id'), por_pagina=2)
+        ids, url = [], '/'
+        while url:
+            pagina = paginator.pagina(self.factory.get(url))
+            ids.extend(aprendiz.id for aprendiz in pagina)
+            url = pagina.next_url()
+        esperados = list(Aprendiz.objects.order_by('-lastname', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperados)
+
+    def test_clave_cache_distingue_paginas_sin_consultar(self):
+        primera = self.paginator.pagina(self.factory.get('/'))
+        segunda_url = primera.next_url()
+        segunda = self.paginator.pagina(self.factory.get(segunda_url))
+        regreso_url = segunda.previous_url()
+        with self.assertNumQueries(0):
+            claves = [
+                self.paginator.pagina(self.factory.get(url)).clave_cache
+                for url in ('/', segunda_url, regreso_url, '/?despues=no-es-un-cursor')
+            ]
+        self.assertEqual(len(set(claves[:3])), 3)
+        self.assertEqual(claves[3], claves[0])
+
+    def test_clave_cache_incluye_los_parametros_de_los_enlaces(self):
+        # Los enlaces de paginación conservan los demás parámetros: dos
+        # peticiones con parámetros distintos no comparten el fragmento
+        claves = {
+            self.paginator.pagina(self.factory.get(url)).clave_cache
+            for url in ('/', '/?origen=menu', '/?origen=otro')
+        }
+        self.assertEqual(len(claves), 3)
+        self.assertEqual(
+            self.paginator.pagina(self.factory.get('/?b=2&a=1')).clave_cache,
+            self.paginator.pagina(self.factory.get('/?a=1&b=2')).clave_cache,
+        )
+        Aprendiz.objects.bulk_create([
+            Aprendiz(document=str(2000 + i), firstname='Ana', lastname='Ruiz', birthdate=date(2000, 1, 1))
+            for i in range(50)
+        ])
+        url = reverse('aprendices:lista_aprendices')
+        limpiar_caches()
+        self.assertNotContains(self.client.get(url), 'origen=menu')
+        self.assertContains(self.client.get(url + '?origen=menu'), 'origen=menu')
+
+    def test_exportar_aprendices_en_flujo(self):
+        respuesta = self.client.get(reverse('aprendices:exportar_aprendices'))
+        self.assertTrue(respuesta.streaming)
+        lineas = b''.join(respuesta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), 8)
+        self.assertEqual(lineas[0].split(',')[:2], ['ID', 'Documento'])
+
+    def test_lista_aprendices_paginada(self):
+        respuesta = self.client.get(reverse('aprendices:lista_aprendices'))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context['lista_aprendices']), 7)
+
+
+class DashboardTests(TestCase):
+    """Los totales de la página de inicio salen de la caché"""
+
+    def setUp(self):
+        cache.clear()
+
+    def crear_aprendiz(self, document):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Aprendiz.objects.create(
+                document=document, firstname='Ana', lastname='Gómez',
+                birthdate=date(2000, 1, 1),
+            )
+
+    def test_sin_consultas_con_la_cache_caliente(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('aprendices:inicio'))
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('aprendices:inicio'))
+        self.assertEqual(respuesta.context['total_aprendices'], 0)
+
+    def test_altas_y_bajas_ajustan_el_total_sin_recontar(self):
+        self.client.get(reverse('aprendices:inicio'))
+        aprendiz = self.crear_aprendiz('123')
+        self.crear_aprendiz('456')
+        with self.captureOnCommitCallbacks(execute=True):
+            aprendiz.delete()
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('aprendices:inicio'))
+        self.assertEqual(respuesta.context['total_aprendices'], 1)
+
+    def test_invalidar_recuenta_solo_el_modelo(self):
+        self.client.get(reverse('aprendices:inicio'))
+        Aprendiz.objects.bulk_create([
+            Aprendiz(document='789', firstname='Luis', lastname='Díaz', birthdate=date(2001, 1, 1)),
+        ])
+        invalidar_totales(Aprendiz)
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(reverse('aprendices:inicio'))
+        self.assertEqual(respuesta.context['total_aprendices'], 1)
+
+
+class FragmentosTests(TestCase):
+    """La tabla de la lista se guarda en caché con la versión del modelo"""
+
+    def setUp(self):
+        limpiar_caches()
+
+    def crear_aprendiz(self, document, lastname='Gómez'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Aprendiz.objects.create(
+                document=document, firstname='Ana', lastname=lastname,
+                birthdate=date(2000, 1, 1),
+            )
+
+    def test_vista_repetida_solo_lee_la_version(self):
+        self.crear_aprendiz('123')
+        url = reverse('aprendices:lista_aprendices')
+        with self.assertNumQueries(2):
+            primera = self.client.get(url)
+        with self.assertNumQueries(1):
+            segunda = self.client.get(url)
+        self.assertEqual(segunda.content, primera.content)
+
+    def test_guardar_y_borrar_cambian_la_version(self):
+        aprendiz = self.crear_aprendiz('123')
+        url = reverse('aprendices:lista_aprendices')
+        self.client.get(url)
+        aprendiz.lastname = 'Zapata'
+        with self.captureOnCommitCallbacks(execute=True):
+            aprendiz.save()
+        self.assertContains(self.client.get(url), 'Zapata')
+        with self.captureOnCommitCallbacks(execute=True):
+            aprendiz.delete()
+        self.assertNotContains(self.client.get(url), 'Zapata')
+
+    def test_importacion_cambia_la_version(self):
+        crear_programa()
+        url = reverse('aprendices:lista_aprendices')
+        self.assertContains(self.client.get(url), 'No hay aprendices registrados')
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_aprendices(io.StringIO(
+                ImportacionTests.ENCABEZADO + '100,Ana,Gómez,3001234567,ana@correo.com,2001-02-03,Popayán,ADSO\n'
+            ))
+        self.assertNotContains(self.client.get(url), 'No hay aprendices registrados')
+
+    def test_cambio_confirmado_por_otro_proceso(self):
+        self.crear_aprendiz('123')
+        url = reverse('aprendices:lista_aprendices')
+        self.client.get(url)
+        # Otro worker guarda un aprendiz y sube la versión: la caché de este
+        # proceso no se entera, pero la versión se lee de la base
+        Aprendiz.objects.bulk_create([
+            Aprendiz(document='456', firstname='Luis', lastname='Zapata', birthdate=date(2000, 1, 1)),
+        ])
+        VersionModelo.objects.filter(modelo='aprendices.aprendiz').update(version=F('version') + 1)
+        self.assertContains(self.client.get(url), 'Zapata')
+
+
+class ImportacionTests(TestCase):
+    """Importación masiva de aprendices desde CSV"""
+
+    ENCABEZADO = 'document,firstname,lastname,phone,email,birthdate,city,program\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programa = crear_programa()
+
+    def csv(self, *filas):
+        return io.StringIO(self.ENCABEZADO + ''.join(fila + '\n' for fila in filas))
+
+    def test_valida_con_las_reglas_del_formulario(self):
+        Aprendiz.objects.create(document='999', firstname='Ya', lastname='Existe', birthdate=date(2000, 1, 1))
+        resultado = importar_aprendices(self.csv(
+            '100,Ana,Gómez,3001234567,ana@correo.com,2001-02-03,Popayán,ADSO',
+            '10A,Luis,Díaz,3001234567,luis@correo.com,2001-02-03,Cali,ADSO',
+            '101,Eva,Ruiz,300123,eva@correo.com,2001-02-03,Cali,ADSO',
+            '999,Otro,Más,3001234567,otro@correo.com,2001-02-03,Cali,ADSO',
+            '100,Ana,Repetida,3001234567,ana@correo.com,2001-02-03,Cali,ADSO',
+        ))
+        self.assertEqual(resultado.procesadas, 5)
+        self.assertEqual(resultado.creadas, 1)
+        errores = {error.fila: error.mensajes for error in resultado.errores}
+        self.assertEqual(sorted(errores), [3, 4, 5, 6])
+        self.assertIn('solo números', errores[3][0])
+        self.assertIn('10 dígitos', errores[4][0])
+        self.assertTrue(Aprendiz.objects.filter(document='100', lastname='Gómez', programa=self.programa).exists())
+
+    def test_programa_por_codigo_o_nombre(self):
+        resultado = importar_aprendices(self.csv(
+            '100,Ana,Gómez,3001234567,ana@correo.com,2001-02-03,Popayán,adso',
+            '101,Luis,Díaz,3001234567,luis@correo.com,2001-02-03,Cali,análisis y  desarrollo de software',
+            '102,Eva,Ruiz,3001234567,eva@correo.com,2001-02-03,Cali,Cocina',
+        ))
+        self.assertEqual(resultado.creadas, 2)
+        self.assertEqual(Aprendiz.objects.filter(programa=self.programa).count(), 2)
+        self.assertEqual([error.fila for error in resultado.errores], [4])
+        self.assertIn("'Cocina'", resultado.errores[0].mensajes[0])
+
+    def test_consultas_por_lote_y_no_por_fila(self):
+        filas = [
+            f'{2000 + i},Nombre,Apellido,3001234567,a{i}@correo.com,2001-02-03,Cali,ADSO'
+            for i in range(100)
+        ]
+        # Los programas una vez y, por cada lote de 50: una consulta de documentos
+        # existentes, un INSERT, la inserción en el índice de búsqueda y
+        # SAVEPOINT/RELEASE del lote
+        with self.assertNumQueries(11):
+            resultado = importar_aprendices(self.csv(*filas), tam_lote=50)
+        self.assertEqual(resultado.creadas, 100)
+        self.assertEqual(Aprendiz.objects.count(), 100)
+
+    def test_archivo_latin1_desde_excel(self):
+        contenido = (self.ENCABEZADO + '100,José,Muñoz,3001234567,jose@correo.com,2001-02-03,Popayán,ADSO\n').encode('latin-1')
+        archivo = SimpleUploadedFile('aprendices.csv', contenido, content_type='text/csv')
+        respuesta = self.client.post(reverse('aprendices:importar_aprendices'), {'archivo': archivo})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context['resultado'].errores, [])
+        self.assertTrue(Aprendiz.objects.filter(firstname='José', lastname='Muñoz', city='Popayán').exists())
+
+    def test_error_de_lectura_conserva_las_filas_anteriores(self):
+        filas = [f'{2000 + i},Ana,Gómez,3001234567,a{i}@correo.com,2001-02-03,Cali,ADSO\n' for i in range(3)]
+        contenido = (self.ENCABEZADO + ''.join(filas)).encode() + b'2003,Jos\xe9,Mu\xf1oz,,,2001-02-03,Cali,ADSO\n'
+        # Declarada como UTF-8, la última fila no se puede decodificar
+        resultado = importar_aprendices(abrir_csv(io.BytesIO(contenido), 'utf-8'), tam_lote=2)
+        self.assertEqual(resultado.creadas, 3)
+        self.assertIn('No se pudo leer el archivo', resultado.error_archivo)
+        self.assertEqual([error.fila for error in resultado.errores], [5])
+
+    def test_guarda_el_detalle_de_las_primeras_filas_rechazadas(self):
+        filas = [f'X{i},Ana,Gómez,,,2001-02-03,Cali,ADSO' for i in range(7)]
+        recibidos = []
+        resultado = importar_aprendices(self.csv(*filas), max_errores=3, al_rechazar=recibidos.append)
+        self.assertEqual([error.fila for error in resultado.errores], [2, 3, 4])
+        self.assertEqual(resultado.errores_omitidos, 4)
+        self.assertEqual(resultado.rechazadas, 7)
+        self.assertEqual(len(recibidos), 7)
+
+    def test_reporte_del_comando_con_todas_las_filas_rechazadas(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        archivo, reporte = Path(carpeta.name) / 'aprendices.csv', Path(carpeta.name) / 'reporte.csv'
+        archivo.write_text(self.csv(*[f'X{i},Ana,Gómez,,,2001-02-03,Cali,ADSO' for i in range(120)]).getvalue())
+        salida = io.StringIO()
+        call_command('importar_aprendices', str(archivo), reporte=str(reporte), stdout=salida)
+        self.assertIn('120 filas rechazadas', salida.getvalue())
+        self.assertEqual(len(reporte.read_text().splitlines()), 121)
+
+    def test_encabezado_incompleto(self):
+        resultado = importar_aprendices(io.StringIO('document,firstname\n1,Ana\n'))
+        self.assertEqual(resultado.creadas, 0)
+        self.assertIn('Faltan columnas', resultado.errores[0].mensajes[0])
+
+
+class PerfilSqliteTests(SimpleTestCase):
+    """Ajustes de conexión del perfil de producción"""
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.ruta = Path(carpeta.name) / 'perfil.sqlite3'
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL', 'busy_timeout': 1234})
+    def test_aplica_los_pragmas_a_cada_conexion_nueva(self):
+        conexion = sqlite3.connect(self.ruta)
+        self.addCleanup(conexion.close)
+        configurar_sqlite(sender=None, connection=SimpleNamespace(vendor='sqlite', connection=conexion))
+        self.assertEqual(conexion.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+        self.assertEqual(conexion.execute('PRAGMA busy_timeout').fetchone(), (1234,))
+
+    def test_las_transacciones_toman_el_bloqueo_de_escritura_al_empezar(self):
+        envoltura = DatabaseWrapper({**connection.settings_dict, 'NAME': str(self.ruta)}, alias='perfil')
+        self.addCleanup(envoltura.close)
+        envoltura.ensure_connection()
+        envoltura._start_transaction_under_autocommit()
+        otra = sqlite3.connect(self.ruta, timeout=0)
+        self.addCleanup(otra.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            otra.execute('CREATE TABLE prueba (id integer)')
+
+
+@con_metricas()
+class MetricasTests(TestCase):
+    """Server-Timing y /metrics"""
+
+    def setUp(self):
+        limpiar_caches()
+        metricas.registro.limpiar()
+        Aprendiz.objects.create(document='123', firstname='Ana', lastname='Gómez', birthdate=date(2000, 1, 1))
+
+    def test_cabecera_server_timing(self):
+        respuesta = self.client.get(reverse('aprendices:lista_aprendices'))
+        partes = dict(parte.split(';', 1) for parte in respuesta['Server-Timing'].split(', '))
+        self.assertEqual(sorted(partes), ['plantillas', 'sql', 'total'])
+        self.assertIn('desc="2 consultas"', partes['sql'])
+
+    def test_metrics_en_formato_prometheus_por_vista(self):
+        for _ in range(3):
+            self.client.get(reverse('aprendices:lista_aprendices'))
+        self.client.get(reverse('aprendices:detalle_aprendiz', args=[Aprendiz.objects.get().pk]))
+        texto = self.client.get(reverse('metricas')).content.decode()
+        self.assertIn('# TYPE sena_peticion_segundos summary', texto)
+        self.assertIn('sena_peticion_segundos_count{vista="aprendices:lista_aprendices"} 3', texto)
+        # La fecha del GET condicional y el aprendiz
+        self.assertIn('sena_sql_consultas{vista="aprendices:detalle_aprendiz",quantile="0.99"} 2', texto)
+        self.assertIn('sena_plantillas_segundos{vista="aprendices:lista_aprendices",quantile="0.95"}', texto)
+        self.assertIn('sena_respuesta_bytes_sum{vista="aprendices:lista_aprendices"}', texto)
+
+    def test_percentiles_del_histograma(self):
+        histograma = metricas.Histograma((1, 2, 4, 8))
+        for valor in [0.5] * 50 + [3] * 45 + [7] * 5:
+            histograma.observar(valor)
+        self.assertEqual(histograma.cuantil(0.5), 1)
+        self.assertEqual(histograma.cuantil(0.95), 4)
+        # La interpolación daría 7,2 pero nada pasó de 7
+        self.assertEqual(histograma.cuantil(0.99), 7)
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_solo_para_internal_ips_o_con_token(self):
+        externo = Client(REMOTE_ADDR='203.0.113.7')
+        self.assertNotIn('Server-Timing', externo.get(reverse('aprendices:lista_aprendices')))
+        self.assertEqual(externo.get(reverse('metricas')).status_code, 403)
+        self.assertEqual(externo.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        respuesta = externo.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertContains(respuesta, 'sena_peticion_segundos_count{vista="aprendices:lista_aprendices"} 1')
+
+    @override_settings(METRICAS_ACTIVAS=False)
+    def test_desactivadas_no_miden_nada(self):
+        respuesta = self.client.get(reverse('aprendices:lista_aprendices'))
+        self.assertNotIn('Server-Timing', respuesta)
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 404)
+        self.assertEqual(metricas.registro.histogramas, {})
+
+
+class GetCondicionalTests(TestCase):
+    """304 con ETag o Last-Modified vigentes, después de una búsqueda barata"""
+
+    def setUp(self):
+        limpiar_caches()
+        self.aprendiz = Aprendiz.objects.create(
+            document='123', firstname='Ana', lastname='Gómez', birthdate=date(2000, 1, 1),
+        )
+        self.detalle = reverse('aprendices:detalle_aprendiz', args=[self.aprendiz.pk])
+        self.lista = reverse('aprendices:lista_aprendices')
+
+    def test_detalle(self):
+        respuesta = self.client.get(self.detalle)
+        self.assertEqual(respuesta['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(1):
+            no_modificado = self.client.get(self.detalle, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado.content, b'')
+        self.assertEqual(
+            self.client.get(self.detalle, HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']).status_code, 304,
+        )
+
+        self.aprendiz.city = 'Cali'
+        self.aprendiz.save()
+        self.assertEqual(self.client.get(self.detalle, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 200)
+
+    def test_detalle_cambia_con_el_programa(self):
+        programa = crear_programa()
+        self.aprendiz.programa = programa
+        self.aprendiz.save()
+        respuesta = self.client.get(self.detalle)
+        self.assertContains(respuesta, 'Análisis y Desarrollo de Software')
+        Programa.objects.filter(pk=programa.pk).update(
+            nombre='ADSO', fecha_actualizacion=programa.fecha_actualizacion + timedelta(seconds=5),
+        )
+        self.assertContains(self.client.get(self.detalle, HTTP_IF_NONE_MATCH=respuesta['ETag']), 'ADSO')
+
+    def test_lista_solo_lee_la_version(self):
+        etag = self.client.get(self.lista)['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.lista, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Aprendiz.objects.create(document='456', firstname='Luis', lastname='Díaz', birthdate=date(2000, 1, 1))
+        self.assertEqual(self.client.get(self.lista, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_con_mensajes_pendientes_se_muestra_la_pagina(self):
+        etag = self.client.get(self.lista)['ETag']
+        request = RequestFactory().get(self.lista, HTTP_IF_NONE_MATCH=etag)
+        request._messages = CookieStorage(request)
+        request._messages.add(25, 'Guardado.')
+        respuesta = views.aprendices(request)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('ETag', respuesta)
+
+
+class EstaticosTests(TestCase):
+    """Archivos propios con hash en el nombre, precomprimidos y con caché larga"""
+
+    def setUp(self):
+        limpiar_caches()
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.raiz = Path(carpeta.name)
+        ajustes = override_settings(STATIC_ROOT=carpeta.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_sin_cdn(self):
+        contenido = self.client.get(reverse('aprendices:inicio')).content.decode()
+        self.assertNotIn('cdn.jsdelivr.net', contenido)
+        self.assertNotIn('gstatic.com', contenido)
+        self.assertIn('/static/vendor/bootstrap-5.1.3/css/bootstrap.min.css', contenido)
+
+    def test_collectstatic_con_hash_y_gzip(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        contenido = self.client.get(reverse('aprendices:inicio')).content.decode()
+        self.assertNotIn('/static/mystyles.css', contenido)
+        hojas = list(self.raiz.glob('vendor/bootstrap-5.1.3/css/bootstrap.min.*.css'))
+        self.assertEqual(len(hojas), 1)
+        hoja = hojas[0].relative_to(self.raiz).as_posix()
+        self.assertIn(f'/static/{hoja}', contenido)
+        self.assertTrue((self.raiz / f'{hoja}.gz').is_file())
+
+        # Cliente nuevo: el middleware se carga ya con el manifiesto
+        respuesta = Client().get(f'/static/{hoja}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(respuesta['Content-Type'], 'text/css')
+        self.assertIn('immutable', respuesta['Cache-Control'])
+        self.assertEqual(gzip.decompress(respuesta.content), (self.raiz / hoja).read_bytes())
+
+        original = Client().get('/static/vendor/bootstrap-5.1.3/css/bootstrap.min.css')
+        self.assertNotIn('Content-Encoding', original)
+        self.assertEqual(original['Cache-Control'], 'no-cache')
+        self.assertEqual(
+            Client().get(
+                '/static/vendor/bootstrap-5.1.3/css/bootstrap.min.css',
+                HTTP_IF_MODIFIED_SINCE=original['Last-Modified'],
+            ).status_code,
+            304,
+        )
+
+
+class MigracionProgramaTests(TransactionTestCase):
+    """El texto de program pasa a la llave foránea programa por lotes"""
+
+    antes = [('aprendices', '0006_aprendiz_programa')]
+    despues = [('aprendices', '0007_asignar_programas')]
+
+    def setUp(self):
+        ejecutor = MigrationExecutor(connection)
+        self.addCleanup(self.migrar_al_final)
+        ejecutor.migrate(self.antes)
+        apps = ejecutor.loader.project_state(self.antes).apps
+        Programa = apps.get_model('programas', 'Programa')
+        Aprendiz = apps.get_model('aprendices', 'Aprendiz')
+        datos = dict(
+            nivel_formacion='TGL', duracion_meses=24, duracion_horas=3984, descripcion='-',
+            competencias='-', perfil_egreso='-', requisitos_ingreso='-', centro_formacion='CTPI',
+            regional='Cauca', fecha_creacion=date(2020, 1, 1),
+        )
+        self.adso = Programa.objects.create(codigo='ADSO', nombre='Análisis y Desarrollo de Software', **datos).pk
+        self.cocina = Programa.objects.create(codigo='COC-1', nombre='Cocina', **datos).pk
+        textos = ['ADSO', ' adso ', 'análisis y  desarrollo de software', 'cocina', 'Sistemas', 'Sistemas', '']
+        Aprendiz.objects.bulk_create([
+            Aprendiz(document=str(100 + i), firstname='Ana', lastname='Gómez', birthdate=date(2000, 1, 1), program=texto)
+            for i, texto in enumerate(textos)
+        ])
+
+    def migrar_al_final(self):
+        ejecutor = MigrationExecutor(connection)
+        ejecutor.migrate(ejecutor.loader.graph.leaf_nodes())
+
+    def test_asigna_por_codigo_o_nombre_sin_imprimir(self):
+        migracion = importlib.import_module('aprendices.migrations.0007_asignar_programas')
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            lote, migracion.TAM_LOTE = migracion.TAM_LOTE, 2
+            try:
+                MigrationExecutor(connection).migrate(self.despues)
+            finally:
+                migracion.TAM_LOTE = lote
+        apps = MigrationExecutor(connection).loader.project_state(self.despues).apps
+        asignados = list(apps.get_model('aprendices', 'Aprendiz').objects.order_by('document').values_list('programa_id', flat=True))
+        self.assertEqual(asignados, [self.adso, self.adso, self.adso, self.cocina, None, None, None])
+        # Los sin programa los informa programas_pendientes
+        self.assertEqual(salida.getvalue(), '')
+
+    def test_conserva_el_texto_de_los_sin_programa_hasta_corregirlos(self):
+        self.migrar_al_final()
+        self.assertEqual(
+            list(Aprendiz.objects.order_by('document').values_list('program_legacy', flat=True)),
+            ['', '', '', '', 'Sistemas', 'Sistemas', ''],
+        )
+
+        salida = io.StringIO()
+        call_command('programas_pendientes', stdout=salida)
+        self.assertIn("'Sistemas': 2", salida.getvalue())
+        for aprendiz in Aprendiz.objects.filter(document__in=['104', '105']):
+            self.assertIn(f"{aprendiz.id} ({aprendiz.document}): 'Sistemas'", salida.getvalue())
+        self.assertIn('2 aprendices sin programa', salida.getvalue())
+
+        sistemas = Programa.objects.create(
+            codigo='SIS', nombre='Sistemas', nivel_formacion='TEC', duracion_meses=12, duracion_horas=1000,
+            descripcion='-', competencias='-', perfil_egreso='-', requisitos_ingreso='-',
+            centro_formacion='CTPI', regional='Cauca', fecha_creacion=date(2020, 1, 1),
+        )
+        salida = io.StringIO()
+        call_command('programas_pendientes', asignar=True, stdout=salida)
+        self.assertIn('2 aprendices recibieron programa', salida.getvalue())
+        self.assertIn('No quedan aprendices sin programa', salida.getvalue())
+        self.assertEqual(Aprendiz.objects.filter(programa=sistemas, program_legacy='').count(), 2)
+
+    def test_revertir_conserva_el_texto_de_los_sin_programa(self):
+        self.migrar_al_final()
+        MigrationExecutor(connection).migrate(self.antes)
+        apps = MigrationExecutor(connection).loader.project_state(self.antes).apps
+        textos = list(apps.get_model('aprendices', 'Aprendiz').objects.order_by('document').values_list('program', flat=True))
+        self.assertEqual(textos[4:], ['Sistemas', 'Sistemas', ''])
+        self.assertEqual(textos[3], 'Cocina')
+
+
+class PresupuestoVistasAprendicesTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de aprendices/urls.py"""
+
+    def vistas(self):
+        aprendiz = Aprendiz.objects.order_by('id').first()
+        return [
+            # Con la caché vacía: un COUNT por cada total del tablero
+            ('inicio', reverse('aprendices:inicio'), 4),
+            ('lista', reverse('aprendices:lista_aprendices'), 2),
+            # La fecha de actualización (GET condicional) y el aprendiz
+            ('detalle', reverse('aprendices:detalle_aprendiz', args=[aprendiz.id]), 2),
+            ('crear', reverse('aprendices:crear_aprendiz'), 0),
+            ('importar', reverse('aprendices:importar_aprendices'), 0),
+            ('exportar', reverse('aprendices:exportar_aprendices'), 1),
+            # El aprendiz y la opción elegida del selector de programa
+            ('editar', reverse('aprendices:editar_aprendiz', args=[aprendiz.id]), 2),
+            ('eliminar', reverse('aprendices:eliminar_aprendiz', args=[aprendiz.id]), 1),
+        ]
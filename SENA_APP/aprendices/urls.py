@@ -1,13 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views 
 
 app_name = 'aprendices'
 
+# Con ASGI las lecturas usan las vistas async (ver VISTAS_ASINCRONAS en settings)
+asincronas = settings.VISTAS_ASINCRONAS
+
 urlpatterns = [
-    path('', views.inicio, name='inicio'),
-    path('aprendices/', views.aprendices, name='lista_aprendices'),
-    path('aprendices/aprendiz/<int:id_aprendiz>/', views.detalle_aprendiz, name='detalle_aprendiz'),
+    path('', views.inicio_async if asincronas else views.inicio, name='inicio'),
+    path('aprendices/', views.aprendices_async if asincronas else views.aprendices, name='lista_aprendices'),
+    path('aprendices/aprendiz/<int:id_aprendiz>/', views.detalle_aprendiz_async if asincronas else views.detalle_aprendiz, name='detalle_aprendiz'),
     path('aprendices/crear/', views.AprendizCreateView.as_view(), name='crear_aprendiz'),
+    path('aprendices/importar/', views.importar, name='importar_aprendices'),
+    path('aprendices/exportar/', views.exportar_aprendices, name='exportar_aprendices'),
     path('aprendices/<int:aprendiz_id>/editar/', views.AprendizUpdateView.as_view(), name='editar_aprendiz'),
     path('aprendices/<int:aprendiz_id>/eliminar/', views.AprendizDeleteView.as_view(), name='eliminar_aprendiz'),
 ]
\ No newline at end of file
@@ -1,49 +1,142 @@
 from django.shortcuts import render
 from django.template import loader
 from django.http import HttpResponse
-from programas.models import Programa
+from django.db.models.functions import Coalesce, Greatest
+from django.template.response import TemplateResponse
+from programas.models import Programa, textos_largos
 from .models import Aprendiz
-from instructores.models import Instructor
-from cursos.models import Curso
-from .forms import AprendizForm
+from .dashboard import aobtener_totales, obtener_totales
+from .forms import AprendizForm, ImportarAprendicesForm
+from .importacion import abrir_csv, importar_aprendices
 from django.views import generic
 from django.urls import reverse_lazy
 from django.contrib import messages
+from SENA_APP.condicional import condicional, por_fecha, por_versiones
+from SENA_APP.exportacion import respuesta_csv
+from SENA_APP.fragmentos import afragmento_en_cache, aversion, version
+from SENA_APP.paginacion import KeysetPaginator
 # Create your views here.
 
+# GET condicional: la lista se valida con la versión de sus fragmentos y el
+# detalle con la fecha de actualización del aprendiz y de su programa
+validar_lista = por_versiones(Aprendiz, Programa)
+
+
+def _fecha_aprendiz(id_aprendiz):
+    return Aprendiz.objects.filter(id=id_aprendiz).values_list(Greatest(
+        'fecha_actualizacion', Coalesce('programa__fecha_actualizacion', 'fecha_actualizacion'),
+    ), flat=True)
+
+
+validar_detalle = por_fecha(_fecha_aprendiz)
+
+
+def _con_programa():
+    # Las páginas solo muestran el nombre del programa
+    return Aprendiz.objects.select_related('programa').defer(*textos_largos('programa'))
+
+@condicional(validar_lista)
 def aprendices(request):
-    lista_aprendices = Aprendiz.objects.all()
+    paginator = KeysetPaginator(_con_programa(), ('lastname', 'id'))
+    pagina = paginator.pagina(request)
     template = loader.get_template('lista_aprendices.html')
     
     context = {
-        'lista_aprendices': lista_aprendices,
+        'lista_aprendices': pagina,
+        'pagina': pagina,
+        # La tabla se guarda en caché por versión: con la caché caliente no se consulta la página
+        'version': version(Aprendiz, Programa),
     }
     return HttpResponse(template.render(context, request))
 
+def exportar_aprendices(request):
+  columnas = [
+    ('ID', 'id'),
+    ('Documento', 'document'),
+    ('Nombre', 'firstname'),
+    ('Apellido', 'lastname'),
+    ('Teléfono', 'phone'),
+    ('Correo', 'email'),
+    ('Fecha Nacimiento', 'birthdate'),
+    ('Ciudad', 'city'),
+    ('Programa', 'programa__nombre'),
+  ]
+  return respuesta_csv('aprendices.csv', columnas, Aprendiz.objects.all())
+
+@condicional(validar_detalle)
 def detalle_aprendiz(request, id_aprendiz):
-  aprendiz = Aprendiz.objects.get(id=id_aprendiz)
+  aprendiz = _con_programa().get(id=id_aprendiz)
   template = loader.get_template('detalle_aprendiz.html')
   context = {
     'aprendiz': aprendiz,
   }
   return HttpResponse(template.render(context, request))
 
-def inicio(request):
-  total_instructores = Instructor.objects.count()
-  total_aprendices = Aprendiz.objects.count()
-  total_programas = Programa.objects.count()
-  total_cursos = Curso.objects.count()
-  template = loader.get_template('main.html')
+def importar(request):
+  """Cargar aprendices en bloque desde un archivo CSV"""
+  resultado = None
+  if request.method == 'POST':
+    form = ImportarAprendicesForm(request.POST, request.FILES)
+    if form.is_valid():
+      resultado = importar_aprendices(abrir_csv(request.FILES['archivo'].file))
+      if resultado.creadas:
+        messages.success(request, f'Se importaron {resultado.creadas} aprendices.')
+      if resultado.error_archivo:
+        messages.error(request, resultado.error_archivo)
+      elif resultado.errores:
+        messages.error(request, f'{resultado.rechazadas} filas fueron rechazadas.')
+  else:
+    form = ImportarAprendicesForm()
+  template = loader.get_template('importar_aprendices.html')
   context = {
-    "total_instructores": total_instructores,
-    "total_aprendices": total_aprendices,
-    "total_programas": total_programas,
-    "total_cursos": total_cursos,
+    'form': form,
+    'resultado': resultado,
+    # Solo el detalle de las primeras filas rechazadas (MAX_ERRORES); el
+    # comando importar_aprendices genera el reporte completo
+    'errores': resultado.errores if resultado else [],
   }
+  return HttpResponse(template.render(context, request))
+
+def inicio(request):
+  # Totales desde la caché del tablero: sin consultas mientras estén vigentes
+  template = loader.get_template('main.html')
+  context = obtener_totales()
   
   return HttpResponse(template.render(context, request))
 
 
+# Vistas asíncronas de lectura, usadas con ASGI (ver VISTAS_ASINCRONAS en settings)
+
+async def inicio_async(request):
+    # Los COUNT que no estén en caché se piden a la vez
+    context = await aobtener_totales()
+    template = loader.get_template('main.html')
+    return HttpResponse(template.render(context, request))
+
+@condicional(validar_lista)
+async def aprendices_async(request):
+    paginator = KeysetPaginator(_con_programa(), ('lastname', 'id'))
+    pagina = paginator.pagina(request)
+    context = {
+        'lista_aprendices': pagina,
+        'pagina': pagina,
+        'version': await aversion(Aprendiz, Programa),
+    }
+    if not await afragmento_en_cache('tabla_aprendices', context['version'], pagina.clave_cache):
+        await pagina.acargar()
+    # Django renderiza la TemplateResponse fuera del ciclo de eventos
+    return TemplateResponse(request, 'lista_aprendices.html', context)
+
+@condicional(validar_detalle)
+async def detalle_aprendiz_async(request, id_aprendiz):
+    aprendiz = await _con_programa().aget(id=id_aprendiz)
+    template = loader.get_template('detalle_aprendiz.html')
+    context = {
+        'aprendiz': aprendiz,
+    }
+    return HttpResponse(template.render(context, request))
+
+
 
 class AprendizCreateView(generic.CreateView):
     """Vista para crear un nuevo aprendiz"""
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BusquedaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'busqueda'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
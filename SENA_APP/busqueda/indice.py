@@ -0,0 +1,223 @@
+"""
+Índice de búsqueda de texto completo (SQLite FTS5) sobre aprendices,
+instructores y programas.
+
+Todas las entidades comparten la tabla virtual ``busqueda_indice``. El
+rowid de cada entrada se deriva del tipo y del id del objeto
+(``id * 4 + código del tipo``), de modo que actualizar o borrar una
+entrada es una búsqueda por clave primaria y no un recorrido del índice.
+
+Columnas indexadas, de mayor a menor peso en el ranking:
+``titulo`` (nombres), ``clave`` (documento, código, correo) y ``texto``
+(ciudad, especialidad, descripción, competencias...).
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from aprendices.models import Aprendiz
+from instructores.models import Instructor
+from programas.models import Programa
+
+TABLA = 'busqueda_indice'
+TAM_BLOQUE = 2000
+LIMITE_RESULTADOS = 50
+
+# Pesos bm25 por columna: tipo y objeto_id no se indexan
+PESOS = (0.0, 0.0, 10.0, 6.0, 1.0)
+
+
+class Fuente:
+    """Cómo convertir un modelo en una entrada del índice"""
+
+    def __init__(self, tipo, codigo, modelo, titulo, clave, texto, url):
+        self.tipo = tipo
+        self.codigo = codigo
+        self.modelo = modelo
+        self.titulo = titulo
+        self.clave = clave
+        self.texto = texto
+        self.url = url
+
+    @property
+    def campos(self):
+        return ['id', *self.titulo, *self.clave, *self.texto]
+
+    def fila(self, valores):
+        """Fila para INSERT a partir de una tupla de values_list(*campos)"""
+        objeto_id, resto = valores[0], valores[1:]
+        partes = []
+        for grupo in (self.titulo, self.clave, self.texto):
+            partes.append(' '.join(str(valor) for valor in resto[:len(grupo)] if valor))
+            resto = resto[len(grupo):]
+        return (rowid(self, objeto_id), self.tipo, objeto_id, *partes)
+
+
+FUENTES = [
+    Fuente(
+        'aprendiz', 1, Aprendiz,
+        titulo=['firstname', 'lastname'],
+        clave=['document', 'email'],
+        texto=['city', 'programa__nombre'],
+        url='aprendices:detalle_aprendiz',
+    ),
+    Fuente(
+        'instructor', 2, Instructor,
+        titulo=['nombre', 'apellido'],
+        clave=['documento_id', 'correo'],
+        texto=['especialidad', 'ciudad'],
+        url='instructores:detalle_instructor',
+    ),
+    Fuente(
+        'programa', 3, Programa,
+        titulo=['nombre'],
+        clave=['codigo'],
+        texto=['descripcion', 'competencias'],
+        url='programas:detalle_programa',
+    ),
+]
+FUENTES_POR_MODELO = {fuente.modelo: fuente for fuente in FUENTES}
+FUENTES_POR_TIPO = {fuente.tipo: fuente for fuente in FUENTES}
+
+
+def disponible():
+    return connection.vendor == 'sqlite'
+
+
+def rowid(fuente, objeto_id):
+    return objeto_id * 4 + fuente.codigo
+
+
+def indexar(objetos, nuevos=False):
+    """
+    (Re)indexar instancias ya cargadas de un mismo modelo, sin volver a
+    leerlas. Con ``nuevos`` se omite el borrado previo de sus entradas.
+    """
+    objetos = list(objetos)
+    if not objetos or not disponible():
+        return
+    fuente = FUENTES_POR_MODELO.get(type(objetos[0]))
+    if fuente is None:
+        return
+    valores = [[_valor(objeto, campo) for campo in fuente.campos] for objeto in objetos]
+    indexar_valores(fuente.modelo, valores, nuevos=nuevos)
+
+
+def _valor(objeto, campo):
+    # Los campos de relaciones (``programa__nombre``) se siguen como en values_list
+    for parte in campo.split('__'):
+        if objeto is None:
+            return None
+        objeto = getattr(objeto, parte)
+    return objeto
+
+
+def indexar_valores(modelo, valores, nuevos=False):
+    """
+    Como ``indexar``, pero a partir de tuplas con los valores de
+    ``Fuente.campos`` (id primero), para cargas masivas que no crean
+    instancias del modelo.
+    """
+    fuente = FUENTES_POR_MODELO.get(modelo)
+    if fuente is None or not disponible():
+        return
+    filas = [fuente.fila(fila) for fila in valores]
+    if not filas:
+        return
+    with connection.cursor() as cursor:
+        if not nuevos:
+            _borrar(cursor, [fila[0] for fila in filas])
+        _insertar(cursor, filas)
+
+
+def eliminar(modelo, ids):
+    fuente = FUENTES_POR_MODELO.get(modelo)
+    if fuente is None or not disponible():
+        return
+    with connection.cursor() as cursor:
+        _borrar(cursor, [rowid(fuente, objeto_id) for objeto_id in ids])
+
+
+def reconstruir():
+    """Vaciar el índice y volver a llenarlo por bloques. Devuelve cuántas entradas quedaron por tipo."""
+    totales = {}
+    # Una sola transacción: en modo autocommit cada fila sería un commit a disco
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLA}')
+        for fuente in FUENTES:
+            filas = fuente.modelo.objects.order_by().values_list(*fuente.campos).iterator(chunk_size=TAM_BLOQUE)
+            bloque, total = [], 0
+            for valores in filas:
+                bloque.append(fuente.fila(valores))
+                if len(bloque) >= TAM_BLOQUE:
+                    _insertar(cursor, bloque)
+                    total += len(bloque)
+                    bloque = []
+            _insertar(cursor, bloque)
+            totales[fuente.tipo] = total + len(bloque)
+        # Fusionar los segmentos del índice para que las consultas lean menos páginas
+        cursor.execute(f"INSERT INTO {TABLA}({TABLA}) VALUES ('optimize')")
+    return totales
+
+
+def expresion_fts(consulta):
+    """
+    Convertir el texto escrito por el usuario en una expresión MATCH segura:
+    cada palabra se busca como prefijo y todas deben aparecer.
+    """
+    palabras = re.findall(r'\w+', consulta)[:8]
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+def buscar(consulta, limite=LIMITE_RESULTADOS):
+    expresion = expresion_fts(consulta)
+    if not expresion or not disponible():
+        return []
+    pesos = ', '.join(str(peso) for peso in PESOS)
+    with connection.cursor() as cursor:
+        # Los fragmentos se marcan con caracteres de control y el HTML se
+        # arma después de escapar el texto guardado
+        cursor.execute(
+            f'SELECT tipo, objeto_id, titulo, clave, '
+            f"snippet({TABLA}, 4, char(2), char(3), '…', 12) "
+            f'FROM {TABLA} WHERE {TABLA} MATCH %s '
+            f'ORDER BY bm25({TABLA}, {pesos}) LIMIT %s',
+            [expresion, limite],
+        )
+        filas = cursor.fetchall()
+    return [
+        {
+            'tipo': tipo,
+            'id': objeto_id,
+            'titulo': titulo,
+            'clave': clave,
+            'fragmento': _resaltar(fragmento),
+            'url': reverse(FUENTES_POR_TIPO[tipo].url, args=[objeto_id]),
+        }
+        for tipo, objeto_id, titulo, clave, fragmento in filas
+    ]
+
+
+def _resaltar(fragmento):
+    html = escape(fragmento or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+    return mark_safe(html)
+
+
+def _borrar(cursor, rowids):
+    for inicio in range(0, len(rowids), 500):
+        bloque = rowids[inicio:inicio + 500]
+        marcadores = ', '.join(['%s'] * len(bloque))
+        cursor.execute(f'DELETE FROM {TABLA} WHERE rowid IN ({marcadores})', bloque)
+
+
+def _insertar(cursor, filas):
+    if filas:
+        cursor.executemany(
+            f'INSERT INTO {TABLA} (rowid, tipo, objeto_id, titulo, clave, texto) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)',
+            filas,
+        )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from busqueda import indice
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el índice de búsqueda de texto completo de aprendices, "
+        "instructores y programas. Necesario después de cargas hechas con "
+        "SQL directo o QuerySet.update(), que no pasan por las señales."
+    )
+
+    def handle(self, *args, **options):
+        if not indice.disponible():
+            raise CommandError('La búsqueda de texto completo requiere SQLite con FTS5.')
+        inicio = time.perf_counter()
+        totales = indice.reconstruir()
+        segundos = time.perf_counter() - inicio
+        for tipo, total in totales.items():
+            self.stdout.write(f'{tipo}: {total} entradas')
+        self.stdout.write(self.style.SUCCESS(f'Índice reconstruido en {segundos:.2f} s.'))
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+CREAR = """
+CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_indice USING fts5(
+    tipo UNINDEXED,
+    objeto_id UNINDEXED,
+    titulo,
+    clave,
+    texto,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+LLENAR = [
+    """
+    INSERT INTO busqueda_indice (rowid, tipo, objeto_id, titulo, clave, texto)
+    SELECT id * 4 + 1, 'aprendiz', id,
+           firstname || ' ' || lastname,
+           document || ' ' || COALESCE(email, ''),
+           COALESCE(city, '') || ' ' || program
+    FROM aprendices_aprendiz
+    """,
+    """
+    INSERT INTO busqueda_indice (rowid, tipo, objeto_id, titulo, clave, texto)
+    SELECT id * 4 + 2, 'instructor', id,
+           nombre || ' ' || apellido,
+           documento_id || ' ' || COALESCE(correo, ''),
+           especialidad || ' ' || COALESCE(ciudad, '')
+    FROM instructores_instructor
+    """,
+    """
+    INSERT INTO busqueda_indice (rowid, tipo, objeto_id, titulo, clave, texto)
+    SELECT id * 4 + 3, 'programa', id,
+           nombre,
+           codigo,
+           descripcion || ' ' || competencias
+    FROM programas_programa
+    """,
+]
+
+
+def crear_indice(apps, schema_editor):
+    # FTS5 es propio de SQLite; con otros motores la búsqueda queda deshabilitada
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREAR)
+    for sentencia in LLENAR:
+        schema_editor.execute(sentencia)
+
+
+def borrar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS busqueda_indice')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0002_rename_document_id_aprendiz_document'),
+        ('instructores', '0001_initial'),
+        ('programas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, borrar_indice),
+    ]
@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from aprendices.models import Aprendiz
+from programas.models import Programa
+from . import indice
+
+
+def actualizar_indice(sender, instance, raw=False, **kwargs):
+    if not raw:
+        indice.indexar([instance])
+
+
+def quitar_del_indice(sender, instance, **kwargs):
+    indice.eliminar(sender, [instance.pk])
+
+
+def reindexar_aprendices(ids):
+    """Las entradas de los aprendices copian el nombre de su programa"""
+    fuente = indice.FUENTES_POR_MODELO[Aprendiz]
+    filas = Aprendiz.objects.filter(pk__in=ids).order_by().values_list(*fuente.campos)
+    indice.indexar_valores(Aprendiz, filas)
+
+
+def renombrar_programa(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and 'nombre' not in update_fields):
+        return
+    nombre = instance.__dict__.get('nombre')
+    if nombre != getattr(instance, '_nombre_original', None):
+        reindexar_aprendices(Aprendiz.objects.filter(programa=instance).values('pk'))
+    instance._nombre_original = nombre
+
+
+def recordar_aprendices(sender, instance, **kwargs):
+    # El SET_NULL de Aprendiz.programa es un UPDATE masivo sin señales:
+    # los aprendices se anotan antes de que pierdan el programa
+    instance._aprendices_a_reindexar = list(Aprendiz.objects.filter(programa=instance).values_list('pk', flat=True))
+
+
+def quitar_programa(sender, instance, **kwargs):
+    reindexar_aprendices(getattr(instance, '_aprendices_a_reindexar', []))
+
+
+def conectar():
+    """
+    Mantener el índice en la misma transacción que el guardado o borrado,
+    así nunca apunta a objetos que no existen.
+    """
+    for modelo in indice.FUENTES_POR_MODELO:
+        post_save.connect(actualizar_indice, sender=modelo, dispatch_uid=f'busqueda_guardar_{modelo._meta.label}')
+        post_delete.connect(quitar_del_indice, sender=modelo, dispatch_uid=f'busqueda_borrar_{modelo._meta.label}')
+    post_save.connect(renombrar_programa, sender=Programa, dispatch_uid='busqueda_renombrar_programa')
+    pre_delete.connect(recordar_aprendices, sender=Programa, dispatch_uid='busqueda_recordar_aprendices')
+    post_delete.connect(quitar_programa, sender=Programa, dispatch_uid='busqueda_quitar_programa')
@@ -0,0 +1,94 @@
+import io
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from aprendices.importacion import importar_aprendices
+from aprendices.models import Aprendiz
+from instructores.models import Instructor
+from programas.models import Programa
+from . import indice
+
+
+class BusquedaTests(TestCase):
+    """El índice FTS5 se mantiene al guardar y borrar, y ordena por relevancia"""
+
+    def setUp(self):
+        self.programa = Programa.objects.create(
+            codigo='ADSO-228106', nombre='Análisis y Desarrollo de Software', nivel_formacion='TGL',
+            duracion_meses=24, duracion_horas=3984, descripcion='Formación en desarrollo de software',
+            competencias='Construir software, modelar bases de datos', perfil_egreso='Perfil',
+            requisitos_ingreso='Bachiller', centro_formacion='CTPI', regional='Cauca',
+            fecha_creacion=date(2020, 1, 1),
+        )
+        self.aprendiz = Aprendiz.objects.create(
+            document='1061234567', firstname='María José', lastname='Muñoz',
+            email='maria@correo.com', birthdate=date(2001, 3, 4), city='Popayán', programa=self.programa,
+        )
+        self.instructor = Instructor.objects.create(
+            documento_id='76543210', nombre='Carlos', apellido='Muñoz Pérez',
+            fecha_nacimiento=date(1980, 1, 1), especialidad='Redes de datos',
+            anos_experiencia=10, fecha_vinculacion=date(2010, 1, 1),
+        )
+
+    def tipos(self, consulta):
+        return [(resultado['tipo'], resultado['id']) for resultado in indice.buscar(consulta)]
+
+    def test_busca_por_nombre_sin_tildes_y_por_prefijo(self):
+        self.assertEqual(
+            set(self.tipos('munoz')),
+            {('aprendiz', self.aprendiz.pk), ('instructor', self.instructor.pk)},
+        )
+        self.assertEqual(self.tipos('106123'), [('aprendiz', self.aprendiz.pk)])
+        # El programa por su nombre y, después, sus aprendices
+        self.assertEqual(
+            self.tipos('desarrollo softw'), [('programa', self.programa.pk), ('aprendiz', self.aprendiz.pk)],
+        )
+
+    def test_el_nombre_pesa_mas_que_el_texto(self):
+        # "datos" aparece en la especialidad del instructor y en las
+        # competencias del programa; "Pérez" solo en el nombre
+        self.assertEqual(self.tipos('perez'), [('instructor', self.instructor.pk)])
+        self.assertEqual(len(self.tipos('datos')), 2)
+
+    def test_actualiza_y_elimina_entradas(self):
+        self.aprendiz.lastname = 'Zúñiga'
+        self.aprendiz.save()
+        self.assertEqual(self.tipos('zuniga'), [('aprendiz', self.aprendiz.pk)])
+        self.assertNotIn(('aprendiz', self.aprendiz.pk), self.tipos('munoz'))
+        self.instructor.delete()
+        self.assertEqual(self.tipos('munoz'), [])
+
+    def test_renombrar_o_borrar_el_programa_rehace_sus_aprendices(self):
+        self.programa.nombre = 'Gastronomía'
+        self.programa.save()
+        self.assertNotIn(('aprendiz', self.aprendiz.pk), self.tipos('desarrollo'))
+        self.assertEqual(self.tipos('gastronomia'), [('programa', self.programa.pk), ('aprendiz', self.aprendiz.pk)])
+
+        # El SET_NULL no envía señales por aprendiz
+        Programa.objects.get(pk=self.programa.pk).delete()
+        self.assertEqual(self.tipos('gastronomia'), [])
+        self.assertEqual(self.tipos('munoz maria'), [('aprendiz', self.aprendiz.pk)])
+
+    def test_importacion_masiva_queda_indexada(self):
+        importar_aprendices(io.StringIO(
+            'document,firstname,lastname,phone,email,birthdate,city,program\n'
+            '555,Rosa,Quintero,3001234567,rosa@correo.com,2001-02-03,Cali,ADSO-228106\n'
+        ))
+        self.assertEqual(len(self.tipos('quintero')), 1)
+
+    def test_reconstruir(self):
+        Aprendiz.objects.filter(pk=self.aprendiz.pk).update(city='Cartago')
+        self.assertEqual(self.tipos('cartago'), [])
+        indice.reconstruir()
+        self.assertEqual(self.tipos('cartago'), [('aprendiz', self.aprendiz.pk)])
+
+    def test_consulta_con_caracteres_especiales(self):
+        self.assertEqual(self.tipos('"munoz*('), self.tipos('munoz'))
+        self.assertEqual(indice.buscar('***'), [])
+
+    def test_vista_buscar(self):
+        respuesta = self.client.get(reverse('busqueda:buscar'), {'q': 'maria'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, reverse('aprendices:detalle_aprendiz', args=[self.aprendiz.pk]))
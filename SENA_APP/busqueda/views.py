@@ -0,0 +1,21 @@
+import time
+
+from django.http import HttpResponse
+from django.template import loader
+
+from . import indice
+
+# Create your views here.
+
+def buscar(request):
+    consulta = request.GET.get('q', '').strip()
+    inicio = time.perf_counter()
+    resultados = indice.buscar(consulta) if consulta else []
+    template = loader.get_template('buscar.html')
+    context = {
+        'consulta': consulta,
+        'resultados': resultados,
+        'milisegundos': (time.perf_counter() - inicio) * 1000,
+        'disponible': indice.disponible(),
+    }
+    return HttpResponse(template.render(context, request))
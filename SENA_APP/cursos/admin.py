@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Curso, InstructorCurso, AprendizCurso
+from .models import Curso, FranjaHoraria, InstructorCurso, AprendizCurso
 
 # Register your models here.
 
 admin.site.register(Curso)
 admin.site.register(InstructorCurso)
-admin.site.register(AprendizCurso)
\ No newline at end of file
+admin.site.register(AprendizCurso)
+admin.site.register(FranjaHoraria)
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Cruces de horario: dos cursos vigentes en las mismas fechas que ocupan el
+mismo ambiente, o el mismo instructor (coordinador o asignado con
+InstructorCurso), en franjas que se solapan.
+
+Las franjas de cada curso se guardan en FranjaHoraria (ver
+cursos/horarios.py). Para validar un curso nuevo o editado,
+``buscar_cruces`` consulta solo las franjas que pueden cruzarse:
+
+* por ambiente, con el índice ``(ambiente, dia, hora_inicio)``: cada
+  franja del curso es una búsqueda en el índice que recorre las franjas
+  de ese ambiente y ese día que empiezan antes de que ella termine,
+* por instructor, a partir de los cursos de los instructores (llaves
+  foráneas indexadas) y con el mismo filtro de día y horas.
+
+``cruces_del_periodo`` revisa todos los cursos de un periodo de una vez:
+lee las franjas con dos consultas y, por cada ambiente o instructor y
+día, recorre las franjas ordenadas por hora de inicio manteniendo las
+que siguen abiertas en un montículo por hora de fin. Son O(n log n)
+comparaciones más los cruces encontrados, en lugar de comparar cada
+curso con todos los demás.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.db.models import Q
+
+from .horarios import Franja, HorarioInvalido, clave_ambiente, interpretar_horario
+from .models import Curso, FranjaHoraria, InstructorCurso
+
+# Cursos que ya no ocupan ambiente ni instructor
+ESTADOS_SIN_HORARIO = ('FIN', 'CAN')
+
+
+class Cruce(NamedTuple):
+    """El curso se cruza con ``otro`` en ``recurso`` durante ``franjas``"""
+    otro: Curso
+    recurso: str
+    franjas: tuple
+
+    def __str__(self):
+        dias = ', '.join(str(franja) for franja in self.franjas)
+        return f"Se cruza con el curso {self.otro.codigo} en {self.recurso}: {dias}."
+
+
+# Lo que comparten dos cursos que se cruzan
+AMBIENTE = 'ambiente'
+INSTRUCTOR = 'instructor'
+
+
+class CruceDetectado(NamedTuple):
+    """
+    Cruce entre los cursos ``curso_id`` y ``otro_id`` (``curso_id < otro_id``)
+    en un ambiente (``recurso`` es su clave) o un instructor (su id).
+    """
+    curso_id: int
+    otro_id: int
+    tipo: str
+    recurso: object
+    franja: Franja
+
+
+def franjas_del_horario(curso):
+    """FranjaHoraria (sin guardar) del texto del horario; ninguna si no se puede interpretar"""
+    try:
+        franjas = interpretar_horario(curso.horario)
+    except HorarioInvalido:
+        return []
+    ambiente = clave_ambiente(curso.aula)
+    return [
+        FranjaHoraria(
+            curso_id=curso.pk, dia=franja.dia, hora_inicio=franja.inicio, hora_fin=franja.fin,
+            ambiente=ambiente, minutos=franja.minutos,
+        )
+        for franja in franjas
+    ]
+
+
+def reemplazar_franjas(curso):
+    FranjaHoraria.objects.filter(curso=curso.pk).delete()
+    FranjaHoraria.objects.bulk_create(franjas_del_horario(curso))
+
+
+def reconstruir_franjas(cursos=None, tam_lote=2000):
+    """
+    Rehacer las franjas de los ``cursos`` (queryset; por defecto, todos)
+    a partir de su horario, para las filas que no pasaron por Curso.save.
+    Devuelve cuántas franjas creó.
+    """
+    cursos = Curso.objects.all() if cursos is None else cursos
+    FranjaHoraria.objects.filter(curso__in=cursos.values('pk')).delete()
+    creadas, lote = 0, []
+    for curso in cursos.order_by().only('id', 'horario', 'aula').iterator(chunk_size=tam_lote):
+        lote.extend(franjas_del_horario(curso))
+        if len(lote) >= tam_lote:
+            creadas += len(FranjaHoraria.objects.bulk_create(lote))
+            lote = []
+    return creadas + len(FranjaHoraria.objects.bulk_create(lote))
+
+
+def buscar_cruces(franjas, fecha_inicio, fecha_fin, ambiente='', instructores=(), excluir=None):
+    """
+    Cruces de un curso con ``franjas`` (lista de Franja) entre las dos
+    fechas, en el ambiente (clave de ``clave_ambiente``) o con alguno de
+    los ``instructores``. ``excluir`` es el id del propio curso al editarlo.
+    Como máximo tres consultas, sin importar cuántos cursos haya.
+    """
+    if not franjas:
+        return []
+    vigentes = FranjaHoraria.objects.filter(
+        curso__fecha_inicio__lte=fecha_fin, curso__fecha_fin__gte=fecha_inicio,
+    ).exclude(curso__estado__in=ESTADOS_SIN_HORARIO).select_related('curso').only(
+        'dia', 'hora_inicio', 'hora_fin', 'ambiente',
+        'curso__codigo', 'curso__nombre', 'curso__aula', 'curso__instructor_coordinador',
+    )
+    if excluir is not None:
+        vigentes = vigentes.exclude(curso=excluir)
+
+    def solapadas(**filtros):
+        # Cada término del OR es un rango del índice (ambiente, día, hora de inicio)
+        condicion = Q()
+        for dia, inicio, fin in franjas:
+            condicion |= Q(dia=dia, hora_inicio__lt=fin, hora_fin__gt=inicio, **filtros)
+        return vigentes.filter(condicion)
+
+    encontradas = defaultdict(set)
+    if ambiente:
+        for fila in solapadas(ambiente=ambiente):
+            encontradas[fila.curso, f'el ambiente {fila.curso.aula}'].add(fila.franja())
+
+    instructores = {instructor.pk: instructor for instructor in instructores if instructor is not None}
+    if instructores:
+        # Primero los cursos de los instructores (por sus índices) y luego
+        # sus franjas: un OR sobre las columnas del join recorrería todas
+        asignados = InstructorCurso.objects.filter(instructor__in=instructores).values('curso')
+        cursos = Curso.objects.filter(
+            Q(instructor_coordinador__in=instructores) | Q(pk__in=asignados)
+        ).order_by().values('pk')
+        filas = list(solapadas().filter(curso__in=cursos))
+        por_curso = defaultdict(set)
+        for curso_id, instructor_id in InstructorCurso.objects.filter(
+            curso__in={fila.curso_id for fila in filas}, instructor__in=instructores,
+        ).values_list('curso', 'instructor'):
+            por_curso[curso_id].add(instructor_id)
+        for fila in filas:
+            comunes = por_curso[fila.curso_id] | ({fila.curso.instructor_coordinador_id} & instructores.keys())
+            for instructor_id in comunes:
+                encontradas[fila.curso, f'el instructor {instructores[instructor_id]}'].add(fila.franja())
+
+    return [
+        Cruce(curso, recurso, tuple(franja for franja in franjas if any(franja.se_cruza(otra) for otra in otras)))
+        for (curso, recurso), otras in sorted(encontradas.items(), key=lambda item: (item[0][0].codigo, item[0][1]))
+    ]
+
+
+def cursos_vigentes(desde, hasta):
+    """Cursos que ocupan ambiente e instructor en algún día de ``desde`` a ``hasta``"""
+    return Curso.objects.filter(fecha_inicio__lte=hasta, fecha_fin__gte=desde).exclude(estado__in=ESTADOS_SIN_HORARIO)
+
+
+def cursos_sin_franjas(desde, hasta):
+    """Cursos vigentes cuyo horario no se pudo interpretar: no entran en la búsqueda de cruces"""
+    return cursos_vigentes(desde, hasta).filter(franjas=None).order_by('codigo')
+
+
+def cruces_del_periodo(desde, hasta):
+    """
+    Todos los cruces entre los cursos vigentes de ``desde`` a ``hasta``,
+    como CruceDetectado, uno por par de cursos, recurso y día.
+    """
+    cursos = cursos_vigentes(desde, hasta)
+    filas = FranjaHoraria.objects.filter(curso__in=cursos.values('pk')).values_list(
+        'curso', 'dia', 'hora_inicio', 'hora_fin', 'ambiente',
+        'curso__fecha_inicio', 'curso__fecha_fin', 'curso__instructor_coordinador',
+    )
+    asignados = defaultdict(set)
+    for curso_id, instructor_id in (
+        InstructorCurso.objects.filter(curso__in=cursos.values('pk')).values_list('curso', 'instructor')
+    ):
+        asignados[curso_id].add(instructor_id)
+
+    # (tipo, recurso, día) -> franjas (inicio, fin, curso, fecha de inicio, fecha de fin)
+    recursos = defaultdict(list)
+    for curso_id, dia, inicio, fin, ambiente, fecha_inicio, fecha_fin, coordinador in filas.iterator():
+        intervalo = (inicio, fin, curso_id, fecha_inicio, fecha_fin)
+        if ambiente:
+            recursos[AMBIENTE, ambiente, dia].append(intervalo)
+        for instructor_id in asignados[curso_id] | {coordinador}:
+            recursos[INSTRUCTOR, instructor_id, dia].append(intervalo)
+
+    cruces = set()
+    for (tipo, recurso, dia), intervalos in recursos.items():
+        intervalos.sort()
+        abiertos = []  # montículo (fin, inicio, curso, fecha de inicio, fecha de fin)
+        for inicio, fin, curso_id, fecha_inicio, fecha_fin in intervalos:
+            while abiertos and abiertos[0][0] <= inicio:
+                heapq.heappop(abiertos)
+            for otro_fin, otro_inicio, otro_id, otra_fecha_inicio, otra_fecha_fin in abiertos:
+                if otro_id != curso_id and fecha_inicio <= otra_fecha_fin and otra_fecha_inicio <= fecha_fin:
+                    cruce = Franja(dia, max(inicio, otro_inicio), min(fin, otro_fin))
+                    cruces.add(CruceDetectado(min(curso_id, otro_id), max(curso_id, otro_id), tipo, recurso, cruce))
+            heapq.heappush(abiertos, (fin, inicio, curso_id, fecha_inicio, fecha_fin))
+    return sorted(cruces, key=lambda cruce: (cruce.curso_id, cruce.otro_id, cruce.tipo, cruce.franja))
@@ -1,8 +1,9 @@
 from django import forms
 from .models import Curso, InstructorCurso, AprendizCurso
-from programas.models import Programa
-from instructores.models import Instructor
-from aprendices.models import Aprendiz
+from SENA_APP.autocompletar import FUENTES, Autocompletar
+from .cruces import ESTADOS_SIN_HORARIO, buscar_cruces
+from .horarios import HorarioInvalido, clave_ambiente, interpretar_horario
+from .inscripcion import LIMITE_REFERENCIAS, POR_DOCUMENTO, POR_ID, separar_referencias
 
 
 class CursoForm(forms.ModelForm):
@@ -33,10 +34,11 @@ class CursoForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Ingrese el nombre del curso'
             }),
-            'programa': forms.Select(attrs={
+            # Selectores con búsqueda: no cargan todas las filas
+            'programa': Autocompletar('programas', attrs={
                 'class': 'form-control'
             }),
-            'instructor_coordinador': forms.Select(attrs={
+            'instructor_coordinador': Autocompletar('instructores', attrs={
                 'class': 'form-control'
             }),
             'fecha_inicio': forms.DateInput(attrs={
@@ -49,7 +51,7 @@ class CursoForm(forms.ModelForm):
             }),
             'horario': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'Ej: Lunes a Viernes 8:00 AM - 12:00 PM'
+                'placeholder': 'Ej: Lunes a Viernes 8:00 AM - 12:00 PM; Sábado 8:00 - 12:00'
             }),
             'aula': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -86,10 +88,9 @@ class CursoForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar solo programas activos
-        self.fields['programa'].queryset = Programa.objects.filter(estado='ACT').order_by('nombre')
-        # Filtrar solo instructores activos
-        self.fields['instructor_coordinador'].queryset = Instructor.objects.filter(activo=True).order_by('apellido', 'nombre')
+        # Solo programas e instructores activos, los mismos que ofrece la búsqueda
+        self.fields['programa'].queryset = FUENTES['programas'].consulta()
+        self.fields['instructor_coordinador'].queryset = FUENTES['instructores'].consulta()
 
     # Validaciones personalizadas
     
@@ -119,7 +120,19 @@ class CursoForm(forms.ModelForm):
             raise forms.ValidationError("Los cupos máximos no pueden exceder 100.")
         
         return cupos
-    
+
+    def clean_horario(self):
+        """Interpretar el horario como franjas semanales (ver cursos/horarios.py)"""
+        horario = self.cleaned_data.get('horario', '').strip()
+        try:
+            self.franjas = interpretar_horario(horario)
+        except HorarioInvalido as error:
+            raise forms.ValidationError(
+                f"{error} Escriba los días y las horas, por ejemplo: "
+                "Lunes a Viernes 8:00 AM - 12:00 PM; Sábado 8:00 - 12:00."
+            )
+        return horario
+
     def clean(self):
         """Validaciones que involucran múltiples campos"""
         cleaned_data = super().clean()
@@ -139,9 +152,25 @@ class CursoForm(forms.ModelForm):
             if duracion_dias > 730:  # 2 años
                 self.add_error('fecha_fin', 
                     "La duración del curso parece demasiado larga. Verifique las fechas.")
-        
+
+        self._validar_cruces(cleaned_data)
         return cleaned_data
 
+    def _validar_cruces(self, cleaned_data):
+        """Que el ambiente y los instructores no estén ocupados a esas horas"""
+        if self.errors or cleaned_data.get('estado') in ESTADOS_SIN_HORARIO:
+            return
+        # El coordinador y, al editar, los instructores ya asignados al curso
+        instructores = [cleaned_data.get('instructor_coordinador')]
+        if self.instance.pk:
+            instructores += list(self.instance.instructores.all())
+        for cruce in buscar_cruces(
+            self.franjas, cleaned_data['fecha_inicio'], cleaned_data['fecha_fin'],
+            ambiente=clave_ambiente(cleaned_data.get('aula')), instructores=instructores,
+            excluir=self.instance.pk,
+        ):
+            self.add_error('horario', str(cruce))
+
 
 class InstructorCursoForm(forms.ModelForm):
     """Formulario para asignar instructores a cursos"""
@@ -150,10 +179,10 @@ class InstructorCursoForm(forms.ModelForm):
         model = InstructorCurso
         fields = ['instructor', 'curso', 'rol']
         widgets = {
-            'instructor': forms.Select(attrs={
+            'instructor': Autocompletar('instructores', attrs={
                 'class': 'form-control'
             }),
-            'curso': forms.Select(attrs={
+            'curso': Autocompletar('cursos', attrs={
                 'class': 'form-control'
             }),
             'rol': forms.TextInput(attrs={
@@ -169,8 +198,21 @@ class InstructorCursoForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar solo instructores activos
-        self.fields['instructor'].queryset = Instructor.objects.filter(activo=True).order_by('apellido', 'nombre')
+        # Solo instructores activos, los mismos que ofrece la búsqueda
+        self.fields['instructor'].queryset = FUENTES['instructores'].consulta()
+
+    def clean(self):
+        """Que el instructor no tenga otro curso a las mismas horas"""
+        cleaned_data = super().clean()
+        instructor = cleaned_data.get('instructor')
+        curso = cleaned_data.get('curso')
+        if instructor and curso and curso.estado not in ESTADOS_SIN_HORARIO:
+            franjas = [franja.franja() for franja in curso.franjas.all()]
+            for cruce in buscar_cruces(
+                franjas, curso.fecha_inicio, curso.fecha_fin, instructores=[instructor], excluir=curso.pk,
+            ):
+                self.add_error('instructor', str(cruce))
+        return cleaned_data
 
 
 class AprendizCursoForm(forms.ModelForm):
@@ -180,10 +222,10 @@ class AprendizCursoForm(forms.ModelForm):
         model = AprendizCurso
         fields = ['aprendiz', 'curso', 'estado', 'nota_final', 'observaciones']
         widgets = {
-            'aprendiz': forms.Select(attrs={
+            'aprendiz': Autocompletar('aprendices', attrs={
                 'class': 'form-control'
             }),
-            'curso': forms.Select(attrs={
+            'curso': Autocompletar('cursos', attrs={
                 'class': 'form-control'
             }),
             'estado': forms.Select(attrs={
@@ -234,4 +276,41 @@ class AprendizCursoForm(forms.ModelForm):
                     f"El curso {curso.codigo} no tiene cupos disponibles."
                 )
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class InscripcionGrupoForm(forms.Form):
+    """Formulario para inscribir una lista de aprendices en un curso"""
+
+    curso = forms.ModelChoiceField(
+        queryset=FUENTES['cursos'].consulta(),
+        label='Curso',
+        widget=Autocompletar('cursos', attrs={
+            'class': 'form-control'
+        })
+    )
+    por = forms.ChoiceField(
+        label='Identificar aprendices por',
+        choices=[(POR_DOCUMENTO, 'Documento'), (POR_ID, 'ID')],
+        initial=POR_DOCUMENTO,
+        widget=forms.Select(attrs={
+            'class': 'form-control'
+        })
+    )
+    aprendices = forms.CharField(
+        label='Aprendices',
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'placeholder': 'Documentos o IDs separados por comas, espacios o saltos de línea',
+            'rows': 8
+        })
+    )
+
+    def clean_aprendices(self):
+        """Separar la lista y limitar su tamaño"""
+        referencias = separar_referencias(self.cleaned_data.get('aprendices', ''))
+        if not referencias:
+            raise forms.ValidationError("Ingrese al menos un aprendiz.")
+        if len(referencias) > LIMITE_REFERENCIAS:
+            raise forms.ValidationError(f"Se pueden inscribir hasta {LIMITE_REFERENCIAS} aprendices a la vez.")
+        return referencias
@@ -0,0 +1,132 @@
+"""
+Interpretación del texto de ``Curso.horario`` como franjas semanales.
+
+``horario`` es texto libre ("Lunes a Viernes 8:00 AM - 12:00 PM"), así
+que no se puede comparar con el de otro curso. ``interpretar_horario`` lo
+convierte en una lista de ``Franja`` (día de la semana, hora de inicio y
+de fin), que se guardan en FranjaHoraria para detectar cruces de ambiente
+y de instructor (ver cursos/cruces.py). Acepta:
+
+* días sueltos, listas y rangos: "Lunes", "Lunes, Miércoles y Viernes",
+  "Lunes a Viernes", "Lun-Vie", "Sábados",
+* horas de 24 horas o con AM/PM: "14:00 - 18:00", "2 - 6 PM", "8am a 12m",
+* varias partes separadas por ";" o saltos de línea:
+  "Lunes y Miércoles 8:00-12:00; Viernes 14:00-18:00".
+
+Este módulo no usa la base de datos: lo importan también las migraciones.
+"""
+
+import re
+import unicodedata
+from datetime import time
+from typing import NamedTuple
+
+DIAS = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+# Nombre (sin tildes) o abreviatura de cada día, en plural también
+_DIA = r'(lun|mar|mie|jue|vie|sab|dom)[a-z]*'
+_RANGO_DIAS = re.compile(rf'\b{_DIA}\b(?:\s*(?:-|a|al|hasta)\s*\b{_DIA}\b)?')
+_HORA = r'(\d{1,2})(?:[:.h](\d{2}))?\s*(am|pm|a\.\s*m\.?|p\.\s*m\.?|m\b)?'
+_RANGO_HORAS = re.compile(rf'{_HORA}\s*(?:-|–|a|hasta)\s*{_HORA}')
+_ABREVIATURAS = ['lun', 'mar', 'mie', 'jue', 'vie', 'sab', 'dom']
+
+# Aulas que no se ocupan en exclusiva, o que no se indicaron
+AMBIENTES_COMPARTIDOS = {'', 'virtual', 'remoto', 'porasignar'}
+
+
+class HorarioInvalido(ValueError):
+    """El texto del horario no se pudo interpretar"""
+
+
+class Franja(NamedTuple):
+    dia: int
+    inicio: time
+    fin: time
+
+    def __str__(self):
+        return f"{DIAS[self.dia]} {self.inicio:%H:%M}-{self.fin:%H:%M}"
+
+    @property
+    def minutos(self):
+        return (self.fin.hour * 60 + self.fin.minute) - (self.inicio.hour * 60 + self.inicio.minute)
+
+    def se_cruza(self, otra):
+        return self.dia == otra.dia and self.inicio < otra.fin and otra.inicio < self.fin
+
+
+def _sin_tildes(texto):
+    return ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', texto)
+        if not unicodedata.combining(caracter)
+    ).casefold()
+
+
+def clave_ambiente(aula):
+    """
+    "Aula 101", "AULA-101" y "aula101" son el mismo ambiente. Devuelve ''
+    para los ambientes que varios cursos pueden usar a la vez.
+    """
+    clave = re.sub(r'[^a-z0-9]', '', _sin_tildes(aula or ''))
+    return '' if clave in AMBIENTES_COMPARTIDOS else clave
+
+
+def _dia(nombre):
+    return _ABREVIATURAS.index(nombre)
+
+
+def _hora(horas, minutos, meridiano):
+    horas, minutos = int(horas), int(minutos or 0)
+    meridiano = (meridiano or '').replace('.', '').replace(' ', '')
+    if horas > 23 or minutos > 59 or (meridiano and not 1 <= horas <= 12):
+        raise HorarioInvalido(f"La hora {horas}:{minutos:02d} no es válida.")
+    if meridiano == 'pm' and horas < 12:
+        horas += 12
+    elif meridiano == 'am' and horas == 12:
+        horas = 0
+    # "12 m" es mediodía: se deja como está
+    return horas, minutos, meridiano
+
+
+def _rango_horas(coincidencia):
+    h1, m1, mer1, h2, m2, mer2 = coincidencia.groups()
+    inicio_h, inicio_m, meridiano_inicio = _hora(h1, m1, mer1)
+    fin_h, fin_m, _ = _hora(h2, m2, mer2)
+    # "2 - 6 PM": el inicio sin AM/PM toma el del fin si así queda antes
+    if not meridiano_inicio and mer2 and mer2.startswith('p') and inicio_h < 12:
+        if (inicio_h + 12, inicio_m) < (fin_h, fin_m):
+            inicio_h += 12
+    inicio, fin = time(inicio_h, inicio_m), time(fin_h, fin_m)
+    if fin <= inicio:
+        raise HorarioInvalido(f"La hora de fin ({fin:%H:%M}) debe ser posterior a la de inicio ({inicio:%H:%M}).")
+    return inicio, fin
+
+
+def interpretar_horario(texto):
+    """
+    Franjas semanales del texto, ordenadas y sin repetir. Lanza
+    HorarioInvalido si alguna parte no tiene días o no tiene horas.
+    """
+    franjas = set()
+    for parte in re.split(r'[;\n]+', _sin_tildes(texto or '')):
+        if not parte.strip():
+            continue
+        rangos = list(_RANGO_HORAS.finditer(parte))
+        if not rangos:
+            raise HorarioInvalido(f'No se encontró el rango de horas en "{parte.strip()}".')
+        # Los días se buscan fuera de las horas ("a" también separa horas)
+        sin_horas = _RANGO_HORAS.sub(' ', parte)
+        dias = set()
+        for coincidencia in _RANGO_DIAS.finditer(sin_horas):
+            desde, hasta = _dia(coincidencia.group(1)), coincidencia.group(2)
+            hasta = _dia(hasta) if hasta else desde
+            if hasta < desde:
+                raise HorarioInvalido(f'El rango de días "{coincidencia.group(0)}" está invertido.')
+            dias.update(range(desde, hasta + 1))
+        if not dias:
+            raise HorarioInvalido(f'No se encontraron los días en "{parte.strip()}".')
+        for rango in rangos:
+            inicio, fin = _rango_horas(rango)
+            franjas.update(Franja(dia, inicio, fin) for dia in dias)
+    if not franjas:
+        raise HorarioInvalido("El horario está vacío.")
+    return sorted(franjas)
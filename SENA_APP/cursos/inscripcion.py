@@ -0,0 +1,183 @@
+"""
+Inscripción de un grupo de aprendices en un curso.
+
+Inscribir 30 aprendices con AprendizCursoForm son 30 envíos, cada uno con
+su conteo de cupos y su INSERT. ``inscribir_aprendices`` recibe la lista
+completa (documentos o ids) y, con un número fijo de consultas sin importar
+su tamaño:
+
+1. busca los aprendices con un ``IN``,
+2. descarta los que ya están inscritos en el curso con otro ``IN``,
+3. reserva de una vez los cupos que quedan (``reservar_cupo``) y
+4. crea las inscripciones con un solo ``bulk_create``.
+
+Los pasos 3 y 4 van en una transacción: si otro usuario inscribe a
+alguien en medio, o toma los cupos, se deshace todo y se vuelve a
+intentar una vez. Si el segundo intento también choca, no se inscribe a
+nadie y cada aprendiz queda como CURSO_CAMBIO para que se repita la
+operación. Si no hay cupo para todos se inscriben, en el orden recibido,
+los que quepan. El resultado informa qué pasó con cada referencia de la
+lista.
+
+``bulk_create`` no envía señales, así que la versión de los fragmentos de
+las listas y el resumen del reporte por programa se ajustan aquí. El
+contador ``inscritos`` y la fecha de actualización del curso los ajusta
+``reservar_cupo``.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from SENA_APP.fragmentos import incrementar_version
+from aprendices.models import Aprendiz
+from reportes.models import ajustar_resumen
+from .models import AprendizCurso, Curso, CursoSinCupos, reservar_cupo
+
+# Cómo se identifican los aprendices de la lista
+POR_DOCUMENTO = 'document'
+POR_ID = 'id'
+LIMITE_REFERENCIAS = 500
+
+INSCRITO = 'inscrito'
+YA_INSCRITO = 'ya_inscrito'
+NO_ENCONTRADO = 'no_encontrado'
+REPETIDO = 'repetido'
+SIN_CUPO = 'sin_cupo'
+CURSO_CAMBIO = 'curso_cambio'
+
+MENSAJES = {
+    INSCRITO: 'Inscrito.',
+    YA_INSCRITO: 'Ya estaba inscrito en el curso.',
+    NO_ENCONTRADO: 'No existe un aprendiz con esta referencia.',
+    REPETIDO: 'Repetido en la lista.',
+    SIN_CUPO: 'No quedan cupos en el curso.',
+    CURSO_CAMBIO: 'El curso cambió durante la inscripción; intente de nuevo.',
+}
+
+
+@dataclass
+class ResultadoAprendiz:
+    referencia: str
+    estado: str
+    aprendiz: Aprendiz = None
+
+    @property
+    def mensaje(self):
+        return MENSAJES[self.estado]
+
+
+@dataclass
+class ResultadoInscripcion:
+    filas: list = field(default_factory=list)
+
+    @property
+    def inscritos(self):
+        return [fila for fila in self.filas if fila.estado == INSCRITO]
+
+    @property
+    def rechazados(self):
+        return [fila for fila in self.filas if fila.estado != INSCRITO]
+
+    @property
+    def interrumpida(self):
+        """Otros usuarios cambiaron el curso en los dos intentos"""
+        return any(fila.estado == CURSO_CAMBIO for fila in self.filas)
+
+
+def separar_referencias(texto):
+    """Documentos o ids separados por comas, espacios o saltos de línea"""
+    return [parte for parte in re.split(r'[\s,;]+', texto) if parte]
+
+
+def inscribir_aprendices(curso_id, referencias, por=POR_DOCUMENTO):
+    """
+    Inscribir en el curso a los aprendices de ``referencias`` (documentos
+    o ids según ``por``). Devuelve un ResultadoInscripcion con una fila
+    por referencia, en el mismo orden.
+    """
+    referencias = [str(referencia).strip() for referencia in referencias]
+    claves = [_clave(referencia, por) for referencia in referencias]
+    unicas = list(dict.fromkeys(clave for clave in claves if clave))
+    if por == POR_ID:
+        valores = [int(clave) for clave in unicas if clave.isdecimal()]
+    else:
+        valores = unicas
+    encontrados = {
+        str(getattr(aprendiz, por)): aprendiz
+        for aprendiz in Aprendiz.objects.filter(**{f'{por}__in': valores})
+        .only('id', 'document', 'firstname', 'lastname')
+    }
+
+    aprendices = [encontrados[referencia] for referencia in unicas if referencia in encontrados]
+    estados = _inscribir(curso_id, aprendices)
+    if estados is None:
+        # Otro usuario inscribió a alguno o tomó cupos entre la consulta y
+        # la inserción: se vuelve a consultar una vez
+        estados = _inscribir(curso_id, aprendices)
+    if estados is None:
+        # Tampoco la segunda vez; la transacción se deshizo
+        estados = {aprendiz.id: CURSO_CAMBIO for aprendiz in aprendices}
+
+    resultado = ResultadoInscripcion()
+    vistas = set()
+    for referencia, clave in zip(referencias, claves):
+        aprendiz = encontrados.get(clave)
+        if clave in vistas:
+            estado = REPETIDO
+        elif aprendiz is None:
+            estado = NO_ENCONTRADO
+        else:
+            estado = estados[aprendiz.id]
+        vistas.add(clave)
+        resultado.filas.append(ResultadoAprendiz(referencia, estado, aprendiz))
+    return resultado
+
+
+def _clave(referencia, por):
+    """Forma de la referencia con la que se compara: "007" es el id 7"""
+    if por == POR_ID and referencia.isdecimal():
+        return str(int(referencia))
+    return referencia
+
+
+def _inscribir(curso_id, aprendices):
+    """
+    Estado de cada aprendiz (por id) tras intentar inscribirlos, o None si
+    otra transacción cambió las inscripciones o los cupos y hay que repetir.
+    """
+    existentes = set(
+        AprendizCurso.objects.filter(curso_id=curso_id, aprendiz__in=aprendices)
+        .values_list('aprendiz_id', flat=True)
+    )
+    nuevos = [aprendiz for aprendiz in aprendices if aprendiz.id not in existentes]
+    estados = {aprendiz.id: YA_INSCRITO for aprendiz in aprendices if aprendiz.id in existentes}
+    if not nuevos:
+        return estados
+
+    libres = (
+        Curso.objects.filter(pk=curso_id)
+        .values_list(F('cupos_maximos') - F('inscritos'), flat=True).first()
+    )
+    if libres is None:
+        raise Curso.DoesNotExist(f'No existe el curso {curso_id}.')
+    caben, sin_cupo = nuevos[:max(libres, 0)], nuevos[max(libres, 0):]
+    if caben:
+        try:
+            with transaction.atomic():
+                reservar_cupo(curso_id, len(caben))
+                AprendizCurso.objects.bulk_create([
+                    AprendizCurso(aprendiz=aprendiz, curso_id=curso_id) for aprendiz in caben
+                ])
+                # Los totales del reporte se confirman o se deshacen con las
+                # inscripciones; la versión de su fragmento cambia al confirmar
+                ajustar_resumen(None, AprendizCurso(curso_id=curso_id).huella(), cantidad=len(caben))
+        except (CursoSinCupos, IntegrityError):
+            return None
+        # Ya confirmada: un intento deshecho no cambia la versión
+        transaction.on_commit(lambda: incrementar_version(AprendizCurso))
+    estados.update({aprendiz.id: INSCRITO for aprendiz in caben})
+    estados.update({aprendiz.id: SIN_CUPO for aprendiz in sin_cupo})
+    return estados
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_concurrencia import copiar_base, esperar_servidor, puerto_libre
+
+SERVIDORES = ('wsgi', 'asgi')
+LISTAS = ['/', '/aprendices/', '/instructores/', '/programas/', '/cursos/']
+DETALLES = [
+    ('aprendices_aprendiz', '/aprendices/aprendiz/{}/'),
+    ('instructores_instructor', '/instructores/{}/'),
+    ('programas_programa', '/programas/{}/'),
+    ('cursos_curso', '/cursos/{}/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara peticiones por segundo y latencia de las vistas de lectura "
+        "(inicio, listas y detalles) servidas con WSGI (vistas síncronas en un "
+        "servidor con un grupo fijo de hilos) y con ASGI (vistas async en "
+        "uvicorn) con muchos clientes concurrentes. Cada servidor usa una "
+        "copia de la base de datos que se descarta al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=64, help='Peticiones simultáneas')
+        parser.add_argument('--segundos', type=float, default=10, help='Duración de cada medición')
+        parser.add_argument('--hilos', type=int, default=8, help='Hilos del servidor WSGI')
+        parser.add_argument('--servidores', nargs='+', choices=SERVIDORES, default=list(SERVIDORES))
+        parser.add_argument('--semilla', type=int, default=0, help='Semilla para elegir las URL')
+
+    def handle(self, *args, **options):
+        if 'asgi' in options['servidores'] and find_spec('uvicorn') is None:
+            raise CommandError('El servidor ASGI del benchmark es uvicorn: pip install uvicorn')
+        if settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1] not in ('sqlite3', 'sqlite'):
+            raise CommandError('El benchmark copia la base de datos SQLite.')
+        origen = settings.DATABASES['default']['NAME']
+
+        resultados = {}
+        with tempfile.TemporaryDirectory() as carpeta:
+            for servidor in options['servidores']:
+                copia = Path(carpeta) / f'{servidor}.sqlite3'
+                copiar_base(origen, copia)
+                rutas = rutas_lectura(copia)
+                self.stdout.write(f'Midiendo {servidor} ({len(rutas)} URL, {options["clientes"]} clientes)...')
+                resultados[servidor] = self.medir(servidor, copia, rutas, options)
+
+        self.stdout.write('')
+        self.stdout.write(f"{'servidor':<10}{'peticiones/s':>14}{'p50':>10}{'p95':>10}{'p99':>10}{'errores':>9}")
+        for servidor, resultado in resultados.items():
+            self.stdout.write(
+                f"{servidor:<10}{resultado['peticiones/s']:>14.1f}"
+                f"{resultado['p50']:>7.0f} ms{resultado['p95']:>7.0f} ms{resultado['p99']:>7.0f} ms"
+                f"{resultado['errores']:>9}"
+            )
+        if set(SERVIDORES) <= set(resultados) and resultados['wsgi']['peticiones/s']:
+            relacion = resultados['asgi']['peticiones/s'] / resultados['wsgi']['peticiones/s']
+            self.stdout.write(self.style.SUCCESS(f'ASGI / WSGI: {relacion:.2f}x peticiones por segundo.'))
+
+    def medir(self, servidor, copia, rutas, options):
+        puerto = puerto_libre()
+        entorno = {
+            **os.environ, 'SENA_DB_NOMBRE': str(copia),
+            'SENA_VISTAS_ASINCRONAS': '1' if servidor == 'asgi' else '0',
+        }
+        if servidor == 'asgi':
+            comando = [
+                sys.executable, '-m', 'uvicorn', 'SENA_APP.asgi:application',
+                '--host', '127.0.0.1', '--port', str(puerto), '--log-level', 'warning', '--no-access-log',
+            ]
+        else:
+            comando = [
+                sys.executable, 'manage.py', 'benchmark_concurrencia',
+                '--servir', str(puerto), '--hilos', str(options['hilos']),
+            ]
+        proceso = subprocess.Popen(
+            comando, cwd=settings.BASE_DIR, env=entorno,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            esperar_servidor(puerto, proceso)
+            return asyncio.run(cargar(puerto, rutas, options))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+def rutas_lectura(base, por_modelo=25):
+    """Listas y detalles de las primeras filas de cada modelo"""
+    rutas = list(LISTAS)
+    with sqlite3.connect(base) as conexion:
+        for tabla, ruta in DETALLES:
+            ids = conexion.execute(f'SELECT id FROM {tabla} ORDER BY id LIMIT ?', [por_modelo]).fetchall()
+            rutas.extend(ruta.format(fila[0]) for fila in ids)
+    conexion.close()
+    return rutas
+
+
+async def cargar(puerto, rutas, options):
+    # Calentar plantillas y cachés de cada URL antes de medir
+    for ruta in rutas:
+        await pedir(puerto, ruta)
+    azar = random.Random(options['semilla'])
+    registro = []
+    fin = time.monotonic() + options['segundos']
+    inicio = time.monotonic()
+    await asyncio.gather(*(
+        cliente(puerto, rutas, fin, registro, random.Random(azar.random()))
+        for _ in range(options['clientes'])
+    ))
+    return resumir(registro, time.monotonic() - inicio)
+
+
+async def cliente(puerto, rutas, fin, registro, azar):
+    while time.monotonic() < fin:
+        inicio = time.perf_counter()
+        codigo = await pedir(puerto, azar.choice(rutas))
+        registro.append((codigo == 200, time.perf_counter() - inicio))
+
+
+async def pedir(puerto, ruta, espera=60):
+    """GET con una conexión nueva (el servidor WSGI no mantiene conexiones); devuelve el código HTTP"""
+    try:
+        lector, escritor = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', puerto), espera)
+        escritor.write(f'GET {ruta} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n'.encode())
+        await escritor.drain()
+        respuesta = await asyncio.wait_for(lector.read(), espera)
+        escritor.close()
+        return int(respuesta.split(b' ', 2)[1])
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+        return 0
+
+
+def resumir(registro, duracion):
+    tiempos = sorted(segundos for exito, segundos in registro if exito)
+    resultado = {
+        'peticiones/s': len(tiempos) / duracion,
+        'errores': sum(1 for exito, _ in registro if not exito),
+    }
+    for nombre, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        resultado[nombre] = tiempos[max(int(len(tiempos) * q) - 1, 0)] * 1000 if tiempos else 0
+    return resultado
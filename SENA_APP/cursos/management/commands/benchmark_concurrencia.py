@@ -0,0 +1,263 @@
+import http.cookiejar
+import os
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+PERFILES = ('desarrollo', 'produccion')
+LECTURAS = ['/', '/aprendices/', '/instructores/', '/programas/', '/cursos/']
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide lecturas y escrituras concurrentes contra las vistas CRUD con cada "
+        "perfil de base de datos (SENA_DB_PERFIL). Cada perfil corre en un "
+        "servidor WSGI aparte con un número fijo de hilos, como gunicorn "
+        "--threads, sobre una copia de la base de datos que se descarta al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=8, help='Clientes que solo leen listas')
+        parser.add_argument('--escritores', type=int, default=4, help='Clientes que crean y editan aprendices')
+        parser.add_argument('--segundos', type=float, default=10, help='Duración de cada medición')
+        parser.add_argument('--hilos', type=int, default=8, help='Hilos del servidor WSGI')
+        parser.add_argument('--perfiles', nargs='+', choices=PERFILES, default=list(PERFILES))
+        # Uso interno: proceso servidor de un perfil
+        parser.add_argument('--servir', type=int, metavar='PUERTO', help='(interno) servir en este puerto')
+
+    def handle(self, *args, **options):
+        if options['servir']:
+            return servir(options['servir'], options['hilos'])
+
+        origen = settings.DATABASES['default']['NAME']
+        if settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1] not in ('sqlite3', 'sqlite'):
+            raise CommandError('El benchmark de concurrencia es para SQLite.')
+
+        resultados = {}
+        with tempfile.TemporaryDirectory() as carpeta:
+            for perfil in options['perfiles']:
+                copia = Path(carpeta) / f'{perfil}.sqlite3'
+                copiar_base(origen, copia)
+                self.stdout.write(f'Midiendo perfil {perfil}...')
+                resultados[perfil] = self.medir(perfil, copia, options)
+
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'perfil':<12}{'lecturas/s':>12}{'escrituras/s':>14}{'errores':>9}"
+            f"{'p95 lectura':>13}{'p95 escritura':>15}"
+        )
+        for perfil, resultado in resultados.items():
+            self.stdout.write(
+                f"{perfil:<12}{resultado['lecturas/s']:>12.1f}{resultado['escrituras/s']:>14.1f}"
+                f"{resultado['errores']:>9}{resultado['p95 lectura']:>10.0f} ms{resultado['p95 escritura']:>12.0f} ms"
+            )
+        if set(PERFILES) <= set(resultados):
+            antes, despues = resultados['desarrollo'], resultados['produccion']
+            total_antes = antes['lecturas/s'] + antes['escrituras/s']
+            total_despues = despues['lecturas/s'] + despues['escrituras/s']
+            if total_antes:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Rendimiento total: {total_despues / total_antes:.2f}x con el perfil de producción.'
+                ))
+
+    def medir(self, perfil, copia, options):
+        puerto = puerto_libre()
+        entorno = {**os.environ, 'SENA_DB_PERFIL': perfil, 'SENA_DB_NOMBRE': str(copia)}
+        servidor = subprocess.Popen(
+            [sys.executable, 'manage.py', 'benchmark_concurrencia',
+             '--servir', str(puerto), '--hilos', str(options['hilos'])],
+            cwd=settings.BASE_DIR, env=entorno,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            base = f'http://127.0.0.1:{puerto}'
+            esperar_servidor(puerto, servidor)
+            existentes = aprendices_existentes(copia)
+            programa = programa_existente(copia)
+            fin = time.monotonic() + options['segundos']
+            registro = []
+            hilos = [
+                threading.Thread(target=leer, args=(base, fin, registro))
+                for _ in range(options['lectores'])
+            ] + [
+                threading.Thread(target=escribir, args=(base, fin, registro, numero, existentes, programa))
+                for numero in range(options['escritores'])
+            ]
+            inicio = time.monotonic()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.monotonic() - inicio
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        return resumir(registro, duracion)
+
+
+def servir(puerto, hilos):
+    servidor = ServidorConHilos(('127.0.0.1', puerto), HandlerSilencioso, hilos=hilos)
+    servidor.set_app(get_wsgi_application())
+    servidor.serve_forever()
+
+
+class ServidorConHilos(WSGIServer):
+    """
+    Servidor WSGI con un grupo fijo de hilos. A diferencia de runserver,
+    que crea un hilo por petición, cada hilo vive toda la prueba y puede
+    conservar su conexión a la base de datos (CONN_MAX_AGE).
+    """
+
+    # La cola de Django (10) rechaza conexiones con muchos clientes a la
+    # vez; se usa la misma que uvicorn para comparar con benchmark_asgi
+    request_queue_size = 2048
+
+    def __init__(self, *args, hilos=8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grupo = ThreadPoolExecutor(hilos)
+
+    def process_request(self, request, client_address):
+        self.grupo.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class HandlerSilencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Cliente:
+    """Cliente HTTP con cookies (sesión y CSRF) que no sigue redirecciones"""
+
+    def __init__(self, base):
+        self.base = base
+        self.abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), SinRedirecciones,
+        )
+        self.token = None
+
+    def pedir(self, ruta, datos=None):
+        """Devolver (código HTTP, cuerpo); las redirecciones cuentan como éxito"""
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos is not None else None
+        try:
+            with self.abridor.open(self.base + ruta, cuerpo, timeout=60) as respuesta:
+                return respuesta.status, respuesta.read()
+        except urllib.error.HTTPError as error:
+            return error.code, b''
+        except OSError:
+            return 0, b''
+
+    def enviar(self, ruta, datos):
+        if self.token is None:
+            _, html = self.pedir('/aprendices/crear/')
+            encontrado = re.search(rb'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+            self.token = encontrado.group(1).decode() if encontrado else ''
+        return self.pedir(ruta, {**datos, 'csrfmiddlewaretoken': self.token})
+
+
+def leer(base, fin, registro):
+    cliente = Cliente(base)
+    while time.monotonic() < fin:
+        inicio = time.perf_counter()
+        codigo, _ = cliente.pedir(random.choice(LECTURAS))
+        registro.append(('lectura', codigo < 400 and codigo != 0, time.perf_counter() - inicio))
+
+
+def escribir(base, fin, registro, numero, existentes, programa):
+    cliente = Cliente(base)
+    secuencia = 0
+    while time.monotonic() < fin:
+        secuencia += 1
+        datos = {
+            'firstname': 'Carga', 'lastname': f'Concurrente {numero}', 'phone': '3001234567',
+            'email': 'carga@correo.com', 'birthdate': '2000-01-01', 'city': 'Popayán', 'programa': programa,
+        }
+        if existentes and secuencia % 2:
+            aprendiz_id, documento = random.choice(existentes)
+            ruta = f'/aprendices/{aprendiz_id}/editar/'
+        else:
+            documento = str(8_000_000_000 + numero * 1_000_000 + secuencia)
+            ruta = '/aprendices/crear/'
+        inicio = time.perf_counter()
+        codigo, _ = cliente.enviar(ruta, {**datos, 'document': documento})
+        # Un formulario válido redirige (302); 200 sería el formulario con errores
+        registro.append(('escritura', codigo == 302, time.perf_counter() - inicio))
+
+
+def resumir(registro, duracion):
+    resultado = {'errores': sum(1 for _, exito, _ in registro if not exito)}
+    for tipo in ('lectura', 'escritura'):
+        tiempos = sorted(segundos for t, exito, segundos in registro if t == tipo and exito)
+        resultado[f'{tipo}s/s'] = len(tiempos) / duracion
+        p95 = tiempos[int(len(tiempos) * 0.95) - 1] if tiempos else 0
+        resultado[f'p95 {tipo}'] = p95 * 1000
+    return resultado
+
+
+def copiar_base(origen, destino):
+    """Copia consistente con la API de respaldo de SQLite (aunque haya escrituras en curso)"""
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(destino) as copia:
+        fuente.backup(copia)
+    fuente.close()
+    copia.close()
+
+
+def aprendices_existentes(base, limite=200):
+    with sqlite3.connect(base) as conexion:
+        filas = conexion.execute('SELECT id, document FROM aprendices_aprendiz LIMIT ?', [limite]).fetchall()
+    conexion.close()
+    return filas
+
+
+def programa_existente(base):
+    with sqlite3.connect(base) as conexion:
+        fila = conexion.execute('SELECT id FROM programas_programa ORDER BY id LIMIT 1').fetchone()
+    conexion.close()
+    return fila[0] if fila else ''
+
+
+def puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def esperar_servidor(puerto, proceso, espera=30):
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise CommandError('El servidor de prueba terminó antes de empezar la medición.')
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError('El servidor de prueba no respondió a tiempo.')
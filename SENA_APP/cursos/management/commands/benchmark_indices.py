@@ -0,0 +1,222 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from SENA_APP.autocompletar import FUENTES, POR_PAGINA
+from SENA_APP.paginacion import KeysetPaginator
+from aprendices.models import Aprendiz
+from cursos.models import ESTADOS_SIN_CUPO, AprendizCurso, Curso
+from instructores.models import Instructor
+from programas.models import Programa
+from reportes.models import reconstruir_resumenes
+
+MODELOS_INDEXADOS = [Aprendiz, Instructor, Programa, Curso, AprendizCurso]
+TAM_LOTE = 5000
+
+
+class Revertir(Exception):
+    """Deshacer los datos sembrados y los índices borrados al terminar"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el plan (EXPLAIN) y el tiempo de las consultas más frecuentes "
+        "con y sin los índices compuestos de los modelos. Siembra un conjunto "
+        "de datos sintético dentro de una transacción que se deshace al final, "
+        "así que la base de datos queda intacta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programas', type=int, default=200)
+        parser.add_argument('--instructores', type=int, default=2000)
+        parser.add_argument('--cursos', type=int, default=20000)
+        parser.add_argument('--aprendices', type=int, default=100000)
+        parser.add_argument('--inscripciones', type=int, default=300000)
+        parser.add_argument(
+            '--sin-sembrar', action='store_true',
+            help='Medir sobre los datos existentes sin agregar filas sintéticas',
+        )
+        parser.add_argument('--repeticiones', type=int, default=5, help='Ejecuciones por consulta (se reporta la mediana)')
+        parser.add_argument('--semilla', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.repeticiones = options['repeticiones']
+        try:
+            with transaction.atomic():
+                if not options['sin_sembrar']:
+                    inicio = time.perf_counter()
+                    sembrar(options, random.Random(options['semilla']))
+                    self.stdout.write(f'Datos sembrados en {time.perf_counter() - inicio:.1f} s.')
+                with connection.cursor() as cursor:
+                    # Estadísticas para que el planificador elija entre índices como en producción
+                    cursor.execute('ANALYZE')
+                consultas = consultas_frecuentes()
+                despues = [self.medir(consulta, 'con índices') for consulta in consultas]
+                borrar_indices()
+                antes = [self.medir(consulta, 'sin índices') for consulta in consultas]
+                raise Revertir
+        except Revertir:
+            pass
+
+        for (nombre, _, _), (t_antes, plan_antes), (t_despues, plan_despues) in zip(consultas, antes, despues):
+            self.stdout.write(self.style.MIGRATE_HEADING(nombre))
+            self.stdout.write(f'  sin índices: {t_antes:8.2f} ms')
+            self.escribir_plan(plan_antes)
+            self.stdout.write(f'  con índices: {t_despues:8.2f} ms')
+            self.escribir_plan(plan_despues)
+            if t_despues > 0:
+                self.stdout.write(self.style.SUCCESS(f'  {t_antes / t_despues:.1f}x'))
+
+    def medir(self, consulta, fase):
+        _, queryset, ejecutar = consulta
+        plan = explicar(queryset, fase)
+        tiempos = []
+        for _ in range(self.repeticiones):
+            inicio = time.perf_counter()
+            # .all() crea un queryset nuevo para no leer la caché de resultados
+            ejecutar(queryset.all())
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos), plan
+
+    def escribir_plan(self, plan):
+        for linea in plan:
+            self.stdout.write(f'      {linea}')
+
+
+def explicar(queryset, fase):
+    """Plan de ejecución del queryset, una línea por paso"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        # El comentario distingue el texto de la sentencia en cada fase:
+        # sqlite3 reutiliza sentencias preparadas y un EXPLAIN guardado no
+        # se entera de que los índices ya no existen
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} /* {fase} */', params)
+        return [str(fila[-1]) for fila in cursor.fetchall()]
+
+
+def consultas_frecuentes():
+    """
+    (nombre, queryset, cómo ejecutarlo) de los caminos calientes: listas
+    paginadas por cursor, selectores de los formularios y el detalle de curso.
+    """
+    cursos = KeysetPaginator(Curso.objects.all(), ('-fecha_inicio', '-id'))
+    aprendices = KeysetPaginator(Aprendiz.objects.all(), ('lastname', 'id'))
+    curso_medio = Curso.objects.order_by('-fecha_inicio', '-id')[Curso.objects.count() // 2]
+    aprendiz_medio = Aprendiz.objects.order_by('lastname', 'id')[Aprendiz.objects.count() // 2]
+    # El curso con más inscripciones es el peor caso del detalle
+    curso_lleno = Curso.objects.order_by('-inscritos').first() or curso_medio
+    listar = list
+
+    return [
+        (
+            'Lista de cursos, página profunda',
+            Curso.objects.filter(cursos.filtro([curso_medio.fecha_inicio, curso_medio.id]))
+            .order_by(*cursos.orden())[:cursos.por_pagina + 1],
+            listar,
+        ),
+        (
+            'Lista de aprendices, página profunda',
+            Aprendiz.objects.filter(aprendices.filtro([aprendiz_medio.lastname, aprendiz_medio.id]))
+            .order_by(*aprendices.orden())[:aprendices.por_pagina + 1],
+            listar,
+        ),
+        (
+            'Cursos en ejecución por fecha de inicio',
+            Curso.objects.filter(estado='EJE').order_by('-fecha_inicio')[:50],
+            listar,
+        ),
+        (
+            'Búsqueda de instructores activos por apellido',
+            busqueda('instructores', 'apellido1'),
+            listar,
+        ),
+        (
+            'Búsqueda de programas activos por nombre',
+            busqueda('programas', 'programa 1'),
+            listar,
+        ),
+        (
+            'Búsqueda de aprendices por apellido',
+            busqueda('aprendices', 'apellido1'),
+            listar,
+        ),
+        (
+            'Inscripciones activas de un curso',
+            AprendizCurso.objects.filter(curso=curso_lleno).exclude(estado__in=ESTADOS_SIN_CUPO),
+            lambda queryset: queryset.count(),
+        ),
+    ]
+
+
+def busqueda(fuente, texto):
+    """Primera página de un selector con búsqueda (SENA_APP/autocompletar.py)"""
+    filas, ordenamiento = FUENTES[fuente].buscar(texto)
+    return filas.order_by(*ordenamiento)[:POR_PAGINA + 1]
+
+
+def borrar_indices():
+    """Quitar los índices declarados en Meta.indexes (dentro de la transacción en curso)"""
+    with connection.cursor() as cursor:
+        for modelo in MODELOS_INDEXADOS:
+            for indice in modelo._meta.indexes:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(indice.name)}')
+
+
+def sembrar(options, azar):
+    """Datos sintéticos mínimos para las consultas medidas (no pasan por los formularios)"""
+    hoy = date.today()
+    estados_programa = [codigo for codigo, _ in Programa.ESTADO_CHOICES]
+    programas = Programa.objects.bulk_create([
+        Programa(
+            codigo=f'BENCH-P{i}', nombre=f'Programa {azar.randrange(10 ** 6):06d}',
+            nivel_formacion='TEG', duracion_meses=24, duracion_horas=3000,
+            descripcion='-', competencias='-', perfil_egreso='-', requisitos_ingreso='-',
+            centro_formacion='-', regional='-', estado=azar.choice(estados_programa),
+            fecha_creacion=hoy,
+        )
+        for i in range(options['programas'])
+    ], batch_size=TAM_LOTE)
+    instructores = Instructor.objects.bulk_create([
+        Instructor(
+            documento_id=f'BENCH-I{i}', nombre=f'Nombre{azar.randrange(500)}',
+            apellido=f'Apellido{azar.randrange(2000):04d}', fecha_nacimiento=date(1980, 1, 1),
+            especialidad='-', anos_experiencia=5, activo=azar.random() < 0.8,
+            fecha_vinculacion=hoy,
+        )
+        for i in range(options['instructores'])
+    ], batch_size=TAM_LOTE)
+    estados_curso = [codigo for codigo, _ in Curso.ESTADO_CHOICES]
+    cursos = []
+    for i in range(options['cursos']):
+        inicio = hoy - timedelta(days=azar.randrange(3650))
+        cursos.append(Curso(
+            codigo=f'BENCH-C{i}', nombre=f'Curso {i}', programa=azar.choice(programas),
+            instructor_coordinador=azar.choice(instructores),
+            fecha_inicio=inicio, fecha_fin=inicio + timedelta(days=365),
+            horario='-', aula='-', cupos_maximos=40, estado=azar.choice(estados_curso),
+        ))
+    cursos = Curso.objects.bulk_create(cursos, batch_size=TAM_LOTE)
+    aprendices = Aprendiz.objects.bulk_create([
+        Aprendiz(
+            document=f'BENCH-A{i}', firstname=f'Nombre{azar.randrange(500)}',
+            lastname=f'Apellido{azar.randrange(5000):04d}', birthdate=date(2000, 1, 1),
+            programa=azar.choice(programas),
+        )
+        for i in range(options['aprendices'])
+    ], batch_size=TAM_LOTE)
+    if not cursos or not aprendices:
+        return
+    estados_inscripcion = [codigo for codigo, _ in AprendizCurso.ESTADO_CHOICES]
+    pares = set()
+    while len(pares) < min(options['inscripciones'], len(cursos) * len(aprendices)):
+        pares.add((azar.randrange(len(aprendices)), azar.randrange(len(cursos))))
+    AprendizCurso.objects.bulk_create([
+        AprendizCurso(aprendiz=aprendices[a], curso=cursos[c], estado=azar.choice(estados_inscripcion))
+        for a, c in pares
+    ], batch_size=TAM_LOTE)
+    Curso.objects.filter(codigo__startswith='BENCH-C').recalcular_inscritos()
+    reconstruir_resumenes()
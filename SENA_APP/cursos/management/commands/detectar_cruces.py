@@ -0,0 +1,68 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from cursos.cruces import INSTRUCTOR, cruces_del_periodo, cursos_sin_franjas, reconstruir_franjas
+from cursos.models import Curso
+from instructores.models import Instructor
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca los cruces de ambiente y de instructor entre los cursos "
+        "vigentes en un periodo (por defecto, los próximos seis meses), y "
+        "los cursos del periodo cuyo horario no se entiende."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, help='Fecha AAAA-MM-DD (por defecto, hoy)')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Fecha AAAA-MM-DD (por defecto, seis meses después)')
+        parser.add_argument(
+            '--reconstruir', action='store_true',
+            help='Interpretar antes el horario de todos los cursos (tras cargas con SQL directo)',
+        )
+        parser.add_argument(
+            '--limite', type=int, default=50,
+            help='Cruces y cursos sin franjas que se listan (por defecto, 50)',
+        )
+
+    def handle(self, *args, **options):
+        desde = options['desde'] or date.today()
+        hasta = options['hasta'] or desde + timedelta(days=182)
+        if options['reconstruir']:
+            self.stdout.write(f'{reconstruir_franjas()} franjas interpretadas.')
+
+        inicio = time.perf_counter()
+        cruces = cruces_del_periodo(desde, hasta)
+        segundos = time.perf_counter() - inicio
+
+        mostrados = cruces[:options['limite']]
+        codigos = dict(
+            Curso.objects.filter(pk__in={c.curso_id for c in mostrados} | {c.otro_id for c in mostrados})
+            .values_list('pk', 'codigo')
+        )
+        instructores = Instructor.objects.in_bulk({c.recurso for c in mostrados if c.tipo == INSTRUCTOR})
+        for cruce in mostrados:
+            recurso = instructores[cruce.recurso] if cruce.tipo == INSTRUCTOR else cruce.recurso
+            self.stdout.write(
+                f'{codigos[cruce.curso_id]} y {codigos[cruce.otro_id]}: {cruce.tipo} {recurso}, {cruce.franja}'
+            )
+        if len(cruces) > len(mostrados):
+            self.stdout.write(f'... y {len(cruces) - len(mostrados)} más.')
+
+        estilo = self.style.WARNING if cruces else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f'{len(cruces)} cruces entre el {desde} y el {hasta} ({segundos:.2f} s).'
+        ))
+
+        sin_franjas = cursos_sin_franjas(desde, hasta).values_list('codigo', 'horario')
+        total = sin_franjas.count()
+        if total:
+            for codigo, horario in sin_franjas[:options['limite']]:
+                self.stdout.write(f'{codigo}: "{horario}"')
+            if total > options['limite']:
+                self.stdout.write(f'... y {total - options["limite"]} más.')
+            self.stdout.write(self.style.WARNING(
+                f'{total} cursos sin franjas: corrija su horario para detectar sus cruces.'
+            ))
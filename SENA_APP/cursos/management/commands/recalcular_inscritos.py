@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from SENA_APP.fragmentos import incrementar_version
+from cursos.models import Curso
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el contador 'inscritos' de los cursos a partir de sus "
+        "inscripciones. Útil después de cargas masivas o de actualizaciones "
+        "hechas con QuerySet.update(), que no mantienen el contador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'codigos', nargs='*',
+            help='Códigos de los cursos a reparar (por defecto, todos)',
+        )
+
+    def handle(self, *args, **options):
+        cursos = Curso.objects.all()
+        if options['codigos']:
+            cursos = cursos.filter(codigo__in=options['codigos'])
+        actualizados = cursos.recalcular_inscritos()
+        # La ocupación se muestra en la lista de cursos cacheada
+        incrementar_version(Curso)
+        self.stdout.write(self.style.SUCCESS(f'{actualizados} cursos recalculados.'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_inscritos(apps, schema_editor):
+    Curso = apps.get_model('cursos', 'Curso')
+    AprendizCurso = apps.get_model('cursos', 'AprendizCurso')
+    conteo = (
+        AprendizCurso.objects
+        .filter(curso=OuterRef('pk'))
+        .exclude(estado='DES')
+        .order_by()
+        .values('curso')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Curso.objects.update(inscritos=Coalesce(Subquery(conteo), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='inscritos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Aprendices Inscritos'),
+        ),
+        migrations.RunPython(calcular_inscritos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0002_curso_inscritos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aprendizcurso',
+            index=models.Index(fields=['curso', 'estado'], name='inscripcion_curso_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['-fecha_inicio', '-id'], name='curso_inicio_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['estado', 'fecha_inicio'], name='curso_estado_inicio_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aprendices', '0003_indices_consultas'),
+        ('cursos', '0003_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aprendizcurso',
+            name='aprendiz',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='aprendices.aprendiz'),
+        ),
+        migrations.AlterField(
+            model_name='aprendizcurso',
+            name='curso',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='cursos.curso'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0004_inscripcion_sin_indices_redundantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización'),
+        ),
+    ]
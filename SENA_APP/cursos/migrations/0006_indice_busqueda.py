@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0005_curso_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(django.db.models.functions.text.Lower('codigo'), models.F('id'), name='curso_busqueda_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from cursos.horarios import HorarioInvalido, clave_ambiente, interpretar_horario
+
+TAM_LOTE = 2000
+
+
+def interpretar_horarios(apps, schema_editor):
+    """
+    Franjas de los cursos existentes. Los horarios que no se entienden
+    quedan sin franjas, sin imprimir nada: ``python manage.py
+    detectar_cruces`` lista esos cursos para corregirlos.
+    """
+    Curso = apps.get_model('cursos', 'Curso')
+    FranjaHoraria = apps.get_model('cursos', 'FranjaHoraria')
+    lote = []
+    for curso_id, horario, aula in Curso.objects.order_by('pk').values_list(
+        'pk', 'horario', 'aula',
+    ).iterator(chunk_size=TAM_LOTE):
+        try:
+            franjas = interpretar_horario(horario)
+        except HorarioInvalido:
+            continue
+        ambiente = clave_ambiente(aula)
+        lote += [
+            FranjaHoraria(curso_id=curso_id, dia=dia, hora_inicio=inicio, hora_fin=fin, ambiente=ambiente)
+            for dia, inicio, fin in franjas
+        ]
+        if len(lote) >= TAM_LOTE:
+            FranjaHoraria.objects.bulk_create(lote)
+            lote = []
+    FranjaHoraria.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0006_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FranjaHoraria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.PositiveSmallIntegerField(choices=[(0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'), (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo')], verbose_name='Día')),
+                ('hora_inicio', models.TimeField(verbose_name='Hora de Inicio')),
+                ('hora_fin', models.TimeField(verbose_name='Hora de Fin')),
+                ('ambiente', models.CharField(blank=True, max_length=50, verbose_name='Ambiente')),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='franjas', to='cursos.curso', verbose_name='Curso')),
+            ],
+            options={
+                'verbose_name': 'Franja Horaria',
+                'verbose_name_plural': 'Franjas Horarias',
+                'ordering': ['dia', 'hora_inicio'],
+                'indexes': [models.Index(fields=['ambiente', 'dia', 'hora_inicio'], name='franja_ambiente_dia_idx')],
+            },
+        ),
+        migrations.RunPython(interpretar_horarios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+def calcular_minutos(apps, schema_editor):
+    """Un UPDATE por cada par de horas distinto, que son pocos"""
+    FranjaHoraria = apps.get_model('cursos', 'FranjaHoraria')
+    for inicio, fin in FranjaHoraria.objects.order_by().values_list('hora_inicio', 'hora_fin').distinct():
+        FranjaHoraria.objects.filter(hora_inicio=inicio, hora_fin=fin).update(
+            minutos=(fin.hour * 60 + fin.minute) - (inicio.hour * 60 + inicio.minute),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0007_franjas_horarias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='franjahoraria',
+            name='minutos',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Duración en Minutos'),
+        ),
+        migrations.RunPython(calcular_minutos, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,67 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Lower, NullIf
+from django.utils import timezone
+
+from programas.models import textos_largos
+from .horarios import DIAS, Franja
 
 # Create your models here.
 
+# Estados de AprendizCurso que no ocupan cupo en el curso
+ESTADOS_SIN_CUPO = ('DES',)
+
+
+class CursoSinCupos(Exception):
+    """No quedan cupos en el curso para reservar"""
+
+    def __init__(self, curso_id):
+        self.curso_id = curso_id
+        super().__init__(f"El curso {curso_id} no tiene cupos disponibles.")
+
+
+class CursoQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Programa y coordinador en la misma consulta, sin los textos largos
+        del programa, que las páginas de cursos no muestran.
+        """
+        return (
+            self.select_related('programa', 'instructor_coordinador')
+            .defer(*textos_largos('programa'))
+        )
+
+    def con_ocupacion(self):
+        """
+        Anotar cupos libres y porcentaje de ocupación a partir del contador
+        ``inscritos``, sin ejecutar un COUNT por cada curso de la lista.
+        """
+        return self.annotate(
+            cupos_libres=ExpressionWrapper(
+                F('cupos_maximos') - F('inscritos'), output_field=IntegerField()
+            ),
+            ocupacion=ExpressionWrapper(
+                F('inscritos') * 100.0 / NullIf(F('cupos_maximos'), 0), output_field=FloatField()
+            ),
+        )
+
+    def recalcular_inscritos(self):
+        """
+        Reparar el contador ``inscritos`` de los cursos del queryset con un
+        solo UPDATE que cuenta las inscripciones que ocupan cupo.
+        """
+        conteo = (
+            AprendizCurso.objects
+            .filter(curso=OuterRef('pk'))
+            .exclude(estado__in=ESTADOS_SIN_CUPO)
+            .order_by()
+            .values('curso')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return self.update(inscritos=Coalesce(Subquery(conteo), Value(0)), fecha_actualizacion=timezone.now())
+
+
 class Curso(models.Model):
     ESTADO_CHOICES = [
         ('PRO', 'Programado'),
@@ -26,23 +86,104 @@ class Curso(models.Model):
     estado = models.CharField(max_length=3, choices=ESTADO_CHOICES, default='PRO', verbose_name="Estado del Curso")
     observaciones = models.TextField(blank=True, null=True, verbose_name="Observaciones")
     fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Registro")
+    # Se actualiza también en los UPDATE del contador de inscritos y al
+    # cambiar los instructores asignados (ver cursos/signals.py)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+    # Contador desnormalizado de inscripciones que ocupan cupo. Lo mantiene
+    # AprendizCurso al guardarse o eliminarse; ver recalcular_inscritos.
+    inscritos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Aprendices Inscritos")
+
+    objects = CursoQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
         ordering = ['-fecha_inicio']
+        indexes = [
+            # Lista paginada por cursor ('-fecha_inicio', '-id')
+            models.Index(fields=['-fecha_inicio', '-id'], name='curso_inicio_id_idx'),
+            # Cursos de un estado ordenados por fecha de inicio
+            models.Index(fields=['estado', 'fecha_inicio'], name='curso_estado_inicio_idx'),
+            # Búsqueda por prefijo del código en los selectores (SENA_APP/autocompletar.py)
+            models.Index(Lower('codigo'), 'id', name='curso_busqueda_idx'),
+        ]
 
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Horario y aula cargados, para no rehacer sus franjas si no cambian
+        # (cursos/signals.py). Sin leer los campos diferidos
+        instancia._horario_original = (instancia.__dict__.get('horario'), instancia.__dict__.get('aula'))
+        return instancia
+
     def cupos_disponibles(self):
-        return self.cupos_maximos - self.aprendices.count()
+        return self.cupos_maximos - self.inscritos
 
     def porcentaje_ocupacion(self):
         if self.cupos_maximos > 0:
-            return (self.aprendices.count() / self.cupos_maximos) * 100
+            return (self.inscritos / self.cupos_maximos) * 100
         return 0
 
+    def save(self, *args, **kwargs):
+        """
+        Guardar el curso sin escribir nunca el contador de inscritos.
+
+        Una instancia cargada antes de una inscripción tiene ``inscritos``
+        desactualizado; al editarla (formulario, admin) no debe pisar el
+        valor de la base. El contador solo lo cambian reservar_cupo,
+        ajustar_inscritos y recalcular_inscritos, con UPDATE sobre la fila.
+        """
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                # Como hace Django con una instancia diferida: solo lo cargado
+                diferidos = self.get_deferred_fields()
+                update_fields = [
+                    campo.name for campo in self._meta.concrete_fields
+                    if not campo.primary_key and campo.attname not in diferidos
+                ]
+            kwargs['update_fields'] = [campo for campo in update_fields if campo != 'inscritos']
+        super().save(*args, **kwargs)
+
+
+class FranjaHoraria(models.Model):
+    """
+    Una franja semanal del horario de un curso, interpretada del texto de
+    ``Curso.horario`` (ver cursos/horarios.py). Se rehacen al cambiar el
+    horario o el aula del curso.
+    """
+
+    DIA_CHOICES = list(enumerate(DIAS))
+
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='franjas', verbose_name="Curso")
+    dia = models.PositiveSmallIntegerField(choices=DIA_CHOICES, verbose_name="Día")
+    hora_inicio = models.TimeField(verbose_name="Hora de Inicio")
+    hora_fin = models.TimeField(verbose_name="Hora de Fin")
+    # clave_ambiente(curso.aula); vacía si el ambiente se puede compartir
+    ambiente = models.CharField(max_length=50, blank=True, verbose_name="Ambiente")
+    # hora_fin - hora_inicio, para sumar la carga de los instructores sin
+    # extraer horas y minutos fila por fila (instructores/carga.py)
+    minutos = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Duración en Minutos")
+
+    class Meta:
+        verbose_name = "Franja Horaria"
+        verbose_name_plural = "Franjas Horarias"
+        ordering = ['dia', 'hora_inicio']
+        indexes = [
+            # Índice de intervalos por ambiente: las franjas de un ambiente en
+            # un día, ordenadas por hora de inicio (ver cursos/cruces.py)
+            models.Index(fields=['ambiente', 'dia', 'hora_inicio'], name='franja_ambiente_dia_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.curso_id}: {self.franja()}"
+
+    def franja(self):
+        return Franja(self.dia, self.hora_inicio, self.hora_fin)
+
 
 class InstructorCurso(models.Model):
     instructor = models.ForeignKey('instructores.Instructor', on_delete=models.CASCADE)
@@ -68,8 +209,10 @@ class AprendizCurso(models.Model):
         ('SUS', 'Suspendido'),
     ]
 
-    aprendiz = models.ForeignKey('aprendices.Aprendiz', on_delete=models.CASCADE)
-    curso = models.ForeignKey(Curso, on_delete=models.CASCADE)
+    # Sin índice propio: unique_together (aprendiz, curso) e inscripcion_curso_estado_idx
+    # ya empiezan por cada columna, y un índice de más encarece cada inscripción
+    aprendiz = models.ForeignKey('aprendices.Aprendiz', on_delete=models.CASCADE, db_index=False)
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, db_index=False)
     fecha_inscripcion = models.DateField(auto_now_add=True, verbose_name="Fecha de Inscripción")
     estado = models.CharField(max_length=3, choices=ESTADO_CHOICES, default='INS', verbose_name="Estado en el Curso")
     nota_final = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True, verbose_name="Nota Final")
@@ -79,6 +222,68 @@ class AprendizCurso(models.Model):
         verbose_name = "Aprendiz por Curso"
         verbose_name_plural = "Aprendices por Curso"
         unique_together = ['aprendiz', 'curso']
+        indexes = [
+            # Inscripciones de un curso y conteo de las que ocupan cupo
+            models.Index(fields=['curso', 'estado'], name='inscripcion_curso_estado_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.aprendiz} - {self.curso} ({self.estado})"
\ No newline at end of file
+        return f"{self.aprendiz} - {self.curso} ({self.estado})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Recordar curso y estado cargados para saber cómo cambia el cupo al guardar
+        instancia._cupo_original = instancia._cupo_ocupado()
+        # Y la nota, para mover la inscripción en los reportes (reportes/signals.py)
+        instancia._huella_original = instancia.huella()
+        return instancia
+
+    def huella(self):
+        """Lo que cuenta la inscripción en el resumen de su programa"""
+        return (self.curso_id, self.estado, self.nota_final)
+
+    def _cupo_ocupado(self):
+        """Curso cuyo cupo ocupa esta inscripción, o None si no ocupa cupo"""
+        if self.estado in ESTADOS_SIN_CUPO:
+            return None
+        return self.curso_id
+
+    def save(self, *args, **kwargs):
+        """
+        Guardar y ajustar el contador de inscritos en la misma transacción.
+
+        Si la inscripción pasa a ocupar un cupo, primero se reserva con un
+        UPDATE condicional sobre el curso; si no queda cupo se lanza
+        CursoSinCupos y no se guarda nada. Al ser la primera escritura de la
+        transacción, toma el bloqueo de la fila (o de la base en SQLite)
+        antes del INSERT, así que dos inscripciones simultáneas nunca pueden
+        ocupar el mismo último cupo.
+        """
+        anterior = getattr(self, '_cupo_original', None)
+        actual = self._cupo_ocupado()
+        with transaction.atomic():
+            if actual is not None and actual != anterior:
+                reservar_cupo(actual)
+            super().save(*args, **kwargs)
+            if anterior is not None and anterior != actual:
+                ajustar_inscritos(anterior, -1)
+        self._cupo_original = actual
+
+
+def reservar_cupo(curso_id, cantidad=1):
+    """
+    Ocupar ``cantidad`` cupos del curso solo si caben, en un único UPDATE
+    condicional. Lanza CursoSinCupos si no hay cupo suficiente.
+    """
+    reservados = Curso.objects.filter(
+        pk=curso_id,
+        inscritos__lte=F('cupos_maximos') - cantidad,
+    ).update(inscritos=F('inscritos') + cantidad, fecha_actualizacion=timezone.now())
+    if not reservados:
+        raise CursoSinCupos(curso_id)
+
+
+def ajustar_inscritos(curso_id, delta):
+    """Sumar ``delta`` al contador de inscritos del curso de forma atómica"""
+    Curso.objects.filter(pk=curso_id).update(inscritos=F('inscritos') + delta, fecha_actualizacion=timezone.now())
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""
+Generación de datos sintéticos realistas para pruebas y benchmarks.
+
+Los valores cumplen las validaciones de los formularios (documentos y
+teléfonos numéricos, duraciones y fechas coherentes, cupos entre 5 y 100)
+y las distribuciones se parecen a las de un centro de formación: la
+mayoría de programas e instructores activos, estados de curso que
+dependen de sus fechas e inscripciones que llenan buena parte de los
+cupos.
+
+Todo se inserta por lotes (bulk_create o executemany), así que no se
+disparan las señales: el índice de búsqueda, el contador de inscritos,
+las franjas de horario y los totales del tablero se actualizan a mano,
+como en la importación de aprendices. Los códigos y documentos continúan a partir del mayor
+id existente, de modo que se puede sembrar varias veces sobre la misma base, aunque se
+hayan borrado filas.
+"""
+
+import random
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from SENA_APP.fragmentos import incrementar_version
+from aprendices.dashboard import invalidar_totales
+from aprendices.models import Aprendiz
+from busqueda import indice
+from instructores.models import Instructor
+from programas.models import Programa
+from reportes.models import reconstruir_resumenes
+from .cruces import reconstruir_franjas
+from .models import AprendizCurso, Curso, InstructorCurso
+
+TAM_LOTE = 2000
+# Ids por cada filtro pk__in: SQLite limita las variables de una consulta
+# (32766 desde la 3.32; 999 antes)
+IDS_POR_CONSULTA = 900
+
+NOMBRES = [
+    'Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Laura', 'Andrés', 'Valentina', 'Jorge', 'Camila',
+    'Santiago', 'Daniela', 'Felipe', 'Paula', 'Diego', 'Natalia', 'Sebastián', 'Juliana', 'Mateo',
+    'Sofía', 'Alejandro', 'Isabella', 'David', 'Manuela', 'Miguel', 'Sara', 'Julián', 'Mariana',
+]
+APELLIDOS = [
+    'Rodríguez', 'Gómez', 'González', 'Martínez', 'García', 'López', 'Hernández', 'Sánchez',
+    'Ramírez', 'Pérez', 'Díaz', 'Muñoz', 'Rojas', 'Moreno', 'Jiménez', 'Vargas', 'Castro',
+    'Ortiz', 'Torres', 'Suárez', 'Ruiz', 'Álvarez', 'Quintero', 'Mosquera', 'Zúñiga', 'Córdoba',
+]
+CIUDADES = [
+    'Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cartagena', 'Bucaramanga', 'Pereira',
+    'Manizales', 'Popayán', 'Pasto', 'Neiva', 'Ibagué', 'Villavicencio', 'Santa Marta',
+]
+REGIONALES = ['Distrito Capital', 'Antioquia', 'Valle', 'Atlántico', 'Bolívar', 'Santander', 'Cauca', 'Nariño']
+PROGRAMAS = [
+    ('Análisis y Desarrollo de Software', 'TGL', 27),
+    ('Gestión de Redes de Datos', 'TGL', 24),
+    ('Programación de Software', 'TEC', 12),
+    ('Sistemas Teleinformáticos', 'TEC', 15),
+    ('Contabilidad y Finanzas', 'TGL', 24),
+    ('Asistencia Administrativa', 'TEC', 12),
+    ('Cocina', 'TEC', 15),
+    ('Mantenimiento Electromecánico Industrial', 'TGL', 27),
+    ('Gestión Logística', 'TGL', 24),
+    ('Producción Agropecuaria', 'TEC', 12),
+    ('Seguridad y Salud en el Trabajo', 'TGL', 24),
+    ('Operación de Maquinaria Agrícola', 'OPE', 6),
+    ('Servicios Farmacéuticos', 'AUX', 9),
+    ('Excel Avanzado', 'COM', 3),
+    ('Gestión de la Seguridad Informática', 'ESP', 6),
+]
+ESPECIALIDADES = [
+    'Desarrollo de Software', 'Redes y Telecomunicaciones', 'Contabilidad', 'Gastronomía',
+    'Electromecánica', 'Logística', 'Agroindustria', 'Salud Ocupacional', 'Bases de Datos',
+]
+ROLES = ['Instructor Técnico', 'Instructor Transversal', 'Instructor de Inglés', 'Líder de Proyecto']
+HORARIOS = [
+    'Lunes a Viernes 6:00 AM - 12:00 PM', 'Lunes a Viernes 12:00 PM - 6:00 PM',
+    'Lunes a Viernes 6:00 PM - 10:00 PM', 'Sábados 7:00 AM - 5:00 PM',
+]
+
+
+def sembrar(programas=10, instructores=20, cursos=30, aprendices=300, inscripciones=None,
+            azar=None, tam_lote=TAM_LOTE):
+    """
+    Crear programas, instructores, cursos (con 0 a 2 instructores
+    adicionales cada uno), aprendices e inscripciones, todo en una sola
+    transacción. Si no se indica ``inscripciones`` cada curso llena entre
+    la mitad y la totalidad de sus cupos. Devuelve cuántas filas se
+    crearon de cada tipo.
+    """
+    azar = azar or random.Random()
+    hoy = date.today()
+    with transaction.atomic():
+        lista_programas = _bulk(Programa, _programas(programas, azar), tam_lote)
+        lista_instructores = _bulk(Instructor, _instructores(instructores, azar, hoy), tam_lote)
+        indice.indexar(lista_programas, nuevos=True)
+        indice.indexar(lista_instructores, nuevos=True)
+
+        ids_aprendices = _insertar(
+            Aprendiz, CAMPOS_APRENDIZ, _aprendices(aprendices, lista_programas, azar), tam_lote,
+            relacionados={'programa__nombre': {programa.pk: programa.nombre for programa in lista_programas}},
+        )
+
+        if lista_programas and lista_instructores:
+            filas_cursos = list(_cursos(cursos, lista_programas, lista_instructores, azar, hoy))
+        else:
+            filas_cursos = []
+        ids_cursos = _insertar(Curso, CAMPOS_CURSO, filas_cursos, tam_lote)
+        for lote in _lotes_de_ids(ids_cursos):
+            reconstruir_franjas(Curso.objects.filter(pk__in=lote), tam_lote)
+
+        asignaciones = _bulk(InstructorCurso, _asignaciones(ids_cursos, filas_cursos, lista_instructores, azar), tam_lote)
+        cupos = _repartir_inscripciones(filas_cursos, len(ids_aprendices), inscripciones, azar)
+        total_inscripciones = len(_insertar(
+            AprendizCurso, CAMPOS_INSCRIPCION,
+            _inscripciones(ids_cursos, filas_cursos, cupos, ids_aprendices, azar), tam_lote,
+        ))
+        # Un UPDATE por lote para el contador de cupos: las filas no pasaron
+        # por AprendizCurso.save
+        for lote in _lotes_de_ids(ids_cursos):
+            Curso.objects.filter(pk__in=lote).recalcular_inscritos()
+        # Ni por las señales del reporte por programa
+        reconstruir_resumenes()
+
+        invalidar_totales(Programa, Instructor, Aprendiz, Curso)
+        incrementar_version(Programa, Instructor, Aprendiz, Curso, AprendizCurso, InstructorCurso)
+
+    return {
+        'programas': len(lista_programas), 'instructores': len(lista_instructores),
+        'aprendices': len(ids_aprendices), 'cursos': len(ids_cursos),
+        'asignaciones': len(asignaciones), 'inscripciones': total_inscripciones,
+    }
+
+
+def _bulk(modelo, objetos, tam_lote):
+    return modelo.objects.bulk_create(list(objetos), batch_size=tam_lote)
+
+
+def _insertar(modelo, campos, filas, tam_lote, relacionados=None):
+    """
+    Insertar filas ya preparadas para la base de datos (tuplas con los
+    valores de ``campos``) con executemany por lotes y devolver sus ids.
+    ``relacionados`` da, por id, los valores de campos de otras tablas que
+    usa el índice de búsqueda (``{'programa__nombre': {id: nombre}}``).
+
+    Es el camino de las tablas grandes: bulk_create gasta casi todo su
+    tiempo creando instancias y preparando cada valor campo por campo, que
+    con un millón de inscripciones son varios minutos. Los ids se asignan
+    a partir del máximo actual; la transacción de ``sembrar`` evita que
+    otra escritura se intercale.
+    """
+    siguiente = _maximo_id(modelo) + 1
+    columnas = ['id'] + [modelo._meta.get_field(campo).column for campo in campos]
+    sql = (
+        f'INSERT INTO {connection.ops.quote_name(modelo._meta.db_table)} '
+        f'({", ".join(connection.ops.quote_name(columna) for columna in columnas)}) '
+        f'VALUES ({", ".join(["%s"] * len(columnas))})'
+    )
+    ids, lote = [], []
+    with connection.cursor() as cursor:
+        for fila in filas:
+            ids.append(siguiente)
+            lote.append((siguiente, *fila))
+            siguiente += 1
+            if len(lote) >= tam_lote:
+                cursor.executemany(sql, lote)
+                _indexar(modelo, campos, lote, relacionados)
+                lote = []
+        if lote:
+            cursor.executemany(sql, lote)
+            _indexar(modelo, campos, lote, relacionados)
+    return ids
+
+
+def _indexar(modelo, campos, lote, relacionados=None):
+    fuente = indice.FUENTES_POR_MODELO.get(modelo)
+    if fuente is None:
+        return
+    extraer = []
+    for campo in fuente.campos:
+        if campo == 'id':
+            extraer.append(lambda fila: fila[0])
+        elif '__' in campo:
+            # Valor de otra tabla a partir de la llave foránea de la fila
+            posicion, valores = campos.index(campo.split('__')[0]) + 1, relacionados[campo]
+            extraer.append(lambda fila, posicion=posicion, valores=valores: valores.get(fila[posicion]))
+        else:
+            posicion = campos.index(campo) + 1
+            extraer.append(lambda fila, posicion=posicion: fila[posicion])
+    indice.indexar_valores(modelo, [[valor(fila) for valor in extraer] for fila in lote], nuevos=True)
+
+
+def _lotes_de_ids(ids):
+    for inicio in range(0, len(ids), IDS_POR_CONSULTA):
+        yield ids[inicio:inicio + IDS_POR_CONSULTA]
+
+
+def _maximo_id(modelo):
+    """
+    Mayor id de la tabla (0 si está vacía). Los números de los códigos y
+    documentos sembrados son menores que el id de su fila, así que los que
+    empiezan aquí no repiten ninguno; con count() sí, después de borrar.
+    """
+    return modelo.objects.aggregate(maximo=Max('pk'))['maximo'] or 0
+
+
+def _fecha(azar, desde, hasta):
+    return desde + timedelta(days=azar.randrange(max((hasta - desde).days, 1)))
+
+
+def _telefono(azar):
+    return f'3{azar.randrange(10 ** 9):09d}'
+
+
+def _programas(cantidad, azar):
+    inicio = _maximo_id(Programa)
+    for i in range(inicio, inicio + cantidad):
+        nombre, nivel, meses = azar.choice(PROGRAMAS)
+        # 40 horas semanales con algo de variación; dentro del rango que acepta ProgramaForm
+        horas = max(40, int(meses * 160 * azar.uniform(0.6, 1.4)))
+        yield Programa(
+            codigo=f'{nivel}-{228000 + i}', nombre=f'{nombre} {i + 1}', nivel_formacion=nivel,
+            modalidad=azar.choices(['PRE', 'VIR', 'MIX'], [6, 3, 1])[0],
+            duracion_meses=meses, duracion_horas=horas,
+            descripcion=f'Programa de formación en {nombre.lower()}.',
+            competencias=f'Competencias técnicas y transversales de {nombre.lower()}.',
+            perfil_egreso=f'Egresado con desempeño en {nombre.lower()}.',
+            requisitos_ingreso='Bachillerato completo.',
+            centro_formacion=f'Centro de {azar.choice(ESPECIALIDADES)}',
+            regional=azar.choice(REGIONALES),
+            estado=azar.choices(['ACT', 'INA', 'SUS', 'CAN'], [85, 8, 4, 3])[0],
+            fecha_creacion=_fecha(azar, date(2005, 1, 1), date(2023, 12, 31)),
+        )
+
+
+def _instructores(cantidad, azar, hoy):
+    inicio = _maximo_id(Instructor)
+    for i in range(inicio, inicio + cantidad):
+        nombre, apellido = azar.choice(NOMBRES), f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}'
+        nacimiento = _fecha(azar, date(1960, 1, 1), date(1996, 12, 31))
+        yield Instructor(
+            tipo_documento='CC', documento_id=str(80_000_000 + i), nombre=nombre, apellido=apellido,
+            telefono=_telefono(azar), correo=f'instructor{i}@sena.edu.co',
+            fecha_nacimiento=nacimiento, ciudad=azar.choice(CIUDADES),
+            direccion=f'Calle {azar.randrange(1, 120)} # {azar.randrange(1, 90)}-{azar.randrange(1, 99)}',
+            nivel_educativo=azar.choice(['TEG', 'PRE', 'ESP', 'MAE', 'DOC']),
+            especialidad=azar.choice(ESPECIALIDADES), anos_experiencia=azar.randrange(1, 35),
+            activo=azar.random() < 0.85,
+            fecha_vinculacion=_fecha(azar, nacimiento + timedelta(days=22 * 365), hoy),
+        )
+
+
+CAMPOS_APRENDIZ = [
+    'document', 'firstname', 'lastname', 'phone', 'email', 'birthdate', 'city', 'programa',
+    'program_legacy', 'fecha_actualizacion',
+]
+
+
+def _aprendices(cantidad, programas, azar):
+    inicio = _maximo_id(Aprendiz)
+    # executemany no pasa por auto_now
+    actualizacion = connection.ops.adapt_datetimefield_value(timezone.now())
+    for i in range(inicio, inicio + cantidad):
+        yield (
+            str(1_000_000_000 + i),
+            azar.choice(NOMBRES),
+            f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+            _telefono(azar),
+            f'aprendiz{i}@misena.edu.co',
+            _fecha(azar, date(1985, 1, 1), date(2008, 12, 31)).isoformat(),
+            azar.choice(CIUDADES),
+            azar.choice(programas).pk if programas else None,
+            '',
+            actualizacion,
+        )
+
+
+CAMPOS_CURSO = [
+    'codigo', 'nombre', 'programa', 'instructor_coordinador', 'fecha_inicio', 'fecha_fin',
+    'horario', 'aula', 'cupos_maximos', 'estado', 'fecha_registro', 'inscritos', 'fecha_actualizacion',
+]
+# Posiciones en las filas de _cursos que se usan después
+INICIO, CUPOS, ESTADO, COORDINADOR = 4, 8, 9, 3
+
+
+def _cursos(cantidad, programas, instructores, azar, hoy):
+    inicio = _maximo_id(Curso)
+    activos = [instructor for instructor in instructores if instructor.activo] or instructores
+    registro = connection.ops.adapt_datetimefield_value(timezone.now())
+    for i in range(inicio, inicio + cantidad):
+        programa = azar.choice(programas)
+        fecha_inicio = _fecha(azar, hoy - timedelta(days=3 * 365), hoy + timedelta(days=180))
+        # Como máximo dos años, el límite de CursoForm
+        fecha_fin = fecha_inicio + timedelta(days=min(programa.duracion_meses * 30, 730))
+        yield (
+            f'FICHA-{2_600_000 + i}',
+            f'{programa.nombre} - Ficha {2_600_000 + i}',
+            programa.pk,
+            azar.choice(activos).pk,
+            fecha_inicio.isoformat(),
+            fecha_fin.isoformat(),
+            azar.choice(HORARIOS),
+            f'Ambiente {azar.randrange(101, 420)}',
+            azar.choice([20, 25, 30, 35, 40]),
+            _estado_curso(fecha_inicio, fecha_fin, hoy, azar),
+            registro,
+            0,
+            registro,
+        )
+
+
+def _estado_curso(fecha_inicio, fecha_fin, hoy, azar):
+    if azar.random() < 0.03:
+        return azar.choice(['CAN', 'SUS'])
+    if fecha_inicio > hoy:
+        return 'PRO'
+    if fecha_fin < hoy:
+        return 'FIN'
+    return 'INI' if (hoy - fecha_inicio).days < 30 else 'EJE'
+
+
+def _repartir_inscripciones(cursos, total_aprendices, inscripciones, azar):
+    """Cuántas inscripciones recibe cada curso (nunca más que sus cupos ni que los aprendices)"""
+    tope = [min(curso[CUPOS], total_aprendices) for curso in cursos]
+    if inscripciones is None:
+        return [azar.randint(limite // 2, limite) for limite in tope]
+    # Repartir el total pedido en proporción a los cupos, sin pasar el tope
+    capacidad = sum(tope)
+    objetivo = min(inscripciones, capacidad)
+    cupos = [limite * objetivo // capacidad if capacidad else 0 for limite in tope]
+    faltantes = objetivo - sum(cupos)
+    for i in azar.sample(range(len(cursos)), len(cursos)):
+        if faltantes <= 0:
+            break
+        if cupos[i] < tope[i]:
+            cupos[i] += 1
+            faltantes -= 1
+    return cupos
+
+
+CAMPOS_INSCRIPCION = ['aprendiz', 'curso', 'fecha_inscripcion', 'estado', 'nota_final']
+
+# Estados de las inscripciones según el estado del curso, con sus pesos
+ESTADOS_INSCRIPCION = {
+    'FIN': (['GRA', 'DES', 'SUS'], [75, 20, 5]),
+    'PRO': (['INS'], [1]),
+}
+ESTADOS_INSCRIPCION_EN_CURSO = (['ACT', 'INS', 'DES', 'SUS'], [80, 8, 9, 3])
+NOTAS = [f'{nota / 10:.1f}' for nota in range(30, 51)]
+
+
+def _inscripciones(ids_cursos, cursos, cupos, ids_aprendices, azar):
+    """
+    Filas de AprendizCurso; el estado depende del estado del curso y nadie
+    se repite en un curso. Los valores al azar se sacan por curso (k=...)
+    y no por fila: con un millón de filas es la mitad del tiempo.
+    """
+    for curso_id, curso, cantidad in zip(ids_cursos, cursos, cupos):
+        inicio = date.fromisoformat(curso[INICIO])
+        # Las inscripciones se abren hasta dos meses antes del inicio
+        fechas = [(inicio - timedelta(days=dias)).isoformat() for dias in azar.sample(range(60), 6)]
+        estados, pesos = ESTADOS_INSCRIPCION.get(curso[ESTADO], ESTADOS_INSCRIPCION_EN_CURSO)
+        for aprendiz_id, estado, fecha in zip(
+            azar.sample(ids_aprendices, cantidad),
+            azar.choices(estados, pesos, k=cantidad),
+            azar.choices(fechas, k=cantidad),
+        ):
+            yield aprendiz_id, curso_id, fecha, estado, azar.choice(NOTAS) if estado == 'GRA' else None
+
+
+def _asignaciones(ids_cursos, cursos, instructores, azar):
+    for curso_id, curso in zip(ids_cursos, cursos):
+        cantidad = min(azar.choice([0, 1, 1, 2]), len(instructores) - 1)
+        # Uno de más por si sale el coordinador, que no se asigna a sí mismo
+        elegidos = azar.sample(instructores, cantidad + 1) if cantidad > 0 else []
+        elegidos = [instructor for instructor in elegidos if instructor.pk != curso[COORDINADOR]]
+        for instructor in elegidos[:cantidad]:
+            yield InstructorCurso(instructor=instructor, curso_id=curso_id, rol=azar.choice(ROLES))
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cruces import franjas_del_horario, reemplazar_franjas
+from .models import AprendizCurso, Curso, FranjaHoraria, InstructorCurso, ajustar_inscritos
+
+
+@receiver(post_delete, sender=AprendizCurso)
+def liberar_cupo(sender, instance, **kwargs):
+    """
+    Descontar la inscripción eliminada del contador del curso. Se usa la
+    señal (y no AprendizCurso.delete) para cubrir también los borrados en
+    cascada y los de QuerySet.delete(), que ya corren dentro de una
+    transacción.
+    """
+    curso_id = getattr(instance, '_cupo_original', instance._cupo_ocupado())
+    if curso_id is not None:
+        ajustar_inscritos(curso_id, -1)
+
+
+@receiver([post_save, post_delete], sender=InstructorCurso)
+def actualizar_curso(sender, instance, raw=False, **kwargs):
+    """El detalle del curso lista sus instructores: su fecha de actualización cambia con ellos"""
+    if not raw:
+        Curso.objects.filter(pk=instance.curso_id).update(fecha_actualizacion=timezone.now())
+
+
+@receiver(post_save, sender=Curso)
+def guardar_franjas(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Interpretar de nuevo el horario cuando cambian el texto o el aula"""
+    if raw or (update_fields is not None and not {'horario', 'aula'} & set(update_fields)):
+        return
+    actual = (instance.__dict__.get('horario'), instance.__dict__.get('aula'))
+    if created:
+        FranjaHoraria.objects.bulk_create(franjas_del_horario(instance))
+    elif actual != getattr(instance, '_horario_original', None):
+        reemplazar_franjas(instance)
+    instance._horario_original = actual
@@ -1,3 +1,792 @@
-from django.test import TestCase
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from SENA_APP import metricas
+from SENA_APP.autocompletar import FUENTES
+from SENA_APP.fragmentos import version
+from SENA_APP.paginacion import KeysetPaginator
+from SENA_APP.pruebas import PresupuestoVistasMixin, limpiar_caches
+from aprendices import views as vistas_aprendices
+from aprendices.models import Aprendiz
+from busqueda import indice
+from instructores import views as vistas_instructores
+from instructores.models import Instructor
+from programas import views as vistas_programas
+from programas.models import Programa
+from reportes.models import reconstruir_resumenes
+from . import views
+from . import inscripcion
+from . import semillas
+from .cruces import ESTADOS_SIN_HORARIO, buscar_cruces, cruces_del_periodo
+from .forms import CursoForm, InstructorCursoForm
+from .horarios import HorarioInvalido, clave_ambiente, interpretar_horario
+from .inscripcion import inscribir_aprendices
+from .models import ESTADOS_SIN_CUPO, Curso, AprendizCurso, CursoSinCupos, InstructorCurso
+
+
+def crear_programa(codigo='ADSO-1', **kwargs):
+    datos = dict(
+        codigo=codigo, nombre=f'Programa {codigo}', nivel_formacion='TGL',
+        duracion_meses=24, duracion_horas=3000, descripcion='Descripción',
+        competencias='Competencias', perfil_egreso='Perfil', requisitos_ingreso='Requisitos',
+        centro_formacion='Centro de Teleinformática', regional='Cauca',
+        fecha_creacion=date(2020, 1, 1),
+    )
+    datos.update(kwargs)
+    return Programa.objects.create(**datos)
+
+
+def crear_instructor(documento='1000', **kwargs):
+    datos = dict(
+        documento_id=documento, nombre='Ana', apellido=f'Ruiz {documento}',
+        fecha_nacimiento=date(1980, 1, 1), especialidad='Software',
+        anos_experiencia=5, fecha_vinculacion=date(2010, 1, 1),
+    )
+    datos.update(kwargs)
+    return Instructor.objects.create(**datos)
+
+
+def crear_curso(programa, instructor, codigo='CURSO-1', **kwargs):
+    datos = dict(
+        codigo=codigo, nombre=f'Curso {codigo}', programa=programa,
+        instructor_coordinador=instructor, fecha_inicio=date(2024, 1, 15),
+        fecha_fin=date(2024, 6, 15), horario='Lunes a Viernes 8:00 AM - 12:00 PM',
+        aula='Aula 101', cupos_maximos=30,
+    )
+    datos.update(kwargs)
+    return Curso.objects.create(**datos)
+
+
+def crear_aprendices(cantidad, inicio=0):
+    return Aprendiz.objects.bulk_create([
+        Aprendiz(
+            document=str(5000 + inicio + i), firstname='Aprendiz', lastname=f'Apellido {i}',
+            birthdate=date(2002, 5, 1),
+        )
+        for i in range(cantidad)
+    ])
+
+
+class ListaCursosTests(TestCase):
+    """La lista de cursos no debe hacer consultas adicionales por fila"""
+
+    def setUp(self):
+        limpiar_caches()
+
+    def crear_cursos(self, cantidad, inicio=0):
+        # Al confirmar cambia la versión de la tabla cacheada de la lista
+        with self.captureOnCommitCallbacks(execute=True):
+            self._crear_cursos(cantidad, inicio)
+
+    def _crear_cursos(self, cantidad, inicio):
+        for i in range(inicio, inicio + cantidad):
+            programa = crear_programa(codigo=f'P-{i}')
+            instructor = crear_instructor(documento=str(100 + i))
+            curso = crear_curso(programa, instructor, codigo=f'C-{i}', cupos_maximos=10)
+            for aprendiz in crear_aprendices(i % 4, inicio=i * 10):
+                AprendizCurso.objects.create(aprendiz=aprendiz, curso=curso)
+
+    def test_consultas_fijas_sin_importar_la_cantidad_de_cursos(self):
+        self.crear_cursos(2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('cursos:lista_cursos'))
+        self.crear_cursos(8, inicio=2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('cursos:lista_cursos'))
+
+    def test_inscribir_actualiza_la_ocupacion_cacheada(self):
+        self.crear_cursos(4)
+        url = reverse('cursos:lista_cursos')
+        self.assertNotContains(self.client.get(url), '40%')
+        with self.captureOnCommitCallbacks(execute=True):
+            AprendizCurso.objects.create(aprendiz=crear_aprendices(1, inicio=500)[0], curso=Curso.objects.get(codigo='C-3'))
+        self.assertContains(self.client.get(url), '40%')
+
+    def test_ocupacion_anotada(self):
+        self.crear_cursos(4)
+        curso = Curso.objects.con_ocupacion().get(codigo='C-3')
+        self.assertEqual(curso.inscritos, 3)
+        self.assertEqual(curso.cupos_libres, 7)
+        self.assertAlmostEqual(curso.ocupacion, 30.0)
+
+
+class ContadorInscritosTests(TestCase):
+    """El contador Curso.inscritos se mantiene con cada cambio de inscripción"""
+
+    def setUp(self):
+        programa = crear_programa()
+        instructor = crear_instructor()
+        self.curso = crear_curso(programa, instructor)
+        self.otro_curso = crear_curso(programa, instructor, codigo='CURSO-2')
+        self.aprendices = crear_aprendices(3)
+
+    def inscritos(self, curso):
+        curso.refresh_from_db(fields=['inscritos'])
+        return curso.inscritos
+
+    def test_crear_y_eliminar_inscripciones(self):
+        inscripciones = [
+            AprendizCurso.objects.create(aprendiz=aprendiz, curso=self.curso)
+            for aprendiz in self.aprendices
+        ]
+        self.assertEqual(self.inscritos(self.curso), 3)
+        inscripciones[0].delete()
+        self.assertEqual(self.inscritos(self.curso), 2)
+        AprendizCurso.objects.filter(curso=self.curso).delete()
+        self.assertEqual(self.inscritos(self.curso), 0)
+
+    def test_desertor_libera_cupo(self):
+        inscripcion = AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso)
+        inscripcion.estado = 'DES'
+        inscripcion.save()
+        self.assertEqual(self.inscritos(self.curso), 0)
+        inscripcion = AprendizCurso.objects.get(pk=inscripcion.pk)
+        inscripcion.estado = 'ACT'
+        inscripcion.save()
+        self.assertEqual(self.inscritos(self.curso), 1)
+        inscripcion.delete()
+        self.assertEqual(self.inscritos(self.curso), 0)
+
+    def test_cambio_de_curso(self):
+        inscripcion = AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso)
+        inscripcion.curso = self.otro_curso
+        inscripcion.save()
+        self.assertEqual(self.inscritos(self.curso), 0)
+        self.assertEqual(self.inscritos(self.otro_curso), 1)
+
+    def test_guardar_curso_desactualizado_no_pisa_el_contador(self):
+        desactualizado = Curso.objects.get(pk=self.curso.pk)
+        AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso)
+        desactualizado.nombre = 'Nombre editado'
+        desactualizado.save()
+        self.assertEqual(self.inscritos(self.curso), 1)
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.nombre, 'Nombre editado')
+        # Con una instancia diferida tampoco se escriben los campos sin cargar
+        diferido = Curso.objects.only('nombre').get(pk=self.curso.pk)
+        diferido.save()
+        self.assertEqual(self.inscritos(self.curso), 1)
+
+    def test_borrado_en_cascada_del_aprendiz(self):
+        AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso)
+        self.aprendices[0].delete()
+        self.assertEqual(self.inscritos(self.curso), 0)
+
+    def test_comando_recalcular_inscritos(self):
+        AprendizCurso.objects.bulk_create([
+            AprendizCurso(aprendiz=aprendiz, curso=self.curso) for aprendiz in self.aprendices
+        ])
+        self.assertEqual(self.inscritos(self.curso), 0)
+        call_command('recalcular_inscritos', stdout=StringIO())
+        self.assertEqual(self.inscritos(self.curso), 3)
+        self.assertEqual(self.inscritos(self.otro_curso), 0)
+
+
+class ReservaCuposTests(TestCase):
+    """La inscripción reserva el cupo de forma atómica"""
+
+    def setUp(self):
+        self.curso = crear_curso(crear_programa(), crear_instructor(), cupos_maximos=2)
+        self.aprendices = crear_aprendices(3)
+
+    def test_no_inscribe_sin_cupos(self):
+        for aprendiz in self.aprendices[:2]:
+            AprendizCurso.objects.create(aprendiz=aprendiz, curso=self.curso)
+        with self.assertRaises(CursoSinCupos):
+            AprendizCurso.objects.create(aprendiz=self.aprendices[2], curso=self.curso)
+        self.assertEqual(AprendizCurso.objects.filter(curso=self.curso).count(), 2)
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.inscritos, 2)
+
+    def test_reactivar_desertor_requiere_cupo(self):
+        desertor = AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso, estado='DES')
+        for aprendiz in self.aprendices[1:]:
+            AprendizCurso.objects.create(aprendiz=aprendiz, curso=self.curso)
+        desertor.estado = 'ACT'
+        with self.assertRaises(CursoSinCupos):
+            desertor.save()
+        self.assertEqual(AprendizCurso.objects.get(pk=desertor.pk).estado, 'DES')
+
+    def test_vista_informa_curso_lleno_entre_validar_y_guardar(self):
+        for aprendiz in self.aprendices[:2]:
+            AprendizCurso.objects.create(aprendiz=aprendiz, curso=self.curso)
+        # Simula que el último cupo se ocupó después de validar el formulario
+        with mock.patch.object(Curso, 'cupos_disponibles', return_value=1):
+            respuesta = self.client.post(reverse('cursos:inscribir_aprendiz'), {
+                'aprendiz': self.aprendices[2].pk, 'curso': self.curso.pk, 'estado': 'INS',
+            })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('curso', respuesta.context['form'].errors)
+        self.assertFalse(AprendizCurso.objects.filter(aprendiz=self.aprendices[2]).exists())
+
+
+class ReservaCuposConcurrenteTests(TransactionTestCase):
+    """Muchos hilos inscribiendo a la vez en el mismo curso nunca lo sobrevenden"""
+
+    HILOS = 24
+
+    def test_concurrencia_no_sobrevende(self):
+        curso = crear_curso(crear_programa(), crear_instructor(), cupos_maximos=10)
+        aprendices = crear_aprendices(self.HILOS * 3)
+        inicio = threading.Barrier(self.HILOS)
+        inscritos, rechazados, errores = [], [], []
+
+        def inscribir(grupo):
+            try:
+                inicio.wait()
+                for aprendiz in grupo:
+                    try:
+                        AprendizCurso.objects.create(aprendiz=aprendiz, curso_id=curso.pk)
+                        inscritos.append(aprendiz.pk)
+                    except CursoSinCupos:
+                        rechazados.append(aprendiz.pk)
+            except Exception as error:
+                errores.append(error)
+            finally:
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=inscribir, args=(aprendices[i::self.HILOS],))
+            for i in range(self.HILOS)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        curso.refresh_from_db()
+        self.assertEqual(len(inscritos), curso.cupos_maximos)
+        self.assertEqual(len(rechazados), len(aprendices) - curso.cupos_maximos)
+        self.assertEqual(curso.inscritos, curso.cupos_maximos)
+        self.assertEqual(AprendizCurso.objects.filter(curso=curso).count(), curso.cupos_maximos)
+
+
+class ExportacionCursosTests(TestCase):
+    """La exportación de cursos sale en flujo con programa y coordinador en una sola consulta"""
+
+    def test_exportar_cursos(self):
+        programa = crear_programa()
+        instructor = crear_instructor()
+        for i in range(3):
+            crear_curso(programa, instructor, codigo=f'C-{i}')
+        respuesta = self.client.get(reverse('cursos:exportar_cursos'))
+        self.assertTrue(respuesta.streaming)
+        with self.assertNumQueries(1):
+            contenido = b''.join(respuesta.streaming_content).decode('utf-8-sig')
+        lineas = contenido.splitlines()
+        self.assertEqual(len(lineas), 4)
+        self.assertTrue(lineas[0].startswith('ID,Código,Nombre,Código Programa'))
+        self.assertIn(programa.nombre, lineas[1])
+        self.assertIn(instructor.apellido, lineas[1])
+
+
+class IndicesTests(TestCase):
+    """Las consultas frecuentes usan los índices compuestos"""
+
+    def test_pagina_profunda_de_cursos_busca_por_rango(self):
+        paginator = KeysetPaginator(Curso.objects.all(), ('-fecha_inicio', '-id'))
+        consulta = Curso.objects.filter(paginator.filtro([date(2024, 1, 1), 10])).order_by(*paginator.orden())
+        plan = consulta.explain()
+        self.assertIn('curso_inicio_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_busqueda_de_instructores_activos_sin_ordenar_en_memoria(self):
+        filas, ordenamiento = FUENTES['instructores'].buscar('Ru')
+        plan = filas.order_by(*ordenamiento).explain()
+        self.assertIn('instructor_busqueda_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_benchmark_no_deja_datos_ni_borra_indices(self):
+        salida = StringIO()
+        call_command(
+            'benchmark_indices', programas=2, instructores=3, cursos=5, aprendices=10,
+            inscripciones=20, repeticiones=1, stdout=salida,
+        )
+        self.assertIn('sin índices', salida.getvalue())
+        self.assertIn('curso_estado_inicio_idx', salida.getvalue())
+        self.assertFalse(Curso.objects.exists())
+        self.assertIn('curso_estado_inicio_idx', Curso.objects.filter(estado='EJE').order_by('fecha_inicio').explain())
+
+
+class SemillasTests(TestCase):
+    """Comando seed_sena"""
+
+    def sembrar(self, **kwargs):
+        salida = StringIO()
+        call_command(
+            'seed_sena', programas=3, instructores=6, cursos=8, aprendices=40,
+            inscripciones=100, semilla=7, stdout=salida, **kwargs,
+        )
+        return salida.getvalue()
+
+    def test_siembra_las_cantidades_pedidas_con_contadores_al_dia(self):
+        self.assertIn('inscripciones', self.sembrar(lote=7))
+        self.assertEqual(Curso.objects.count(), 8)
+        self.assertEqual(Aprendiz.objects.count(), 40)
+        self.assertEqual(AprendizCurso.objects.count(), 100)
+        for curso in Curso.objects.all():
+            activas = curso.aprendizcurso_set.exclude(estado__in=ESTADOS_SIN_CUPO).count()
+            self.assertEqual(curso.inscritos, activas)
+            self.assertLessEqual(curso.aprendizcurso_set.count(), curso.cupos_maximos)
+        aprendiz = Aprendiz.objects.first()
+        resultados = [(resultado['tipo'], resultado['id']) for resultado in indice.buscar(aprendiz.document)]
+        self.assertIn(('aprendiz', aprendiz.pk), resultados)
+
+    def test_contadores_y_franjas_por_lotes_de_ids(self):
+        # Los filtros pk__in van por lotes, sin llegar al límite de variables de SQLite
+        with mock.patch.object(semillas, 'IDS_POR_CONSULTA', 3):
+            self.sembrar()
+        for curso in Curso.objects.all():
+            activas = curso.aprendizcurso_set.exclude(estado__in=ESTADOS_SIN_CUPO).count()
+            self.assertEqual(curso.inscritos, activas)
+        self.assertFalse(Curso.objects.filter(franjas=None).exists())
+
+    def test_se_puede_sembrar_de_nuevo_despues_de_borrar(self):
+        self.sembrar()
+        # Con count() los nuevos códigos y documentos repetirían los últimos
+        for modelo in (Programa, Instructor, Aprendiz):
+            modelo.objects.order_by('id').first().delete()
+        self.sembrar()
+        self.assertEqual(Programa.objects.count(), 5)
+        self.assertEqual(Instructor.objects.count(), 11)
+        self.assertEqual(Aprendiz.objects.count(), 79)
+
+    def test_semilla_fija_reproduce_los_datos(self):
+        def datos():
+            return list(AprendizCurso.objects.order_by('id').values_list(
+                'aprendiz__lastname', 'curso__codigo', 'estado', 'fecha_inscripcion',
+            ))
+        self.sembrar()
+        primera = datos()
+        AprendizCurso.objects.all().delete()
+        Curso.objects.all().delete()
+        Aprendiz.objects.all().delete()
+        Instructor.objects.all().delete()
+        Programa.objects.all().delete()
+        self.sembrar()
+        self.assertEqual(datos(), primera)
+
+
+class VistasAsincronasTests(TestCase):
+    """Las vistas async de lectura (ASGI) muestran lo mismo que las síncronas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programa = crear_programa()
+        cls.instructor = crear_instructor()
+        cls.curso = crear_curso(cls.programa, cls.instructor)
+        InstructorCurso.objects.create(instructor=crear_instructor('2000'), curso=cls.curso, rol='Técnico')
+        cls.aprendiz = crear_aprendices(3)[0]
+
+    def setUp(self):
+        limpiar_caches()
+        self.factory = RequestFactory()
+
+    def llamar(self, vista, *args):
+        if iscoroutinefunction(vista):
+            vista = async_to_sync(vista)
+        respuesta = vista(self.factory.get('/'), *args)
+        if hasattr(respuesta, 'render'):
+            respuesta.render()
+        return respuesta.content
+
+    def test_mismo_html_que_las_vistas_sincronas(self):
+        pares = [
+            (vistas_aprendices.inicio, vistas_aprendices.inicio_async),
+            (vistas_aprendices.aprendices, vistas_aprendices.aprendices_async),
+            (vistas_aprendices.detalle_aprendiz, vistas_aprendices.detalle_aprendiz_async, self.aprendiz.id),
+            (vistas_instructores.lista_instructores, vistas_instructores.lista_instructores_async),
+            (vistas_instructores.detalle_instructor, vistas_instructores.detalle_instructor_async, self.instructor.id),
+            (vistas_programas.lista_programa, vistas_programas.lista_programa_async),
+            (vistas_programas.detalle_programa, vistas_programas.detalle_programa_async, self.programa.id),
+            (vistas_programas.seccion_programa, vistas_programas.seccion_programa_async, self.programa.id, 'competencias'),
+            (views.lista_cursos, views.lista_cursos_async),
+            (views.detalle_curso, views.detalle_curso_async, self.curso.id),
+        ]
+        for sincrona, asincrona, *args in pares:
+            with self.subTest(vista=asincrona.__name__):
+                # La segunda vez la tabla sale de la caché de fragmentos
+                for _ in range(2):
+                    limpiar_caches()
+                    esperado = self.llamar(sincrona, *args)
+                    self.assertEqual(self.llamar(asincrona, *args), esperado)
+
+    def test_consultas_de_las_vistas_async(self):
+        with self.assertNumQueries(4):
+            self.llamar(vistas_aprendices.inicio_async)
+        with self.assertNumQueries(0):
+            self.llamar(vistas_aprendices.inicio_async)
+        with self.assertNumQueries(3):
+            self.llamar(views.detalle_curso_async, self.curso.id)
+        # La lista lee una vez la versión de sus fragmentos
+        with self.assertNumQueries(2):
+            self.llamar(views.lista_cursos_async)
+        with self.assertNumQueries(1):
+            self.llamar(views.lista_cursos_async)
+
+    @override_settings(METRICAS_ACTIVAS=True)
+    def test_metricas_en_el_camino_async(self):
+        async def vista(request):
+            return await views.detalle_curso_async(request, self.curso.id)
+
+        metricas.instalar_medidor()
+        respuesta = async_to_sync(metricas.MetricasMiddleware(vista))(self.factory.get('/'))
+        self.assertIn('desc="3 consultas"', respuesta['Server-Timing'])
+
+
+class GetCondicionalCursoTests(TestCase):
+    """El ETag del detalle cambia con todo lo que la página muestra"""
+
+    def setUp(self):
+        limpiar_caches()
+        self.programa = crear_programa()
+        self.curso = crear_curso(self.programa, crear_instructor())
+        self.url = reverse('cursos:detalle_curso', args=[self.curso.id])
+
+    def etag(self):
+        return self.client.get(self.url)['ETag']
+
+    def test_cambia_con_inscripciones_asignaciones_y_programa(self):
+        cambios = [
+            lambda: AprendizCurso.objects.create(aprendiz=crear_aprendices(1)[0], curso=self.curso),
+            lambda: InstructorCurso.objects.create(instructor=crear_instructor('2000'), curso=self.curso, rol='Técnico'),
+            lambda: Instructor.objects.filter(documento_id='2000').get().save(),
+            lambda: InstructorCurso.objects.filter(curso=self.curso).delete(),
+            lambda: self.programa.save(),
+        ]
+        anterior = self.etag()
+        for cambio in cambios:
+            cambio()
+            actual = self.etag()
+            self.assertNotEqual(actual, anterior)
+            anterior = actual
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=anterior).status_code, 304)
+
+
+class InscripcionGrupoTests(TestCase):
+    """Inscripción de una lista de aprendices con consultas por lotes"""
+
+    def setUp(self):
+        limpiar_caches()
+        self.curso = crear_curso(crear_programa(), crear_instructor(), cupos_maximos=5)
+        self.aprendices = crear_aprendices(8)
+
+    def documentos(self, desde, hasta):
+        return [aprendiz.document for aprendiz in self.aprendices[desde:hasta]]
+
+    def test_resultado_por_aprendiz(self):
+        AprendizCurso.objects.create(aprendiz=self.aprendices[0], curso=self.curso)
+        referencias = [*self.documentos(0, 7), '999', self.aprendices[1].document]
+        resultado = inscribir_aprendices(self.curso.id, referencias)
+
+        estados = [fila.estado for fila in resultado.filas]
+        self.assertEqual(estados, [
+            inscripcion.YA_INSCRITO, *[inscripcion.INSCRITO] * 4, inscripcion.SIN_CUPO, inscripcion.SIN_CUPO,
+            inscripcion.NO_ENCONTRADO, inscripcion.REPETIDO,
+        ])
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.inscritos, 5)
+        self.assertEqual(AprendizCurso.objects.filter(curso=self.curso).count(), 5)
+
+    def test_ids_con_ceros_a_la_izquierda(self):
+        primero, segundo = self.aprendices[:2]
+        referencias = [f'00{primero.id}', str(segundo.id), f'0{segundo.id}', 'abc']
+        resultado = inscribir_aprendices(self.curso.id, referencias, por=inscripcion.POR_ID)
+        self.assertEqual([fila.estado for fila in resultado.filas], [
+            inscripcion.INSCRITO, inscripcion.INSCRITO, inscripcion.REPETIDO, inscripcion.NO_ENCONTRADO,
+        ])
+        self.assertEqual(resultado.filas[0].referencia, f'00{primero.id}')
+        self.assertEqual(resultado.filas[0].aprendiz, primero)
+
+    def test_intento_deshecho_no_cambia_la_version(self):
+        antes = version(AprendizCurso)
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(inscripcion, 'reservar_cupo', side_effect=CursoSinCupos(self.curso.id)):
+            resultado = inscribir_aprendices(self.curso.id, self.documentos(0, 2))
+        self.assertTrue(resultado.interrumpida)
+        self.assertEqual(version(AprendizCurso), antes)
+
+    def test_consultas_fijas_y_version_de_las_listas(self):
+        # El programa ya tiene su fila de reportes, como tras la migración
+        reconstruir_resumenes()
+        antes = version(AprendizCurso)
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(8):
+            inscribir_aprendices(self.curso.id, [aprendiz.id for aprendiz in self.aprendices[:2]], por=inscripcion.POR_ID)
+        self.assertNotEqual(version(AprendizCurso), antes)
+
+        otro = crear_curso(self.curso.programa, self.curso.instructor_coordinador, codigo='CURSO-2', cupos_maximos=50)
+        with self.assertNumQueries(8):
+            inscribir_aprendices(otro.id, self.documentos(0, 8))
+
+    def test_reintenta_una_vez_si_otro_toma_los_cupos(self):
+        reservar_cupo = inscripcion.reservar_cupo
+        llamadas = []
+
+        def reservar(curso_id, cantidad, fallos=1):
+            llamadas.append(cantidad)
+            if len(llamadas) <= fallos:
+                raise CursoSinCupos(curso_id)
+            return reservar_cupo(curso_id, cantidad)
+
+        with mock.patch.object(inscripcion, 'reservar_cupo', reservar):
+            resultado = inscribir_aprendices(self.curso.id, self.documentos(0, 5))
+        self.assertEqual(llamadas, [5, 5])
+        self.assertEqual(len(resultado.inscritos), 5)
+
+        # Si también falla la segunda vez no se inscribe a nadie y se informa
+        otro = crear_curso(self.curso.programa, self.curso.instructor_coordinador, codigo='CURSO-2')
+        with mock.patch.object(inscripcion, 'reservar_cupo', lambda curso_id, cantidad: reservar(curso_id, cantidad, 9)):
+            resultado = inscribir_aprendices(otro.id, self.documentos(5, 6))
+            respuesta = self.client.post(reverse('cursos:inscribir_grupo'), {
+                'curso': otro.id, 'por': 'document', 'aprendices': self.aprendices[6].document,
+            })
+        self.assertEqual([fila.estado for fila in resultado.filas], [inscripcion.CURSO_CAMBIO])
+        self.assertTrue(resultado.interrumpida)
+        self.assertContains(respuesta, 'intente de nuevo')
+        self.assertFalse(AprendizCurso.objects.filter(curso=otro).exists())
+
+    def test_vista(self):
+        url = reverse('cursos:inscribir_grupo')
+        self.assertContains(self.client.get(url, {'curso': self.curso.id}), f'value="{self.curso.id}" selected')
+        respuesta = self.client.post(url, {
+            'curso': self.curso.id, 'por': 'document', 'aprendices': ', '.join(self.documentos(0, 3)) + '\n999',
+        })
+        self.assertContains(respuesta, '>Inscrito.<', count=3)
+        self.assertContains(respuesta, 'No existe un aprendiz con esta referencia.')
+        self.assertEqual(self.client.post(url, {'curso': self.curso.id, 'por': 'document', 'aprendices': ' '}).status_code, 200)
+        self.assertEqual(AprendizCurso.objects.count(), 3)
+
+
+class AutocompletarTests(TestCase):
+    """Selectores con búsqueda en los formularios de cursos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programa = crear_programa()
+        cls.instructor = crear_instructor(apellido='Ávila')
+        cls.inactivo = crear_instructor('2000', apellido='Ávalos', activo=False)
+        crear_instructor('3000', apellido='Zapata')
+        Aprendiz.objects.bulk_create([
+            Aprendiz(
+                document=str(7000 + i), firstname='Ana', lastname=apellido,
+                birthdate=date(2002, 5, 1),
+            )
+            for i, apellido in enumerate(['gómez', 'Gómez', 'Gomez', 'Gil', 'Díaz'] * 6)
+        ])
+
+    def buscar(self, fuente, **parametros):
+        return self.client.get(reverse('autocompletar', args=[fuente]), parametros).json()
+
+    def test_prefijo_sin_distinguir_mayusculas_y_paginado(self):
+        datos = self.buscar('aprendices', q='gó')
+        textos = [fila['texto'] for fila in datos['resultados']]
+        self.assertEqual(sorted(set(textos)), ['Ana Gómez', 'Ana gómez'])
+        self.assertIsNone(datos['siguiente'])
+
+        vistos = []
+        datos = self.buscar('aprendices', q='G')
+        while True:
+            vistos += [fila['id'] for fila in datos['resultados']]
+            if not datos['siguiente']:
+                break
+            datos = self.client.get(datos['siguiente']).json()
+        self.assertEqual(len(vistos), 24)
+        self.assertEqual(len(set(vistos)), 24)
+
+        por_documento = self.buscar('aprendices', q='700')
+        self.assertEqual(len(por_documento['resultados']), 10)
+
+    def test_solo_instructores_activos(self):
+        datos = self.buscar('instructores', q='Áv')
+        self.assertEqual([fila['id'] for fila in datos['resultados']], [self.instructor.id])
+        self.assertEqual(self.client.get(reverse('autocompletar', args=['usuarios'])).status_code, 404)
+
+    def test_formulario_sin_todas_las_filas_y_con_la_misma_validacion(self):
+        html = str(CursoForm(initial={'instructor_coordinador': self.instructor.id})['instructor_coordinador'])
+        self.assertIn('data-autocompletar="/autocompletar/instructores/"', html)
+        self.assertIn(f'value="{self.instructor.id}" selected', html)
+        self.assertNotIn('Zapata', html)
+
+        datos = {
+            'codigo': 'curso-9', 'nombre': 'Curso', 'programa': self.programa.id,
+            'instructor_coordinador': self.inactivo.id, 'fecha_inicio': '2024-01-15',
+            'fecha_fin': '2024-06-15', 'horario': 'Lunes 14:00 - 18:00', 'aula': '101',
+            'cupos_maximos': 30, 'estado': 'PRO',
+        }
+        form = CursoForm(data=datos)
+        self.assertFalse(form.is_valid())
+        self.assertIn('instructor_coordinador', form.errors)
+        datos['instructor_coordinador'] = self.instructor.id
+        self.assertTrue(CursoForm(data=datos).is_valid())
+
+
+class HorariosTests(TestCase):
+    """Franjas del horario y cruces de ambiente e instructor"""
+
+    def setUp(self):
+        limpiar_caches()
+        self.programa = crear_programa()
+        self.instructor = crear_instructor()
+        self.otro_instructor = crear_instructor('2000')
+        # Lunes a Viernes de 8 a 12 en el Aula 101, del 15 de enero al 15 de junio de 2024
+        self.curso = crear_curso(self.programa, self.instructor)
+
+    def datos(self, **cambios):
+        datos = {
+            'codigo': 'CURSO-2', 'nombre': 'Curso', 'programa': self.programa.id,
+            'instructor_coordinador': self.otro_instructor.id, 'fecha_inicio': '2024-03-01',
+            'fecha_fin': '2024-09-30', 'horario': 'Lunes y Miércoles 10:00 - 14:00',
+            'aula': 'Aula 202', 'cupos_maximos': 30, 'estado': 'PRO',
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_interpretar_horario(self):
+        self.assertEqual(
+            [str(franja) for franja in interpretar_horario('Lun, Mié y Vie 2 - 6 PM; sábados 8am a 12m')],
+            ['Lunes 14:00-18:00', 'Miércoles 14:00-18:00', 'Viernes 14:00-18:00', 'Sábado 08:00-12:00'],
+        )
+        for texto in ['Lunes', '8:00 - 12:00', 'Viernes a Lunes 8-12', 'Martes 12:00 - 8:00']:
+            with self.subTest(texto=texto), self.assertRaises(HorarioInvalido):
+                interpretar_horario(texto)
+        self.assertEqual(clave_ambiente('AULA-101'), clave_ambiente('Aula 101'))
+        self.assertEqual(clave_ambiente('Virtual'), '')
+
+    def test_franjas_al_crear_y_al_cambiar_el_horario(self):
+        self.assertEqual(self.curso.franjas.count(), 5)
+        self.assertEqual(set(self.curso.franjas.values_list('ambiente', flat=True)), {'aula101'})
+        curso = Curso.objects.get(pk=self.curso.pk)
+        # Sin cambios en el horario ni el aula no se tocan las franjas: solo
+        # el UPDATE y el programa anterior que consulta reportes/signals.py
+        with self.assertNumQueries(2):
+            curso.save()
+        curso.horario = 'Sábado 7:00 - 11:00'
+        curso.save()
+        self.assertEqual([str(franja.franja()) for franja in curso.franjas.all()], ['Sábado 07:00-11:00'])
+
+    def test_formulario_rechaza_cruces_de_ambiente_y_de_instructor(self):
+        self.assertTrue(CursoForm(data=self.datos()).is_valid())
+
+        form = CursoForm(data=self.datos(aula='AULA-101'))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['horario'], [
+            'Se cruza con el curso CURSO-1 en el ambiente Aula 101: Lunes 10:00-14:00, Miércoles 10:00-14:00.',
+        ])
+
+        form = CursoForm(data=self.datos(instructor_coordinador=self.instructor.id))
+        self.assertFalse(form.is_valid())
+        self.assertIn('instructor', form.errors['horario'][0])
+
+        # Un instructor asignado con InstructorCurso también cuenta
+        InstructorCurso.objects.create(instructor=self.otro_instructor, curso=self.curso, rol='Técnico')
+        self.assertIn('CURSO-1', CursoForm(data=self.datos()).errors['horario'][0])
+
+        # Sin cruce: otras horas, otras fechas o un curso cancelado
+        for cambios in [
+            {'horario': 'Lunes 12:00 - 14:00'},
+            {'fecha_inicio': '2024-07-01'},
+            {'estado': 'CAN'},
+        ]:
+            with self.subTest(**cambios):
+                self.assertTrue(CursoForm(data=self.datos(**cambios)).is_valid())
+        # El curso no se cruza consigo mismo al editarlo
+        datos = self.datos(codigo='CURSO-1', aula='Aula 101', instructor_coordinador=self.instructor.id)
+        self.assertTrue(CursoForm(data=datos, instance=self.curso).is_valid())
+
+    def test_consultas_fijas(self):
+        for i in range(5):
+            crear_curso(self.programa, self.instructor, codigo=f'OTRO-{i}', aula=f'Aula {i}')
+        franjas = interpretar_horario('Lunes a Viernes 9:00 - 10:00')
+        with self.assertNumQueries(3):
+            cruces = buscar_cruces(
+                franjas, date(2024, 2, 1), date(2024, 3, 1), ambiente='aula101', instructores=[self.instructor],
+            )
+        self.assertEqual(len(cruces), 7)
+
+    def test_asignar_instructor_ocupado(self):
+        otro = crear_curso(self.programa, self.otro_instructor, codigo='CURSO-2', aula='Aula 202')
+        form = InstructorCursoForm(data={'instructor': self.instructor.id, 'curso': otro.id, 'rol': 'Técnico'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('CURSO-1', form.errors['instructor'][0])
+
+    def test_cruces_del_periodo_igual_que_comparar_todos(self):
+        call_command(
+            'seed_sena', programas=2, instructores=4, cursos=40, aprendices=10,
+            inscripciones=0, semilla=3, stdout=StringIO(),
+        )
+        desde, hasta = date.today(), date.today() + timedelta(days=182)
+        cursos = list(
+            Curso.objects.filter(fecha_inicio__lte=hasta, fecha_fin__gte=desde)
+            .exclude(estado__in=ESTADOS_SIN_HORARIO).prefetch_related('franjas', 'instructores')
+        )
+        esperados = set()
+        for i, curso in enumerate(cursos):
+            for otro in cursos[i + 1:]:
+                if curso.fecha_inicio > otro.fecha_fin or otro.fecha_inicio > curso.fecha_fin:
+                    continue
+                comunes = (
+                    ({curso.instructor_coordinador_id} | {x.pk for x in curso.instructores.all()})
+                    & ({otro.instructor_coordinador_id} | {x.pk for x in otro.instructores.all()})
+                )
+                for franja in curso.franjas.all():
+                    for otra in otro.franjas.all():
+                        if not franja.franja().se_cruza(otra.franja()):
+                            continue
+                        par = (min(curso.pk, otro.pk), max(curso.pk, otro.pk))
+                        if franja.ambiente and franja.ambiente == otra.ambiente:
+                            esperados.add((*par, 'ambiente', franja.ambiente, franja.dia))
+                        esperados |= {(*par, 'instructor', instructor, franja.dia) for instructor in comunes}
+        encontrados = {
+            (cruce.curso_id, cruce.otro_id, cruce.tipo, cruce.recurso, cruce.franja.dia)
+            for cruce in cruces_del_periodo(desde, hasta)
+        }
+        self.assertTrue(esperados)
+        self.assertEqual(encontrados, esperados)
+
+        salida = StringIO()
+        call_command('detectar_cruces', stdout=salida)
+        self.assertIn(f'{len(cruces_del_periodo(desde, hasta))} cruces', salida.getvalue())
+
+    def test_informa_los_cursos_sin_franjas(self):
+        crear_curso(self.programa, self.instructor, codigo='SIN-1', horario='Por definir', aula='Aula 5')
+        # Fuera del periodo o cancelado no ocupa el ambiente
+        crear_curso(self.programa, self.instructor, codigo='SIN-2', horario='Por definir', estado='CAN')
+        crear_curso(
+            self.programa, self.instructor, codigo='SIN-3', horario='Por definir',
+            fecha_inicio=date(2025, 1, 15), fecha_fin=date(2025, 6, 15),
+        )
+        salida = StringIO()
+        call_command('detectar_cruces', desde=date(2024, 1, 1), hasta=date(2024, 12, 31), stdout=salida)
+        self.assertIn('SIN-1: "Por definir"', salida.getvalue())
+        self.assertNotIn('SIN-2', salida.getvalue())
+        self.assertNotIn('SIN-3', salida.getvalue())
+        self.assertIn('1 cursos sin franjas', salida.getvalue())
+
+
+class PresupuestoVistasCursosTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de cursos/urls.py"""
+
+    def vistas(self):
+        # El curso con más inscripciones: un acceso perezoso por fila se notaría aquí
+        curso = Curso.objects.order_by('-inscritos', 'id').first()
+        return [
+            ('lista', reverse('cursos:lista_cursos'), 2),
+            # La fecha de actualización (GET condicional), el curso y sus instructores
+            ('detalle', reverse('cursos:detalle_curso', args=[curso.id]), 3),
+            # Los selectores con búsqueda no consultan nada si no hay nada elegido
+            ('crear', reverse('cursos:crear_curso'), 0),
+            ('exportar', reverse('cursos:exportar_cursos'), 1),
+            ('editar', reverse('cursos:editar_curso', args=[curso.id]), 3),
+            ('eliminar', reverse('cursos:eliminar_curso', args=[curso.id]), 1),
+            ('inscribir', reverse('cursos:inscribir_aprendiz'), 0),
+            ('inscribir_grupo', reverse('cursos:inscribir_grupo'), 0),
+        ]
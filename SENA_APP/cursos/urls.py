@@ -1,12 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views 
 
 app_name = 'cursos'
 
+# Con ASGI las lecturas usan las vistas async (ver VISTAS_ASINCRONAS en settings)
+asincronas = settings.VISTAS_ASINCRONAS
+
 urlpatterns = [
-    path('', views.lista_cursos, name='lista_cursos'),
-    path('<int:curso_id>/', views.detalle_curso, name='detalle_curso'),
+    path('', views.lista_cursos_async if asincronas else views.lista_cursos, name='lista_cursos'),
+    path('<int:curso_id>/', views.detalle_curso_async if asincronas else views.detalle_curso, name='detalle_curso'),
     path('crear/', views.CursoCreateView.as_view(), name='crear_curso'),
+    path('exportar/', views.exportar_cursos, name='exportar_cursos'),
     path('<int:curso_id>/editar/', views.CursoUpdateView.as_view(), name='editar_curso'),
     path('<int:curso_id>/eliminar/', views.CursoDeleteView.as_view(), name='eliminar_curso'),
+    path('inscribir/', views.AprendizCursoCreateView.as_view(), name='inscribir_aprendiz'),
+    path('inscribir/grupo/', views.inscribir_grupo, name='inscribir_grupo'),
 ]
\ No newline at end of file
@@ -1,40 +1,137 @@
+import asyncio
+
 from pyexpat.errors import messages
 from django.shortcuts import render
 from django.template import loader
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.views import generic
 from django.contrib import messages
 
-from .forms import CursoForm
-from .models import Curso
+from .forms import CursoForm, AprendizCursoForm, InscripcionGrupoForm
+from .inscripcion import inscribir_aprendices
+from .models import AprendizCurso, Curso, CursoSinCupos, InstructorCurso
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.http import HttpResponse
+from instructores.models import Instructor
+from programas.models import Programa
+from SENA_APP.condicional import condicional, por_fecha, por_versiones
+from SENA_APP.exportacion import respuesta_csv
+from SENA_APP.fragmentos import afragmento_en_cache, aversion, version
+from SENA_APP.paginacion import KeysetPaginator
 
 # Create your views here.
+
+# GET condicional: la lista se valida con la versión de sus fragmentos y el
+# detalle con la fecha de actualización más reciente de lo que muestra
+validar_lista = por_versiones(Curso, Programa, Instructor, AprendizCurso)
+
+
+def _fecha_curso(curso_id):
+    # El curso (que cambia también con los inscritos y las asignaciones),
+    # su programa, su coordinador y los instructores asignados
+    asignados = (
+        InstructorCurso.objects.filter(curso=OuterRef('pk')).order_by()
+        .values('curso').annotate(fecha=Max('instructor__fecha_actualizacion')).values('fecha')
+    )
+    return Curso.objects.filter(id=curso_id).values_list(Greatest(
+        'fecha_actualizacion', 'programa__fecha_actualizacion',
+        'instructor_coordinador__fecha_actualizacion',
+        Coalesce(Subquery(asignados), 'fecha_actualizacion'),
+    ), flat=True)
+
+
+validar_detalle = por_fecha(_fecha_curso)
+
+
+@condicional(validar_lista)
 def lista_cursos(request):
-    cursos = Curso.objects.all()
+    # Mismo orden que Curso.Meta.ordering, desempatando por id
+    # Programa y coordinador en el mismo JOIN y ocupación anotada: la lista
+    # usa un número fijo de consultas sin importar cuántos cursos muestre
+    cursos = Curso.objects.con_relaciones().con_ocupacion()
+    paginator = KeysetPaginator(cursos, ('-fecha_inicio', '-id'))
+    pagina = paginator.pagina(request)
     template = loader.get_template('lista_cursos.html')
 
     context = {
-        'lista_cursos': cursos,
-        'total_cursos': cursos.count(),
+        'lista_cursos': pagina,
+        'pagina': pagina,
+        # La tabla muestra el programa, el coordinador y la ocupación
+        # (que cambia con las inscripciones)
+        'version': version(Curso, Programa, Instructor, AprendizCurso),
     }
     
     return HttpResponse(template.render(context, request))
 
+def exportar_cursos(request):
+    # Programa y coordinador salen del mismo JOIN de la consulta en flujo
+    columnas = [
+        ('ID', 'id'),
+        ('Código', 'codigo'),
+        ('Nombre', 'nombre'),
+        ('Código Programa', 'programa__codigo'),
+        ('Programa', 'programa__nombre'),
+        ('Documento Coordinador', 'instructor_coordinador__documento_id'),
+        ('Nombre Coordinador', 'instructor_coordinador__nombre'),
+        ('Apellido Coordinador', 'instructor_coordinador__apellido'),
+        ('Fecha Inicio', 'fecha_inicio'),
+        ('Fecha Fin', 'fecha_fin'),
+        ('Horario', 'horario'),
+        ('Aula', 'aula'),
+        ('Cupos Máximos', 'cupos_maximos'),
+        ('Inscritos', 'inscritos'),
+        ('Estado', 'estado'),
+    ]
+    return respuesta_csv('cursos.csv', columnas, Curso.objects.all())
+
+@condicional(validar_detalle)
 def detalle_curso(request, curso_id):
-    curso = Curso.objects.get(id=curso_id)
-    aprendices_curso = curso.aprendizcurso_set.all()
-    instructores_curso = curso.instructorcurso_set.all()
+    curso = Curso.objects.con_relaciones().get(id=curso_id)
+    instructores_curso = curso.instructorcurso_set.select_related('instructor')
     template = loader.get_template('detalle_curso.html')
     
     context = {
         'curso': curso,
-        'aprendices_curso': aprendices_curso,
         'instructores_curso': instructores_curso,
     }
     
     return HttpResponse(template.render(context, request))
 
+# Vistas asíncronas de lectura, usadas con ASGI (ver VISTAS_ASINCRONAS en settings)
+
+@condicional(validar_lista)
+async def lista_cursos_async(request):
+    cursos = Curso.objects.con_relaciones().con_ocupacion()
+    paginator = KeysetPaginator(cursos, ('-fecha_inicio', '-id'))
+    pagina = paginator.pagina(request)
+    context = {
+        'lista_cursos': pagina,
+        'pagina': pagina,
+        'version': await aversion(Curso, Programa, Instructor, AprendizCurso),
+    }
+    if not await afragmento_en_cache('tabla_cursos', context['version'], pagina.clave_cache):
+        await pagina.acargar()
+    return TemplateResponse(request, 'lista_cursos.html', context)
+
+@condicional(validar_detalle)
+async def detalle_curso_async(request, curso_id):
+    # El curso y sus instructores no dependen uno del otro: se piden a la vez
+    curso, instructores_curso = await asyncio.gather(
+        Curso.objects.con_relaciones().aget(id=curso_id),
+        _listar(InstructorCurso.objects.filter(curso_id=curso_id).select_related('instructor')),
+    )
+    template = loader.get_template('detalle_curso.html')
+    context = {
+        'curso': curso,
+        'instructores_curso': instructores_curso,
+    }
+    return HttpResponse(template.render(context, request))
+
+async def _listar(queryset):
+    return [fila async for fila in queryset]
+
 
 # CREATE - CURSO
 class CursoCreateView(generic.CreateView):
@@ -91,6 +188,8 @@ class CursoUpdateView(generic.UpdateView):
 class CursoDeleteView(generic.DeleteView):
     """Vista para eliminar un curso"""
     model = Curso
+    # La confirmación muestra el programa y el coordinador
+    queryset = Curso.objects.con_relaciones()
     template_name = 'eliminar_curso.html'
     success_url = reverse_lazy('cursos:lista_cursos')
     pk_url_kwarg = 'curso_id'
@@ -102,4 +201,71 @@ class CursoDeleteView(generic.DeleteView):
             request,
             f'El curso "{curso.nombre}" (Código: {curso.codigo}) ha sido eliminado exitosamente.'
         )
-        return super().delete(request, *args, **kwargs)
\ No newline at end of file
+        return super().delete(request, *args, **kwargs)
+
+
+# INSCRIPCIÓN - APRENDIZ EN CURSO
+class AprendizCursoCreateView(generic.CreateView):
+    """Vista para inscribir un aprendiz en un curso"""
+    form_class = AprendizCursoForm
+    template_name = 'inscribir_aprendiz.html'
+
+    def get_initial(self):
+        """Preseleccionar el curso si llega en la URL (?curso=<id>)"""
+        initial = super().get_initial()
+        if self.request.GET.get('curso'):
+            initial['curso'] = self.request.GET['curso']
+        return initial
+
+    def get_success_url(self):
+        return reverse_lazy('cursos:detalle_curso', args=[self.object.curso_id])
+
+    def form_valid(self, form):
+        """Guardar reservando el cupo; si otro usuario tomó el último cupo, informar el error"""
+        try:
+            response = super().form_valid(form)
+        except CursoSinCupos:
+            form.add_error('curso', f'El curso {form.instance.curso.codigo} no tiene cupos disponibles.')
+            return self.form_invalid(form)
+        messages.success(
+            self.request,
+            f'El aprendiz {form.instance.aprendiz.nombre_completo()} ha sido inscrito en el curso {form.instance.curso.codigo}.'
+        )
+        return response
+
+    def form_invalid(self, form):
+        """Mostrar mensaje de error si el formulario es inválido"""
+        messages.error(
+            self.request,
+            'Por favor, corrija los errores en el formulario.'
+        )
+        return super().form_invalid(form)
+
+
+# INSCRIPCIÓN - GRUPO DE APRENDICES EN CURSO
+def inscribir_grupo(request):
+    """Inscribir de una vez una lista de aprendices (documentos o ids) en un curso"""
+    resultado = None
+    if request.method == 'POST':
+        form = InscripcionGrupoForm(request.POST)
+        if form.is_valid():
+            curso = form.cleaned_data['curso']
+            resultado = inscribir_aprendices(curso.id, form.cleaned_data['aprendices'], por=form.cleaned_data['por'])
+            if resultado.inscritos:
+                messages.success(request, f'Se inscribieron {len(resultado.inscritos)} aprendices en el curso {curso.codigo}.')
+            if resultado.interrumpida:
+                messages.error(
+                    request,
+                    'Otro usuario cambió las inscripciones o los cupos del curso mientras se inscribía la lista. '
+                    'No se inscribió a nadie: intente de nuevo.',
+                )
+            elif resultado.rechazados:
+                messages.error(request, f'{len(resultado.rechazados)} aprendices no fueron inscritos.')
+    else:
+        form = InscripcionGrupoForm(initial={'curso': request.GET.get('curso')})
+    template = loader.get_template('inscribir_grupo.html')
+    context = {
+        'form': form,
+        'resultado': resultado,
+    }
+    return HttpResponse(template.render(context, request))
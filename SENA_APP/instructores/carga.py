@@ -0,0 +1,88 @@
+"""
+Carga de trabajo de cada instructor en sus cursos vigentes (los que no
+están finalizados ni cancelados):
+
+* ``total_coordinados``: cursos de los que es coordinador (la relación
+  ``cursos_coordinados``),
+* ``total_impartidos``: cursos a los que está asignado con InstructorCurso
+  (``cursos_impartidos``),
+* ``aprendices_a_cargo``: suma de ``inscritos`` de esos cursos (cada curso
+  una vez, aunque coordine y además esté asignado),
+* ``minutos_semanales``: duración de sus franjas horarias (ver
+  cursos/horarios.py).
+
+``con_carga`` lo anota todo en la misma consulta de instructores con
+subconsultas correlacionadas, cada una sobre un índice (el coordinador
+del curso, el par instructor-curso de InstructorCurso y el curso de cada
+franja), en lugar de contar curso por curso desde las plantillas.
+"""
+
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from cursos.cruces import ESTADOS_SIN_HORARIO
+from cursos.models import Curso, FranjaHoraria, InstructorCurso
+from .models import Instructor
+
+# Columnas del instructor que acompañan la carga en la API
+CAMPOS_INSTRUCTOR = ('id', 'nombre', 'apellido', 'especialidad', 'activo')
+
+# ?orden= de la página y de la API; el id desempata para paginar por cursor
+ORDENAMIENTOS = {
+    'apellido': ('apellido', 'id'),
+    'coordinados': ('-total_coordinados', 'apellido', 'id'),
+    'impartidos': ('-total_impartidos', 'apellido', 'id'),
+    'aprendices': ('-aprendices_a_cargo', 'apellido', 'id'),
+    'horas': ('-minutos_semanales', 'apellido', 'id'),
+}
+ORDEN_POR_DEFECTO = 'apellido'
+
+ACTIVO = {'1': True, 'true': True, 'si': True, '0': False, 'false': False, 'no': False}
+
+
+def _total(consulta, grupo, expresion):
+    """Subconsulta correlacionada con un solo valor por instructor (0 si no hay filas)"""
+    return Coalesce(Subquery(consulta.order_by().values(grupo).annotate(total=expresion).values('total')), 0)
+
+
+def anotaciones():
+    coordinados = Curso.objects.filter(instructor_coordinador=OuterRef('pk')).exclude(estado__in=ESTADOS_SIN_HORARIO)
+    # Las asignaciones a cursos que además coordina se cuentan en el curso,
+    # no en aprendices ni en horas
+    asignados = InstructorCurso.objects.filter(instructor=OuterRef('pk')).exclude(curso__estado__in=ESTADOS_SIN_HORARIO)
+    solo_asignados = asignados.exclude(curso__instructor_coordinador=OuterRef('pk'))
+    franjas = FranjaHoraria.objects.exclude(curso__estado__in=ESTADOS_SIN_HORARIO)
+    duracion = Sum('minutos')
+    return {
+        'total_coordinados': _total(coordinados, 'instructor_coordinador', Count('id')),
+        'total_impartidos': _total(asignados, 'instructor', Count('id')),
+        'aprendices_a_cargo': (
+            _total(coordinados, 'instructor_coordinador', Sum('inscritos'))
+            + _total(solo_asignados, 'instructor', Sum('curso__inscritos'))
+        ),
+        'minutos_semanales': (
+            _total(franjas.filter(curso__instructor_coordinador=OuterRef('pk')), 'curso__instructor_coordinador', duracion)
+            + _total(
+                franjas.filter(curso__instructorcurso__instructor=OuterRef('pk'))
+                .exclude(curso__instructor_coordinador=OuterRef('pk')),
+                'curso__instructorcurso__instructor', duracion,
+            )
+        ),
+    }
+
+
+def con_carga(consulta=None):
+    """Instructores (por defecto, todos) con la carga anotada"""
+    consulta = Instructor.objects.all() if consulta is None else consulta
+    return consulta.annotate(**anotaciones())
+
+
+def filtrar(consulta, parametros):
+    """``?activo=1|0`` y ``?especialidad=`` (sin distinguir mayúsculas)"""
+    activo = ACTIVO.get(parametros.get('activo', '').strip().lower())
+    if activo is not None:
+        consulta = consulta.filter(activo=activo)
+    especialidad = parametros.get('especialidad', '').strip()
+    if especialidad:
+        consulta = consulta.filter(especialidad__iexact=especialidad)
+    return consulta
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='instructor',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['apellido', 'nombre'], name='instructor_activo_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instructor',
+            index=models.Index(fields=['apellido', 'id'], name='instructor_apellido_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructores', '0002_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instructor',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructores', '0003_instructor_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='instructor',
+            name='instructor_activo_nombre_idx',
+        ),
+        migrations.AddIndex(
+            model_name='instructor',
+            index=models.Index(django.db.models.functions.text.Lower('apellido'), models.F('id'), condition=models.Q(('activo', True)), name='instructor_busqueda_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 # Create your models here.
 
@@ -36,6 +37,22 @@ class Instructor(models.Model):
     activo = models.BooleanField(default=True)
     fecha_vinculacion = models.DateField()
     fecha_registro = models.DateField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Búsqueda por prefijo de instructores activos en los selectores de
+            # los formularios de cursos (SENA_APP/autocompletar.py).
+            # Índice parcial: en SQLite filter(activo=True) se compila como
+            # WHERE "activo" y no como igualdad, así que un índice que empiece
+            # por activo no serviría para buscar
+            models.Index(
+                Lower('apellido'), 'id', condition=models.Q(activo=True),
+                name='instructor_busqueda_idx',
+            ),
+            # Orden de la lista paginada por cursor
+            models.Index(fields=['apellido', 'id'], name='instructor_apellido_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nombre} {self.apellido} - {self.especialidad}"
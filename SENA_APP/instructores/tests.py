@@ -1,3 +1,101 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from SENA_APP.pruebas import PresupuestoVistasMixin, limpiar_caches
+from cursos.models import Curso, InstructorCurso
+from cursos.tests import crear_curso, crear_instructor, crear_programa
+from .carga import con_carga, filtrar
+from .models import Instructor
+
+
+class PresupuestoVistasInstructoresTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de instructores/urls.py"""
+
+    def vistas(self):
+        instructor = Instructor.objects.order_by('id').first()
+        return [
+            ('lista', reverse('instructores:lista_instructores'), 2),
+            # Las versiones (GET condicional), la carga anotada y las
+            # especialidades del filtro
+            ('carga', reverse('instructores:carga_instructores'), 3),
+            ('carga_por_horas', reverse('instructores:carga_instructores') + '?orden=horas&activo=1', 3),
+            # La fecha de actualización (GET condicional) y el instructor
+            ('detalle', reverse('instructores:detalle_instructor', args=[instructor.id]), 2),
+            ('crear', reverse('instructores:crear_instructor'), 0),
+            ('exportar', reverse('instructores:exportar_instructores'), 1),
+            ('editar', reverse('instructores:editar_instructor', args=[instructor.id]), 1),
+            ('eliminar', reverse('instructores:eliminar_instructor', args=[instructor.id]), 1),
+        ]
+
+
+class CargaInstructoresTests(TestCase):
+    """Cursos, aprendices y horas de cada instructor en una sola consulta"""
+
+    @classmethod
+    def setUpTestData(cls):
+        programa = crear_programa()
+        cls.ana = crear_instructor('1000')
+        cls.beto = crear_instructor('1001', nombre='Beto')
+        cls.carla = crear_instructor('1002', nombre='Carla', especialidad='Redes', activo=False)
+        # 5 franjas de 4 horas
+        propio = crear_curso(programa, cls.ana, 'CURSO-1')
+        # Una franja de 2 horas
+        ajeno = crear_curso(programa, cls.beto, 'CURSO-2', horario='Sábado 8:00 - 10:00', aula='Aula 202')
+        finalizado = crear_curso(programa, cls.ana, 'CURSO-3', aula='Aula 303', estado='FIN')
+        Curso.objects.filter(pk=propio.pk).update(inscritos=10)
+        Curso.objects.filter(pk=ajeno.pk).update(inscritos=5)
+        Curso.objects.filter(pk=finalizado.pk).update(inscritos=7)
+        # Ana también figura como instructora de su propio curso: se cuenta
+        # como impartido, pero sus aprendices y horas una sola vez
+        for curso in (propio, ajeno, finalizado):
+            InstructorCurso.objects.create(instructor=cls.ana, curso=curso, rol='Instructor')
+
+    def setUp(self):
+        limpiar_caches()
+
+    def test_carga_de_cada_instructor(self):
+        carga = {
+            instructor.pk: (
+                instructor.total_coordinados, instructor.total_impartidos,
+                instructor.aprendices_a_cargo, instructor.minutos_semanales,
+            )
+            for instructor in con_carga()
+        }
+        self.assertEqual(carga, {
+            self.ana.pk: (1, 2, 15, 5 * 240 + 120),
+            self.beto.pk: (1, 0, 5, 120),
+            self.carla.pk: (0, 0, 0, 0),
+        })
+
+    def test_filtros(self):
+        def filtrados(**parametros):
+            return set(filtrar(con_carga(), parametros).values_list('pk', flat=True))
+
+        self.assertEqual(filtrados(activo='0'), {self.carla.pk})
+        self.assertEqual(filtrados(activo='si', especialidad='software'), {self.ana.pk, self.beto.pk})
+        self.assertEqual(filtrados(activo='cualquiera'), {self.ana.pk, self.beto.pk, self.carla.pk})
+
+    def test_vista_ordena_y_filtra(self):
+        url = reverse('instructores:carga_instructores')
+        respuesta = self.client.get(url, {'orden': 'horas'})
+        pagina = list(respuesta.context['lista_instructores'])
+        self.assertEqual([instructor.pk for instructor in pagina], [self.ana.pk, self.beto.pk, self.carla.pk])
+        self.assertEqual(pagina[0].horas_semanales, 22)
+
+        respuesta = self.client.get(url, {'orden': 'desconocido', 'especialidad': 'Redes'})
+        self.assertEqual(respuesta.context['orden'], 'apellido')
+        self.assertEqual([instructor.pk for instructor in respuesta.context['lista_instructores']], [self.carla.pk])
+
+    def test_consultas_fijas(self):
+        def consultas():
+            limpiar_caches()
+            with CaptureQueriesContext(connection) as capturadas:
+                self.client.get(reverse('instructores:carga_instructores'), {'orden': 'aprendices'})
+            return len(capturadas)
+
+        antes = consultas()
+        for documento in range(2000, 2010):
+            crear_instructor(str(documento))
+        self.assertEqual(consultas(), antes)
@@ -1,12 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from . import views 
 
 app_name = 'instructores'
 
+# Con ASGI las lecturas usan las vistas async (ver VISTAS_ASINCRONAS en settings)
+asincronas = settings.VISTAS_ASINCRONAS
+
 urlpatterns = [
-    path('', views.lista_instructores, name='lista_instructores'),
-    path('<int:id_instructor>/', views.detalle_instructor, name='detalle_instructor'),
+    path('', views.lista_instructores_async if asincronas else views.lista_instructores, name='lista_instructores'),
+    path('<int:id_instructor>/', views.detalle_instructor_async if asincronas else views.detalle_instructor, name='detalle_instructor'),
     path('crear/', views.InstructorCreateView.as_view(), name='crear_instructor'),
+    path('carga/', views.carga_instructores, name='carga_instructores'),
+    path('exportar/', views.exportar_instructores, name='exportar_instructores'),
     path('<int:instructor_id>/editar/', views.InstructorUpdateView.as_view(), name='editar_instructor'),
     path('<int:instructor_id>/eliminar/', views.InstructorDeleteView.as_view(), name='eliminar_instructor'),
 ]
\ No newline at end of file
@@ -1,23 +1,89 @@
 from django.template import loader
 from django.http import HttpResponse
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.contrib import messages
 
+from .carga import ORDEN_POR_DEFECTO, ORDENAMIENTOS, con_carga, filtrar
 from .forms import InstructorForm
 from .models import Instructor
+from cursos.models import AprendizCurso, Curso, InstructorCurso
+from SENA_APP.condicional import condicional, por_fecha, por_versiones
+from SENA_APP.exportacion import respuesta_csv
+from SENA_APP.fragmentos import afragmento_en_cache, aversion, version
+from SENA_APP.paginacion import KeysetPaginator
 
 # Create your views here.
 
+# GET condicional: la lista se valida con la versión de sus fragmentos y el
+# detalle con la fecha de actualización del instructor
+validar_lista = por_versiones(Instructor)
+
+
+def _fecha_instructor(id_instructor):
+    return Instructor.objects.filter(id=id_instructor).values_list('fecha_actualizacion', flat=True)
+
+
+validar_detalle = por_fecha(_fecha_instructor)
+# La carga cambia con los cursos, sus asignaciones y sus inscripciones
+validar_carga = por_versiones(Instructor, Curso, InstructorCurso, AprendizCurso)
+
+@condicional(validar_lista)
 def lista_instructores(request):
     
-    lista_instructores = Instructor.objects.all()
+    paginator = KeysetPaginator(Instructor.objects.all(), ('apellido', 'id'))
+    pagina = paginator.pagina(request)
     template = loader.get_template('lista_instructores.html')
     context = {
-        'lista_instructores': lista_instructores,
+        'lista_instructores': pagina,
+        'pagina': pagina,
+        'version': version(Instructor),
     }
     return HttpResponse(template.render(context, request))
 
+@condicional(validar_carga)
+def carga_instructores(request):
+    
+    orden = request.GET.get('orden')
+    orden = orden if orden in ORDENAMIENTOS else ORDEN_POR_DEFECTO
+    consulta = filtrar(con_carga(), request.GET)
+    pagina = KeysetPaginator(consulta, ORDENAMIENTOS[orden]).pagina(request)
+    for instructor in pagina:
+        instructor.horas_semanales = instructor.minutos_semanales / 60
+    template = loader.get_template('carga_instructores.html')
+    context = {
+        'lista_instructores': pagina,
+        'pagina': pagina,
+        'orden': orden,
+        'activo': request.GET.get('activo', ''),
+        'especialidad': request.GET.get('especialidad', ''),
+        'especialidades': Instructor.objects.order_by('especialidad').values_list('especialidad', flat=True).distinct(),
+    }
+    return HttpResponse(template.render(context, request))
+
+def exportar_instructores(request):
+    
+    columnas = [
+        ('ID', 'id'),
+        ('Tipo Documento', 'tipo_documento'),
+        ('Documento', 'documento_id'),
+        ('Nombre', 'nombre'),
+        ('Apellido', 'apellido'),
+        ('Teléfono', 'telefono'),
+        ('Correo', 'correo'),
+        ('Fecha Nacimiento', 'fecha_nacimiento'),
+        ('Ciudad', 'ciudad'),
+        ('Dirección', 'direccion'),
+        ('Nivel Educativo', 'nivel_educativo'),
+        ('Especialidad', 'especialidad'),
+        ('Años Experiencia', 'anos_experiencia'),
+        ('Activo', 'activo'),
+        ('Fecha Vinculación', 'fecha_vinculacion'),
+    ]
+    return respuesta_csv('instructores.csv', columnas, Instructor.objects.all())
+
+@condicional(validar_detalle)
 def detalle_instructor(request, id_instructor):
     
     instructor = Instructor.objects.get(id=id_instructor)
@@ -27,6 +93,30 @@ def detalle_instructor(request, id_instructor):
     }
     return HttpResponse(template.render(context, request))
 
+# Vistas asíncronas de lectura, usadas con ASGI (ver VISTAS_ASINCRONAS en settings)
+
+@condicional(validar_lista)
+async def lista_instructores_async(request):
+    paginator = KeysetPaginator(Instructor.objects.all(), ('apellido', 'id'))
+    pagina = paginator.pagina(request)
+    context = {
+        'lista_instructores': pagina,
+        'pagina': pagina,
+        'version': await aversion(Instructor),
+    }
+    if not await afragmento_en_cache('tabla_instructores', context['version'], pagina.clave_cache):
+        await pagina.acargar()
+    return TemplateResponse(request, 'lista_instructores.html', context)
+
+@condicional(validar_detalle)
+async def detalle_instructor_async(request, id_instructor):
+    instructor = await Instructor.objects.aget(id=id_instructor)
+    template = loader.get_template('detalle_instructor.html')
+    context = {
+        'instructor': instructor,
+    }
+    return HttpResponse(template.render(context, request))
+
 # CREATE - INSTRUCTOR
 class InstructorCreateView(CreateView):
     """Vista para crear un nuevo instructor"""
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='programa',
+            index=models.Index(fields=['estado', 'nombre'], name='programa_estado_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programa',
+            index=models.Index(fields=['nombre', 'id'], name='programa_nombre_id_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programas', '0003_programa_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='programa',
+            name='programa_estado_nombre_idx',
+        ),
+        migrations.AddIndex(
+            model_name='programa',
+            index=models.Index(django.db.models.functions.text.Lower('nombre'), models.F('id'), condition=models.Q(('estado', 'ACT')), name='programa_busqueda_idx'),
+        ),
+    ]
@@ -1,4 +1,23 @@
 from django.db import models
+from django.db.models.functions import Lower
+
+# Textos sin límite de longitud que solo muestran el detalle (cada uno como
+# fragmento aparte), el formulario de edición y la exportación
+TEXTOS_LARGOS = ('descripcion', 'competencias', 'perfil_egreso', 'requisitos_ingreso')
+
+
+def textos_largos(relacion=None):
+    """Nombres para ``defer()`` de los textos largos, propios o de ``relacion``"""
+    if relacion is None:
+        return list(TEXTOS_LARGOS)
+    return [f'{relacion}__{campo}' for campo in TEXTOS_LARGOS]
+
+
+class ProgramaQuerySet(models.QuerySet):
+    def sin_textos(self):
+        """Programas sin los textos largos: listas, selectores y encabezados"""
+        return self.defer(*TEXTOS_LARGOS)
+
 
 class Programa(models.Model):
     NIVEL_FORMACION_CHOICES = [
@@ -38,6 +57,26 @@ class Programa(models.Model):
     estado = models.CharField(max_length=3, choices=ESTADO_CHOICES, default='ACT', verbose_name="Estado")
     fecha_creacion = models.DateField(verbose_name="Fecha de Creación del Programa")
     fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Registro")
-    
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    objects = ProgramaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Búsqueda por prefijo de programas activos en el selector del
+            # formulario de cursos (SENA_APP/autocompletar.py)
+            models.Index(Lower('nombre'), 'id', condition=models.Q(estado='ACT'), name='programa_busqueda_idx'),
+            # Orden de la lista paginada por cursor
+            models.Index(fields=['nombre', 'id'], name='programa_nombre_id_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.codigo} - {self.nombre}"
\ No newline at end of file
+        return f"{self.codigo} - {self.nombre}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Nombre cargado: el índice de búsqueda de sus aprendices lo copia
+        # y se rehace solo si cambia (busqueda/signals.py)
+        instancia._nombre_original = instancia.__dict__.get('nombre')
+        return instancia
\ No newline at end of file
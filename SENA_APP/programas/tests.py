@@ -1,3 +1,78 @@
+from datetime import date
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from SENA_APP.autocompletar import FUENTES
+from SENA_APP.pruebas import PresupuestoVistasMixin, limpiar_caches
+from .models import TEXTOS_LARGOS, Programa
+
+
+class TextosLargosTests(TestCase):
+    """Las listas, los selectores y el detalle no leen los textos largos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programa = Programa.objects.create(
+            codigo='ADSO', nombre='Análisis y Desarrollo de Software', nivel_formacion='TGL',
+            duracion_meses=24, duracion_horas=3984, descripcion='Descripción extensa',
+            competencias='Competencias extensas', perfil_egreso='Perfil extenso',
+            requisitos_ingreso='Requisitos extensos', centro_formacion='CTPI', regional='Cauca',
+            fecha_creacion=date(2020, 1, 1),
+        )
+
+    def setUp(self):
+        limpiar_caches()
+
+    def sql(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, '\n'.join(consulta['sql'] for consulta in consultas)
+
+    def test_lista_y_detalle_sin_textos(self):
+        for url in (reverse('programas:lista_programa'), reverse('programas:detalle_programa', args=[self.programa.id])):
+            with self.subTest(url=url):
+                respuesta, sql = self.sql(url)
+                for campo in TEXTOS_LARGOS:
+                    self.assertNotIn(campo, sql)
+                self.assertNotContains(respuesta, 'Descripción extensa')
+
+    def test_secciones_como_fragmentos(self):
+        url = reverse('programas:seccion_programa', args=[self.programa.id, 'competencias'])
+        self.assertContains(self.client.get(reverse('programas:detalle_programa', args=[self.programa.id])), url)
+        respuesta, sql = self.sql(url)
+        self.assertEqual(respuesta.content.decode().strip(), '<p class="mb-0">Competencias extensas</p>')
+        self.assertNotIn('descripcion', sql)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304,
+        )
+        self.assertEqual(
+            self.client.get(reverse('programas:seccion_programa', args=[self.programa.id, 'codigo'])).status_code, 404,
+        )
+
+    def test_selector_valida_sin_textos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            programa = FUENTES['programas'].consulta().get(pk=self.programa.pk)
+        self.assertEqual(programa.get_deferred_fields(), set(TEXTOS_LARGOS))
+        self.assertNotIn('descripcion', consultas[0]['sql'])
+
+
+class PresupuestoVistasProgramasTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de programas/urls.py"""
 
-# Create your tests here.
+    def vistas(self):
+        programa = Programa.objects.order_by('id').first()
+        return [
+            ('lista', reverse('programas:lista_programa'), 2),
+            # La fecha de actualización (GET condicional) y el programa
+            ('detalle', reverse('programas:detalle_programa', args=[programa.id]), 2),
+            # La fecha de actualización y el texto
+            ('seccion', reverse('programas:seccion_programa', args=[programa.id, 'competencias']), 2),
+            ('crear', reverse('programas:crear_programa'), 0),
+            ('exportar', reverse('programas:exportar_programas'), 1),
+            ('editar', reverse('programas:editar_programa', args=[programa.id]), 1),
+            ('eliminar', reverse('programas:eliminar_programa', args=[programa.id]), 1),
+        ]
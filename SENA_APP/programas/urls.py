@@ -1,12 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from . import views 
 
 app_name = 'programas'
 
+# Con ASGI las lecturas usan las vistas async (ver VISTAS_ASINCRONAS en settings)
+asincronas = settings.VISTAS_ASINCRONAS
+
 urlpatterns = [
-    path('', views.lista_programa, name='lista_programa'),
-    path('<int:id_programas>/', views.detalle_programa, name='detalle_programa'),
+    path('', views.lista_programa_async if asincronas else views.lista_programa, name='lista_programa'),
+    path('<int:id_programas>/', views.detalle_programa_async if asincronas else views.detalle_programa, name='detalle_programa'),
+    path(
+        '<int:id_programas>/secciones/<str:seccion>/',
+        views.seccion_programa_async if asincronas else views.seccion_programa,
+        name='seccion_programa',
+    ),
     path('crear/', views.ProgramaCreateView.as_view(), name='crear_programa'),
+    path('exportar/', views.exportar_programas, name='exportar_programas'),
     path('<int:programa_id>/editar/', views.ProgramaUpdateView.as_view(), name='editar_programa'),
     path('<int:programa_id>/eliminar/', views.ProgramaDeleteView.as_view(), name='eliminar_programa'),
 ]
@@ -1,36 +1,126 @@
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
 from django.template import loader
 from .models import Programa
 from django.views import generic
 from django.urls import reverse_lazy
 from django.contrib import messages
-from .models import Programa
+from .models import TEXTOS_LARGOS, Programa
 from .forms import ProgramaForm
+from SENA_APP.condicional import condicional, por_fecha, por_versiones
+from SENA_APP.exportacion import respuesta_csv
+from SENA_APP.fragmentos import afragmento_en_cache, aversion, version
+from SENA_APP.paginacion import KeysetPaginator
 
 # Create your views here.
 
+# GET condicional: la lista se valida con la versión de sus fragmentos y el
+# detalle (y cada sección del detalle) con la fecha de actualización del programa
+validar_lista = por_versiones(Programa)
+
+
+def _fecha_programa(id_programas, seccion=None):
+    return Programa.objects.filter(id=id_programas).values_list("fecha_actualizacion", flat=True)
+
+
+validar_detalle = por_fecha(_fecha_programa)
+
 def main(request):
     template = loader.get_template("main.html")
     return HttpResponse(template.render())
 
+@condicional(validar_lista)
 def lista_programa(request):
-    lista_programas = Programa.objects.all()
+    paginator = KeysetPaginator(Programa.objects.sin_textos(), ('nombre', 'id'))
+    pagina = paginator.pagina(request)
     template = loader.get_template("lista_programa.html")
     context = {
-        "lista_programas": lista_programas,
-        'total_programa': lista_programas.count(),
+        "lista_programas": pagina,
+        "pagina": pagina,
+        "version": version(Programa),
     }
     return HttpResponse(template.render(context, request))
 
 
+def exportar_programas(request):
+    columnas = [
+        ('ID', 'id'),
+        ('Código', 'codigo'),
+        ('Nombre', 'nombre'),
+        ('Nivel de Formación', 'nivel_formacion'),
+        ('Modalidad', 'modalidad'),
+        ('Duración Meses', 'duracion_meses'),
+        ('Duración Horas', 'duracion_horas'),
+        ('Descripción', 'descripcion'),
+        ('Competencias', 'competencias'),
+        ('Perfil de Egreso', 'perfil_egreso'),
+        ('Requisitos de Ingreso', 'requisitos_ingreso'),
+        ('Centro de Formación', 'centro_formacion'),
+        ('Regional', 'regional'),
+        ('Estado', 'estado'),
+        ('Fecha Creación', 'fecha_creacion'),
+    ]
+    return respuesta_csv('programas.csv', columnas, Programa.objects.all())
+
+
+@condicional(validar_detalle)
 def detalle_programa(request, id_programas):
-    detalle_programa = Programa.objects.get(id=id_programas)
+    # Los textos largos se piden aparte, cada uno con seccion_programa
+    detalle_programa = Programa.objects.sin_textos().get(id=id_programas)
     template = loader.get_template("detalle_programa.html")
     context = {
         "programa": detalle_programa,
     }
     return HttpResponse(template.render(context, request))
 
+
+@condicional(validar_detalle)
+def seccion_programa(request, id_programas, seccion):
+    """Un texto largo del programa, como fragmento HTML para el detalle"""
+    texto = _texto_programa(id_programas, seccion).first()
+    if texto is None:
+        raise Http404("Sección no encontrada")
+    template = loader.get_template("seccion_programa.html")
+    return HttpResponse(template.render({"texto": texto}, request))
+
+
+def _texto_programa(id_programas, seccion):
+    if seccion not in TEXTOS_LARGOS:
+        return Programa.objects.none()
+    return Programa.objects.filter(id=id_programas).values_list(seccion, flat=True)
+
+# Vistas asíncronas de lectura, usadas con ASGI (ver VISTAS_ASINCRONAS en settings)
+
+@condicional(validar_lista)
+async def lista_programa_async(request):
+    paginator = KeysetPaginator(Programa.objects.sin_textos(), ('nombre', 'id'))
+    pagina = paginator.pagina(request)
+    context = {
+        "lista_programas": pagina,
+        "pagina": pagina,
+        "version": await aversion(Programa),
+    }
+    if not await afragmento_en_cache("tabla_programas", context["version"], pagina.clave_cache):
+        await pagina.acargar()
+    return TemplateResponse(request, "lista_programa.html", context)
+
+@condicional(validar_detalle)
+async def detalle_programa_async(request, id_programas):
+    detalle_programa = await Programa.objects.sin_textos().aget(id=id_programas)
+    template = loader.get_template("detalle_programa.html")
+    context = {
+        "programa": detalle_programa,
+    }
+    return HttpResponse(template.render(context, request))
+
+@condicional(validar_detalle)
+async def seccion_programa_async(request, id_programas, seccion):
+    texto = await _texto_programa(id_programas, seccion).afirst()
+    if texto is None:
+        raise Http404("Sección no encontrada")
+    template = loader.get_template("seccion_programa.html")
+    return HttpResponse(template.render({"texto": texto}, request))
+
 # CREATE - PROGRAMA
 class ProgramaCreateView(generic.CreateView):
     """Vista para crear un nuevo programa de formación"""
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ReportesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reportes'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from programas.models import Programa
+from reportes.models import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde las inscripciones el resumen por programa del "
+        "reporte de inscripciones. Necesario después de cargas hechas con "
+        "SQL directo o QuerySet.update(), que no pasan por las señales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'codigos', nargs='*',
+            help='Códigos de los programas a recalcular (por defecto, todos)',
+        )
+
+    def handle(self, *args, **options):
+        programas = None
+        if options['codigos']:
+            programas = Programa.objects.filter(codigo__in=options['codigos']).values_list('id', flat=True)
+        inicio = time.perf_counter()
+        total = reconstruir_resumenes(programas)
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f'{total} resúmenes recalculados en {segundos:.2f} s.'))
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:05
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+CAMPO_POR_ESTADO = {'INS': 'inscritos', 'ACT': 'activos', 'GRA': 'graduados', 'DES': 'desertores', 'SUS': 'suspendidos'}
+
+
+def calcular_resumenes(apps, schema_editor):
+    Programa = apps.get_model('programas', 'Programa')
+    AprendizCurso = apps.get_model('cursos', 'AprendizCurso')
+    ResumenPrograma = apps.get_model('reportes', 'ResumenPrograma')
+    conteos = {
+        fila.pop('curso__programa'): fila
+        for fila in AprendizCurso.objects.order_by().values('curso__programa').annotate(
+            **{campo: Count('id', filter=Q(estado=estado)) for estado, campo in CAMPO_POR_ESTADO.items()},
+            con_nota=Count('nota_final'),
+            suma_notas=Coalesce(Sum('nota_final'), Value(Decimal(0))),
+        )
+    }
+    ResumenPrograma.objects.bulk_create([
+        ResumenPrograma(programa_id=programa_id, **conteos.get(programa_id, {}))
+        for programa_id in Programa.objects.values_list('id', flat=True)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('programas', '0004_indice_busqueda'),
+        ('cursos', '0006_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenPrograma',
+            fields=[
+                ('programa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen', serialize=False, to='programas.programa', verbose_name='Programa de Formación')),
+                ('inscritos', models.PositiveIntegerField(default=0, verbose_name='Inscritos')),
+                ('activos', models.PositiveIntegerField(default=0, verbose_name='Activos')),
+                ('graduados', models.PositiveIntegerField(default=0, verbose_name='Graduados')),
+                ('desertores', models.PositiveIntegerField(default=0, verbose_name='Desertores')),
+                ('suspendidos', models.PositiveIntegerField(default=0, verbose_name='Suspendidos')),
+                ('con_nota', models.PositiveIntegerField(default=0, verbose_name='Inscripciones con Nota')),
+                ('suma_notas', models.DecimalField(decimal_places=1, default=0, max_digits=12, verbose_name='Suma de Notas')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Resumen por Programa',
+                'verbose_name_plural': 'Resúmenes por Programa',
+            },
+        ),
+        migrations.RunPython(calcular_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,135 @@
+"""
+Resumen de inscripciones por programa, mantenido de forma incremental.
+
+Contar inscritos, activos, graduados y desertores por programa (o por
+regional y centro) y promediar ``nota_final`` recorre todas las
+inscripciones con un join a cursos y programas. ``ResumenPrograma``
+guarda esos totales, una fila por programa, y cada cambio de una
+inscripción los ajusta con un UPDATE de sumas y restas (ver
+``reportes/signals.py``), así que el reporte lee tantas filas como
+programas haya.
+
+El promedio se guarda como suma y cantidad de notas: un promedio no se
+puede ajustar al cambiar una sola nota.
+
+Las operaciones que no pasan por las señales (``QuerySet.update()``,
+SQL directo) dejan el resumen desactualizado; el comando
+``reconstruir_reportes`` lo recalcula desde las inscripciones.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from SENA_APP.fragmentos import incrementar_version
+from cursos.models import AprendizCurso, Curso
+from programas.models import Programa
+
+# Columna del resumen que cuenta cada estado de AprendizCurso
+CAMPO_POR_ESTADO = {
+    'INS': 'inscritos',
+    'ACT': 'activos',
+    'GRA': 'graduados',
+    'DES': 'desertores',
+    'SUS': 'suspendidos',
+}
+CAMPOS_SUMABLES = [*CAMPO_POR_ESTADO.values(), 'con_nota', 'suma_notas']
+
+
+class ResumenPrograma(models.Model):
+    programa = models.OneToOneField(
+        'programas.Programa', on_delete=models.CASCADE, primary_key=True,
+        related_name='resumen', verbose_name="Programa de Formación",
+    )
+    inscritos = models.PositiveIntegerField(default=0, verbose_name="Inscritos")
+    activos = models.PositiveIntegerField(default=0, verbose_name="Activos")
+    graduados = models.PositiveIntegerField(default=0, verbose_name="Graduados")
+    desertores = models.PositiveIntegerField(default=0, verbose_name="Desertores")
+    suspendidos = models.PositiveIntegerField(default=0, verbose_name="Suspendidos")
+    # Para el promedio de nota_final
+    con_nota = models.PositiveIntegerField(default=0, verbose_name="Inscripciones con Nota")
+    suma_notas = models.DecimalField(max_digits=12, decimal_places=1, default=0, verbose_name="Suma de Notas")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    class Meta:
+        verbose_name = "Resumen por Programa"
+        verbose_name_plural = "Resúmenes por Programa"
+
+    def __str__(self):
+        return f"Resumen de {self.programa_id}"
+
+    @property
+    def total(self):
+        return sum(getattr(self, campo) for campo in CAMPO_POR_ESTADO.values())
+
+    @property
+    def promedio(self):
+        if not self.con_nota:
+            return None
+        return self.suma_notas / self.con_nota
+
+
+def ajustar_resumen(anterior, actual, cantidad=1):
+    """
+    Mover ``cantidad`` inscripciones de la huella ``anterior`` a la
+    ``actual`` (``AprendizCurso.huella()``: curso, estado y nota; None si
+    la inscripción no existía o ya no existe). Un UPDATE por curso
+    involucrado, casi siempre uno solo.
+
+    Si el programa aún no tiene resumen (se creó con bulk_create, por
+    ejemplo) se calcula completo: ya incluye el cambio, que está guardado.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for huella, signo in ((anterior, -cantidad), (actual, cantidad)):
+        if huella is None:
+            continue
+        curso_id, estado, nota = huella
+        delta = deltas[curso_id]
+        delta[CAMPO_POR_ESTADO[estado]] += signo
+        if nota is not None:
+            delta['con_nota'] += signo
+            delta['suma_notas'] += signo * Decimal(nota)
+
+    for curso_id, delta in deltas.items():
+        cambios = {campo: F(campo) + valor for campo, valor in delta.items() if valor}
+        if not cambios:
+            continue
+        actualizados = ResumenPrograma.objects.filter(programa__curso=curso_id).update(
+            **cambios, fecha_actualizacion=timezone.now(),
+        )
+        if not actualizados and actual is not None:
+            reconstruir_resumenes(Curso.objects.filter(pk=curso_id).values_list('programa_id', flat=True))
+    incrementar_version(ResumenPrograma)
+
+
+def reconstruir_resumenes(programas=None):
+    """
+    Recalcular desde las inscripciones el resumen de los ``programas``
+    (ids o queryset de ids; por defecto, todos). Los programas sin
+    inscripciones quedan con ceros. Devuelve cuántos resúmenes escribió.
+    """
+    with transaction.atomic():
+        ids = Programa.objects.values_list('id', flat=True)
+        inscripciones = AprendizCurso.objects.all()
+        if programas is not None:
+            ids = ids.filter(id__in=programas)
+            inscripciones = inscripciones.filter(curso__programa__in=programas)
+        conteos = {
+            fila.pop('curso__programa'): fila
+            for fila in inscripciones.order_by().values('curso__programa').annotate(
+                **{campo: Count('id', filter=Q(estado=estado)) for estado, campo in CAMPO_POR_ESTADO.items()},
+                con_nota=Count('nota_final'),
+                suma_notas=Coalesce(Sum('nota_final'), Value(Decimal(0))),
+            )
+        }
+        ids = list(ids)
+        ResumenPrograma.objects.filter(programa__in=ids).delete()
+        ResumenPrograma.objects.bulk_create([
+            ResumenPrograma(programa_id=programa_id, **conteos.get(programa_id, {})) for programa_id in ids
+        ], batch_size=1000)
+        incrementar_version(ResumenPrograma)
+    return len(ids)
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from cursos.models import AprendizCurso, Curso
+from .models import ajustar_resumen, reconstruir_resumenes
+
+
+def mover_inscripcion(sender, instance, raw=False, **kwargs):
+    """Ajustar el resumen con lo que cambió de la inscripción desde que se cargó"""
+    if raw:
+        return
+    anterior, actual = getattr(instance, '_huella_original', None), instance.huella()
+    if anterior != actual:
+        ajustar_resumen(anterior, actual)
+    instance._huella_original = actual
+
+
+def quitar_inscripcion(sender, instance, **kwargs):
+    # También en los borrados en cascada de un curso, un aprendiz o un programa
+    ajustar_resumen(getattr(instance, '_huella_original', instance.huella()), None)
+
+
+def recordar_programa(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'programa' not in update_fields):
+        return
+    instance._programa_original = (
+        Curso.objects.filter(pk=instance.pk).values_list('programa_id', flat=True).first()
+    )
+
+
+def mover_curso(sender, instance, raw=False, **kwargs):
+    """Un curso que cambia de programa se lleva sus inscripciones: se recalculan ambos"""
+    original = getattr(instance, '_programa_original', None)
+    instance._programa_original = None
+    if not raw and original is not None and original != instance.programa_id:
+        reconstruir_resumenes([original, instance.programa_id])
+
+
+def conectar():
+    """Mantener ResumenPrograma en la misma transacción que cada inscripción"""
+    post_save.connect(mover_inscripcion, sender=AprendizCurso, dispatch_uid='reportes_guardar_inscripcion')
+    post_delete.connect(quitar_inscripcion, sender=AprendizCurso, dispatch_uid='reportes_borrar_inscripcion')
+    pre_save.connect(recordar_programa, sender=Curso, dispatch_uid='reportes_recordar_programa')
+    post_save.connect(mover_curso, sender=Curso, dispatch_uid='reportes_mover_curso')
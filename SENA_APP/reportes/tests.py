@@ -0,0 +1,98 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from SENA_APP.pruebas import PresupuestoVistasMixin, limpiar_caches
+from cursos.inscripcion import inscribir_aprendices, POR_ID
+from cursos.models import AprendizCurso, Curso
+from cursos.tests import crear_aprendices, crear_curso, crear_instructor, crear_programa
+from .models import ResumenPrograma, reconstruir_resumenes
+
+
+def resumenes():
+    return {
+        resumen.programa_id: (
+            resumen.inscritos, resumen.activos, resumen.graduados, resumen.desertores,
+            resumen.suspendidos, resumen.con_nota, resumen.suma_notas,
+        )
+        for resumen in ResumenPrograma.objects.all()
+    }
+
+
+class ResumenProgramaTests(TestCase):
+    """El resumen por programa se ajusta con cada cambio de una inscripción"""
+
+    def setUp(self):
+        limpiar_caches()
+        instructor = crear_instructor()
+        self.adso = crear_programa('ADSO-1')
+        self.cocina = crear_programa('COC-1', regional='Valle', centro_formacion='Centro Gastronómico')
+        self.curso = crear_curso(self.adso, instructor)
+        self.otro = crear_curso(self.adso, instructor, codigo='CURSO-2')
+        self.aprendices = crear_aprendices(6)
+
+    def inscribir(self, aprendiz, curso, **datos):
+        return AprendizCurso.objects.create(aprendiz=aprendiz, curso=curso, **datos)
+
+    def test_cambios_incrementales_igual_que_reconstruir(self):
+        primera = self.inscribir(self.aprendices[0], self.curso)
+        self.inscribir(self.aprendices[1], self.curso, estado='ACT')
+        self.inscribir(self.aprendices[2], self.otro, estado='GRA', nota_final=Decimal('4.5'))
+        inscribir_aprendices(self.otro.id, [aprendiz.id for aprendiz in self.aprendices[3:]], por=POR_ID)
+
+        primera = AprendizCurso.objects.get(pk=primera.pk)
+        primera.estado, primera.nota_final = 'GRA', Decimal('3.5')
+        primera.save()
+        AprendizCurso.objects.get(aprendiz=self.aprendices[1]).delete()
+        self.assertEqual(
+            resumenes()[self.adso.id], (3, 0, 2, 0, 0, 2, Decimal('8.0')),
+        )
+        self.assertEqual(ResumenPrograma.objects.get(programa=self.adso).promedio, Decimal('4'))
+
+        # El curso se lleva sus inscripciones al cambiar de programa
+        otro = Curso.objects.get(pk=self.otro.pk)
+        otro.programa = self.cocina
+        otro.save()
+        incremental = resumenes()
+        self.assertEqual(incremental[self.cocina.id], (3, 0, 1, 0, 0, 1, Decimal('4.5')))
+        reconstruir_resumenes()
+        self.assertEqual(resumenes(), incremental)
+
+        otro.delete()
+        self.assertEqual(resumenes()[self.cocina.id], (0, 0, 0, 0, 0, 0, Decimal('0')))
+
+    def test_reconstruir_con_el_comando(self):
+        self.inscribir(self.aprendices[0], self.curso)
+        # QuerySet.update no pasa por las señales
+        AprendizCurso.objects.update(estado='DES')
+        self.assertEqual(resumenes()[self.adso.id][:4], (1, 0, 0, 0))
+        call_command('reconstruir_reportes', 'ADSO-1', stdout=StringIO())
+        self.assertEqual(resumenes()[self.adso.id][:4], (0, 0, 0, 1))
+
+    def test_reporte_lee_solo_el_resumen(self):
+        self.inscribir(self.aprendices[0], self.curso, estado='ACT', nota_final=Decimal('4.0'))
+        url = reverse('reportes:reporte_programas')
+        with self.assertNumQueries(3):
+            respuesta = self.client.get(url)
+        self.assertContains(respuesta, 'Centro de Teleinformática')
+        # Sin inscripciones el programa aparece con ceros
+        self.assertContains(respuesta, 'Programa COC-1')
+        for i in range(5):
+            crear_programa(f'OTRO-{i}')
+        limpiar_caches()
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+
+class PresupuestoVistasReportesTests(PresupuestoVistasMixin, TestCase):
+    """Consultas y tiempo de cada URL de reportes/urls.py"""
+
+    def vistas(self):
+        return [
+            # La versión del resumen (GET condicional), los programas con su
+            # resumen y los totales por regional y centro
+            ('reporte', reverse('reportes:reporte_programas'), 3),
+        ]
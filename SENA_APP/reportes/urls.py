@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'reportes'
+
+urlpatterns = [
+    path('', views.reporte_programas, name='reporte_programas'),
+]
@@ -0,0 +1,44 @@
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import NullIf
+from django.http import HttpResponse
+from django.template import loader
+
+from SENA_APP.condicional import condicional, por_versiones
+from programas.models import Programa
+from .models import CAMPO_POR_ESTADO, CAMPOS_SUMABLES, ResumenPrograma
+
+# Create your views here.
+
+# El resumen cambia con cada inscripción y el reporte muestra nombre,
+# regional y centro de cada programa
+validar_reporte = por_versiones(ResumenPrograma, Programa)
+
+
+@condicional(validar_reporte)
+def reporte_programas(request):
+    """
+    Totales por programa y por regional y centro, leídos de
+    ResumenPrograma: dos consultas de tantas filas como programas.
+    """
+    programas = Programa.objects.sin_textos().select_related('resumen').order_by('nombre', 'id')
+    sedes = list(
+        ResumenPrograma.objects.order_by()
+        .values(regional=F('programa__regional'), centro=F('programa__centro_formacion'))
+        .annotate(**{campo: Sum(campo) for campo in CAMPOS_SUMABLES})
+        .annotate(promedio=ExpressionWrapper(
+            F('suma_notas') / NullIf(F('con_nota'), 0), output_field=DecimalField(),
+        ))
+        .order_by('regional', 'centro')
+    )
+    totales = {campo: sum(sede[campo] for sede in sedes) for campo in CAMPOS_SUMABLES}
+    for fila in [*sedes, totales]:
+        fila['total'] = sum(fila[campo] for campo in CAMPO_POR_ESTADO.values())
+    totales['promedio'] = totales['suma_notas'] / totales['con_nota'] if totales['con_nota'] else None
+
+    template = loader.get_template('reporte_programas.html')
+    context = {
+        'programas': programas,
+        'sedes': sedes,
+        'totales': totales,
+    }
+    return HttpResponse(template.render(context, request))
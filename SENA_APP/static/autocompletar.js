@@ -0,0 +1,61 @@
+// Selectores con búsqueda (ver SENA_APP/autocompletar.py): cada
+// <select data-autocompletar="URL"> llega solo con la opción elegida y se
+// llena con los resultados de la búsqueda mientras se escribe.
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('select[data-autocompletar]').forEach(function (select) {
+    var url = select.dataset.autocompletar;
+    var entrada = document.createElement('input');
+    entrada.type = 'search';
+    entrada.className = 'form-control mb-1';
+    entrada.placeholder = 'Escriba para buscar…';
+    entrada.autocomplete = 'off';
+    entrada.setAttribute('aria-label', 'Buscar');
+    select.parentNode.insertBefore(entrada, select);
+
+    var mas = document.createElement('button');
+    mas.type = 'button';
+    mas.className = 'btn btn-link btn-sm px-0';
+    mas.textContent = 'Más resultados';
+    mas.hidden = true;
+    select.parentNode.insertBefore(mas, select.nextSibling);
+
+    var siguiente = null;
+    var pedido = 0;
+    var espera;
+
+    function cargar(direccion, agregar) {
+      var numero = ++pedido;
+      fetch(direccion, { headers: { Accept: 'application/json' } })
+        .then(function (respuesta) { return respuesta.json(); })
+        .then(function (datos) {
+          // Una respuesta de una búsqueda anterior que llegó tarde
+          if (numero !== pedido) return;
+          if (!agregar) {
+            // Se conservan la opción vacía y la elegida
+            Array.from(select.options).forEach(function (opcion) {
+              if (opcion.value && !opcion.selected) opcion.remove();
+            });
+          }
+          datos.resultados.forEach(function (fila) {
+            if (select.querySelector('option[value="' + fila.id + '"]')) return;
+            select.add(new Option(fila.texto, fila.id));
+          });
+          siguiente = datos.siguiente;
+          mas.hidden = !siguiente;
+        });
+    }
+
+    entrada.addEventListener('input', function () {
+      clearTimeout(espera);
+      espera = setTimeout(function () {
+        cargar(url + '?q=' + encodeURIComponent(entrada.value.trim()), false);
+      }, 250);
+    });
+    entrada.addEventListener('focus', function () {
+      if (select.options.length <= 2 && !entrada.value) cargar(url, false);
+    }, { once: true });
+    mas.addEventListener('click', function () {
+      if (siguiente) cargar(siguiente, true);
+    });
+  });
+});
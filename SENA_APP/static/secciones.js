@@ -0,0 +1,28 @@
+// Secciones del detalle que se piden aparte (ver seccion_programa en
+// programas/views.py): cada <div data-seccion="URL"> llega con un enlace y
+// se reemplaza por el fragmento cuando está por entrar en la pantalla.
+document.addEventListener('DOMContentLoaded', function () {
+  function cargar(contenedor) {
+    fetch(contenedor.dataset.seccion)
+      .then(function (respuesta) {
+        if (!respuesta.ok) throw new Error(respuesta.status);
+        return respuesta.text();
+      })
+      .then(function (html) { contenedor.innerHTML = html; })
+      .catch(function () { /* Queda el enlace a la sección */ });
+  }
+
+  var secciones = document.querySelectorAll('[data-seccion]');
+  if (!('IntersectionObserver' in window)) {
+    secciones.forEach(cargar);
+    return;
+  }
+  var observador = new IntersectionObserver(function (entradas) {
+    entradas.forEach(function (entrada) {
+      if (!entrada.isIntersecting) return;
+      observador.unobserve(entrada.target);
+      cargar(entrada.target);
+    });
+  }, { rootMargin: '200px' });
+  secciones.forEach(function (seccion) { observador.observe(seccion); });
+});